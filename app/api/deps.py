@@ -4,13 +4,13 @@ API依赖项
 
 from typing import Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_token
+from app.core.security import decode_token
 from app.core.exceptions import AuthenticationException
 from app.db.session import get_db
 from app.db.repositories.user_repository import user_repository
@@ -26,12 +26,14 @@ async def get_current_user(
 ) -> User:
     """获取当前用户"""
     token = credentials.credentials
-    username = verify_token(token)
+    claims = decode_token(token)
 
-    if username is None:
+    if claims is None:
         raise AuthenticationException("无效的认证令牌")
 
-    user = await user_repository.get_by_username(db, username=username)
+    user = await user_repository.get_principal(
+        db, user_id=claims.user_id, token_version=claims.token_version
+    )
     if user is None:
         raise AuthenticationException("用户不存在")
 
@@ -56,8 +58,15 @@ async def get_current_superuser(
     return current_user
 
 
-def get_pagination_params(page: int = 1, page_size: int = 20) -> dict:
-    """获取分页参数"""
+def get_pagination_params(
+    page: int = 1, page_size: int = 20, cursor: Optional[str] = None
+) -> dict:
+    """
+    获取分页参数
+
+    提供 cursor（首页可传空字符串）时使用游标分页，忽略 page；
+    下一页游标通过 X-Next-Cursor 响应头返回。
+    """
     if page < 1:
         page = 1
     if page_size < 1:
@@ -70,4 +79,11 @@ def get_pagination_params(page: int = 1, page_size: int = 20) -> dict:
         "limit": page_size,
         "page": page,
         "page_size": page_size,
+        "cursor": cursor,
     }
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """通过响应头返回下一页游标"""
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
@@ -2,11 +2,19 @@
 API v1版本主路由
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import auth, users, items
+from app.api.v1.endpoints import admin, auth, users, items
+from app.core.dependencies import rate_limit
+from app.core.rate_limit import DEFAULT_POLICY, HOURLY_POLICY
 
-api_router = APIRouter()
+# 所有API默认按用户（未认证时按IP）限流
+api_router = APIRouter(
+    dependencies=[
+        Depends(rate_limit(DEFAULT_POLICY)),
+        Depends(rate_limit(HOURLY_POLICY)),
+    ]
+)
 
 # 认证相关路由
 api_router.include_router(auth.router, prefix="/auth", tags=["认证"])
@@ -16,3 +24,6 @@ api_router.include_router(users.router, prefix="/users", tags=["用户"])
 
 # 物品相关路由
 api_router.include_router(items.router, prefix="/items", tags=["物品"])
+
+# 管理相关路由
+api_router.include_router(admin.router, prefix="/admin", tags=["管理"])
@@ -0,0 +1,41 @@
+"""
+管理相关API端点
+"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import get_current_superuser
+from app.schemas.cache import HotKey, HotKeysResponse
+from app.schemas.common import Message
+from app.schemas.user import User
+from app.utils.cache import cache, hot_keys
+
+router = APIRouter()
+
+
+@router.get("/cache/hot-keys", response_model=HotKeysResponse, summary="获取缓存热点键")
+async def get_cache_hot_keys(
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    current_user: User = Depends(get_current_superuser),
+):
+    """
+    获取采样统计的缓存热点键（仅超级用户可访问）
+
+    访问次数为按采样率换算后的估计值
+    """
+    return HotKeysResponse(
+        backend=cache.backend,
+        sample_rate=hot_keys.sample_rate,
+        keys=[
+            HotKey(key=key, estimated_count=count) for key, count in hot_keys.top(limit)
+        ],
+    )
+
+
+@router.delete("/cache/hot-keys", response_model=Message, summary="重置热点键统计")
+async def reset_cache_hot_keys(current_user: User = Depends(get_current_superuser)):
+    """
+    清空热点键统计（仅超级用户可访问）
+    """
+    hot_keys.reset()
+    return {"message": "热点键统计已重置"}
@@ -2,11 +2,14 @@
 认证相关API端点
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import verify_token
+from app.core.dependencies import rate_limit
+from app.core.exceptions import CustomHTTPException
+from app.core.rate_limit import AUTH_POLICY, client_ip
+from app.core.security import decode_token
 from app.db.models.user import User as UserModel
 from app.db.session import get_db
 from app.schemas.common import Message, Token
@@ -15,6 +18,7 @@ from app.services.user_service import user_service
 
 router = APIRouter()
 security = HTTPBearer()
+auth_rate_limit = Depends(rate_limit(AUTH_POLICY))
 
 
 async def get_current_user(
@@ -25,19 +29,23 @@ async def get_current_user(
     try:
         # 从Bearer token中提取实际的token
         token_str = token.credentials
-        username = verify_token(token_str)
-        if not username:
+        claims = decode_token(token_str)
+        if not claims:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的令牌"
             )
 
-        user = await user_service.get_current_user(db, username=username)
+        user = await user_service.get_principal(
+            db, user_id=claims.user_id, token_version=claims.token_version
+        )
         return user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
-@router.post("/register", response_model=dict, summary="用户注册")
+@router.post(
+    "/register", response_model=dict, summary="用户注册", dependencies=[auth_rate_limit]
+)
 async def register(user_in: UserRegister, db: AsyncSession = Depends(get_db)):
     """
     用户注册
@@ -54,12 +62,18 @@ async def register(user_in: UserRegister, db: AsyncSession = Depends(get_db)):
             "token": result["token"],
             "user": User.model_validate(result["user"]),
         }
+    except CustomHTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.post("/login", response_model=Token, summary="用户登录")
-async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
+@router.post(
+    "/login", response_model=Token, summary="用户登录", dependencies=[auth_rate_limit]
+)
+async def login(
+    user_in: UserLogin, request: Request, db: AsyncSession = Depends(get_db)
+):
     """
     用户登录
 
@@ -67,13 +81,20 @@ async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
     - **password**: 密码
     """
     try:
-        token = await user_service.login(db, user_in=user_in)
+        token = await user_service.login(
+            db, user_in=user_in, client_ip=client_ip(request)
+        )
         return token
+    except CustomHTTPException:
+        # 登录锁定（429）与密码哈希队列已满（503）等需原样返回
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
-@router.post("/refresh", response_model=Token, summary="刷新令牌")
+@router.post(
+    "/refresh", response_model=Token, summary="刷新令牌", dependencies=[auth_rate_limit]
+)
 async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     """
     刷新访问令牌
@@ -81,20 +102,29 @@ async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     - **refresh_token**: 刷新令牌
     """
     try:
-        username = verify_token(refresh_token)
-        if not username:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的刷新令牌"
-            )
-        user = await user_service.get_current_user(db, username=username)
-        from app.core.security import create_token_pair
-
-        token = create_token_pair(user.username)
+        token = await user_service.refresh_token(db, refresh_token=refresh_token)
         return token
+    except CustomHTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
+@router.post("/logout", response_model=Message, summary="退出登录")
+async def logout(token: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    退出登录，当前令牌及对应的刷新令牌立即失效
+    """
+    claims = decode_token(token.credentials)
+    if not claims:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的令牌"
+        )
+
+    user_service.logout(claims=claims)
+    return Message(message="退出登录成功")
+
+
 @router.get("/me", response_model=User, summary="获取当前用户信息")
 async def get_current_user_info(current_user: UserModel = Depends(get_current_user)):
     """
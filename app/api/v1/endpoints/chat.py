@@ -49,7 +49,7 @@ async def get_chat_sessions(
 ):
     """获取用户的聊天会话列表"""
     chat_service = ChatService(db)
-    sessions = await chat_service.get_user_sessions(current_user.id)
+    sessions = await chat_service.get_user_sessions_with_message_count(current_user.id)
     
     return [
         ChatSessionResponse(
@@ -57,9 +57,9 @@ async def get_chat_sessions(
             title=session.title,
             created_at=session.created_at,
             updated_at=session.updated_at,
-            message_count=len(session.messages)
+            message_count=message_count
         )
-        for session in sessions
+        for session, message_count in sessions
     ]
 
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageResponse])
@@ -4,12 +4,23 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user, get_pagination_params
+from app.api.deps import (
+    get_current_active_user,
+    get_pagination_params,
+    set_next_cursor,
+)
 from app.db.session import get_db
-from app.schemas.item import Item, ItemCreate, ItemUpdate
+from app.schemas.item import (
+    Item,
+    ItemBatchCreate,
+    ItemBatchDelete,
+    ItemBatchUpdate,
+    ItemCreate,
+    ItemUpdate,
+)
 from app.schemas.user import User
 from app.schemas.common import Message
 from app.services.item_service import item_service
@@ -19,6 +30,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Item], summary="获取物品列表")
 async def get_items(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     pagination: dict = Depends(get_pagination_params),
     active_only: bool = Query(False, description="仅显示活跃物品"),
@@ -28,8 +40,21 @@ async def get_items(
 
     - **page**: 页码（默认1）
     - **page_size**: 每页数量（默认20）
+    - **cursor**: 分页游标（首页传空字符串），提供时按游标分页
     - **active_only**: 仅显示活跃物品
+
+    下一页游标通过 X-Next-Cursor 响应头返回，没有下一页时不返回
     """
+    if pagination["cursor"] is not None:
+        page = await item_service.get_items_page(
+            db,
+            cursor=pagination["cursor"],
+            limit=pagination["limit"],
+            active_only=active_only,
+        )
+        set_next_cursor(response, page.next_cursor)
+        return page.items
+
     if active_only:
         items = await item_service.get_active_items(
             db, skip=pagination["skip"], limit=pagination["limit"]
@@ -38,6 +63,7 @@ async def get_items(
         items = await item_service.get_items(
             db, skip=pagination["skip"], limit=pagination["limit"]
         )
+    set_next_cursor(response, item_service.next_cursor(items, pagination["limit"]))
     return items
 
 
@@ -60,6 +86,7 @@ async def create_item(
 
 @router.get("/my", response_model=List[Item], summary="获取我的物品")
 async def get_my_items(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     pagination: dict = Depends(get_pagination_params),
     current_user: User = Depends(get_current_active_user),
@@ -67,12 +94,65 @@ async def get_my_items(
     """
     获取当前用户的物品列表
     """
+    if pagination["cursor"] is not None:
+        page = await item_service.get_user_items_page(
+            db,
+            owner_id=current_user.id,
+            cursor=pagination["cursor"],
+            limit=pagination["limit"],
+        )
+        set_next_cursor(response, page.next_cursor)
+        return page.items
+
     items = await item_service.get_user_items(
         db, owner_id=current_user.id, skip=pagination["skip"], limit=pagination["limit"]
     )
+    set_next_cursor(response, item_service.next_cursor(items, pagination["limit"]))
     return items
 
 
+@router.post("/batch", response_model=List[Item], summary="批量创建物品")
+async def create_items(
+    batch_in: ItemBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    批量创建物品，全部成功或全部失败
+    """
+    return await item_service.create_items(
+        db, items_in=batch_in.items, owner_id=current_user.id
+    )
+
+
+@router.patch("/batch", response_model=List[Item], summary="批量更新物品")
+async def update_items(
+    batch_in: ItemBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    批量更新物品（仅所有者可更新），任一物品不存在或无权限时不做任何修改
+    """
+    return await item_service.update_items(
+        db, items_in=batch_in.items, current_user_id=current_user.id
+    )
+
+
+@router.delete("/batch", response_model=Message, summary="批量删除物品")
+async def delete_items(
+    batch_in: ItemBatchDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    批量删除物品（仅所有者可删除），任一物品不存在或无权限时不做任何删除
+    """
+    return await item_service.delete_items(
+        db, ids=batch_in.ids, current_user_id=current_user.id
+    )
+
+
 @router.get("/{item_id}", response_model=Item, summary="获取物品详情")
 async def get_item(item_id: int, db: AsyncSession = Depends(get_db)):
     """
@@ -91,6 +171,8 @@ async def update_item(
 ):
     """
     更新物品信息（仅所有者可更新）
+
+    - **updated_at**: 读取物品时的 updated_at（可选），物品已被他人修改时返回409
     """
     item = await item_service.update_item(
         db, item_id=item_id, item_in=item_in, current_user_id=current_user.id
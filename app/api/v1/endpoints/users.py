@@ -4,13 +4,14 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (
     get_current_active_user,
     get_current_superuser,
     get_pagination_params,
+    set_next_cursor,
 )
 from app.db.session import get_db
 from app.schemas.user import User, UserUpdate
@@ -22,16 +23,27 @@ router = APIRouter()
 
 @router.get("/", response_model=List[User], summary="获取用户列表")
 async def get_users(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     pagination: dict = Depends(get_pagination_params),
     current_user: User = Depends(get_current_superuser),
 ):
     """
     获取用户列表（仅超级用户可访问）
+
+    提供 cursor 时按游标分页，下一页游标通过 X-Next-Cursor 响应头返回
     """
+    if pagination["cursor"] is not None:
+        page = await user_service.get_users_page(
+            db, cursor=pagination["cursor"], limit=pagination["limit"]
+        )
+        set_next_cursor(response, page.next_cursor)
+        return page.items
+
     users = await user_service.get_users(
         db, skip=pagination["skip"], limit=pagination["limit"]
     )
+    set_next_cursor(response, user_service.next_cursor(users, pagination["limit"]))
     return users
 
 
@@ -3,7 +3,7 @@
 """
 
 import secrets
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import AnyHttpUrl, EmailStr, HttpUrl, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings
@@ -44,12 +44,49 @@ class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: Optional[PostgresDsn] = None
     SQLITE_DATABASE_URL: str = "sqlite:///./app.db"
+    # 连接池：数据库 max_connections 扣除预留连接后按 WORKERS 平分；
+    # DB_POOL_SIZE / DB_MAX_OVERFLOW 不配置时按此自动推算
+    DB_MAX_CONNECTIONS: int = 100
+    DB_RESERVED_CONNECTIONS: int = 10
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    # 每次借出连接前探活会多一次往返，断连由驱动报错后连接池自动失效重建
+    DB_POOL_PRE_PING: bool = False
+    # asyncpg 预编译语句缓存大小
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # 经 PgBouncer（事务池模式）连接时禁用预编译语句
+    DB_PGBOUNCER: bool = False
+    # 只读副本：GET请求与只读查询发往副本，写入后的粘滞窗口内读取主库
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    # 启动时检查数据库迁移版本与代码一致，不一致时拒绝启动（迁移通过 cli.py db_migrate 执行）
+    DB_SCHEMA_CHECK: bool = True
+    # 超过该耗时（毫秒）的SQL语句按归一化指纹记录慢查询日志
+    DB_SLOW_QUERY_MS: float = 200.0
+    # 开发环境在响应头 X-DB-Queries / X-DB-Time 中返回每个请求的语句数与数据库耗时
+    DB_QUERY_STATS_HEADERS: bool = True
 
     # Redis配置
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    # 拓扑：standalone（单机）、sentinel（哨兵）、cluster（集群）
+    REDIS_MODE: Literal["standalone", "sentinel", "cluster"] = "standalone"
+    # 哨兵与集群节点列表，格式为 host:port
+    REDIS_SENTINELS: List[str] = []
+    REDIS_SENTINEL_MASTER: str = "mymaster"
+    REDIS_SENTINEL_PASSWORD: Optional[str] = None
+    REDIS_CLUSTER_NODES: List[str] = []
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_RETRIES: int = 1
+    # 不可用时的重连与健康检查间隔（秒）
+    REDIS_HEALTH_CHECK_INTERVAL: int = 10
 
     # Celery配置
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -87,24 +124,87 @@ class Settings(BaseSettings):
     ]
 
     # 安全配置
+    # JWT签名算法：HS256 使用 SECRET_KEY；RS256/ES256 使用私钥签名，公钥经 JWKS 发布
     ALGORITHM: str = "HS256"
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None
+    # 默认使用公钥的 RFC 7638 指纹
+    JWT_KEY_ID: Optional[str] = None
+    # 密钥轮换期间仍需接受的旧密钥（PEM文件路径）
+    JWT_VERIFICATION_KEY_FILES: List[str] = []
+    JWKS_CACHE_MAX_AGE: int = 300
     PASSWORD_MIN_LENGTH: int = 8
     PASSWORD_REQUIRE_UPPERCASE: bool = True
     PASSWORD_REQUIRE_LOWERCASE: bool = True
     PASSWORD_REQUIRE_NUMBERS: bool = True
     PASSWORD_REQUIRE_SYMBOLS: bool = False
+    # 密码哈希方案：bcrypt 或 argon2（argon2id，需安装 argon2 可选依赖）
+    # 成本参数可用 `python cli.py bench-hash` 按目标耗时校准；低于当前成本的旧哈希在登录后自动升级
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536  # KiB
+    PASSWORD_ARGON2_PARALLELISM: int = 4
+    # 密码哈希线程池大小与最大排队数（超出时返回503）
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
 
     # 限流配置
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 100
     RATE_LIMIT_PER_HOUR: int = 1000
+    # 登录、注册、刷新令牌等认证接口（按IP）
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 20
+    # 本地租借配额的有效期与单次租借上限
+    RATE_LIMIT_LEASE_SECONDS: float = 1.0
+    RATE_LIMIT_LEASE_MAX: int = 20
+
+    # 登录防护：用户名/IP连续失败达到阈值后锁定，此后每次失败锁定时长翻倍
+    LOGIN_GUARD_ENABLED: bool = True
+    LOGIN_MAX_FAILURES_PER_USER: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 20
+    # 失败计数窗口（窗口内无新的失败则清零）与锁定时长范围（秒）
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 900
+    LOGIN_LOCKOUT_BASE_SECONDS: int = 30
+    LOGIN_LOCKOUT_MAX_SECONDS: int = 900
+
+    # 登录统计（登录次数、最近登录时间）批量写回周期与提前写入的待写用户数上限
+    LOGIN_ACTIVITY_FLUSH_SECONDS: float = 5.0
+    LOGIN_ACTIVITY_MAX_PENDING: int = 1000
 
     # 缓存配置
     CACHE_EXPIRE_SECONDS: int = 3600
+    CACHE_KEY_PREFIX: str = "zdjg"
+    # 递增版本号即可让旧缓存键全部失效（旧键随TTL自然过期）
+    CACHE_VERSION: int = 1
+    # 标签失效后的保护窗口，期间拒绝写入可能过期的读取结果
+    CACHE_TAG_GRACE_SECONDS: int = 5
+    # 仓库层读穿透缓存（仅在Redis可用时生效）
+    REPOSITORY_CACHE_ENABLED: bool = False
+    REPOSITORY_CACHE_EXPIRE_SECONDS: int = 300
+    # 热点键采样
+    CACHE_HOT_KEY_SAMPLE_RATE: float = 0.01
+    CACHE_HOT_KEY_TOP_K: int = 20
+    # 认证主体缓存：进程内一级缓存（需短TTL，跨worker无法主动失效）+ 共享二级缓存
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_LOCAL_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_EXPIRE_SECONDS: int = 60
+    # 已验证令牌缓存（进程内LRU，条目在令牌过期时失效）
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # 令牌吊销列表：布隆过滤器容量/误判率与同步周期（跨进程吊销的最大生效延迟）
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 5
 
     # 分页配置
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    # 批量写入配置
+    BULK_CHUNK_SIZE: int = 1000  # 单条语句处理的最大行数
+    BULK_MAX_ITEMS: int = 10000  # 单个批量请求的最大条目数
+
     #OpenAI配置
     OPENAI_API_KEY: str = ""
     OPENAI_BASE_URL: str = ""
@@ -2,15 +2,25 @@
 通用依赖项
 """
 
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
-from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_token
-from app.core.exceptions import AuthenticationException, AuthorizationException
+from app.core.security import decode_token
+from app.core.exceptions import (
+    AuthenticationException,
+    AuthorizationException,
+    RateLimitException,
+)
+from app.core.rate_limit import (
+    DEFAULT_POLICY,
+    RateLimitPolicy,
+    client_identity,
+    rate_limiter,
+)
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.repositories.user_repository import user_repository
@@ -28,12 +38,14 @@ async def get_current_user_optional(
         return None
 
     token = credentials.credentials
-    username = verify_token(token)
+    claims = decode_token(token)
 
-    if not username:
+    if not claims:
         return None
 
-    user = await user_repository.get_by_username(db, username=username)
+    user = await user_repository.get_principal(
+        db, user_id=claims.user_id, token_version=claims.token_version
+    )
     return user
 
 
@@ -46,12 +58,14 @@ async def get_current_user_required(
         raise AuthenticationException("需要认证令牌")
 
     token = credentials.credentials
-    username = verify_token(token)
+    claims = decode_token(token)
 
-    if not username:
+    if not claims:
         raise AuthenticationException("无效的认证令牌")
 
-    user = await user_repository.get_by_username(db, username=username)
+    user = await user_repository.get_principal(
+        db, user_id=claims.user_id, token_version=claims.token_version
+    )
     if not user:
         raise AuthenticationException("用户不存在")
 
@@ -131,8 +145,24 @@ def check_api_key(api_key: Optional[str] = Query(None, alias="api_key")) -> bool
     return api_key == settings.API_KEY if hasattr(settings, "API_KEY") else False
 
 
-async def rate_limit_check(request: Request) -> None:
-    """速率限制检查"""
-    # 这里可以实现更复杂的速率限制逻辑
-    # 比如基于Redis的计数器
-    pass
+def rate_limit(policy: RateLimitPolicy) -> Callable[..., Awaitable[None]]:
+    """按策略限流的依赖项，超限时返回429并附带 RateLimit 与 Retry-After 响应头"""
+
+    async def check(request: Request, response: Response) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        result = rate_limiter.hit(policy, client_identity(request))
+        if not result.allowed:
+            raise RateLimitException(headers=result.headers())
+        response.headers.update(result.headers())
+
+    return check
+
+
+_default_rate_limit = rate_limit(DEFAULT_POLICY)
+
+
+async def rate_limit_check(request: Request, response: Response) -> None:
+    """速率限制检查（默认策略）"""
+    await _default_rate_limit(request, response)
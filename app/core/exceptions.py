@@ -98,12 +98,16 @@ class RateLimitException(CustomHTTPException):
     """速率限制异常"""
 
     def __init__(
-        self, detail: str = "请求过于频繁", error_code: str = "RATE_LIMIT_EXCEEDED"
+        self,
+        detail: str = "请求过于频繁",
+        error_code: str = "RATE_LIMIT_EXCEEDED",
+        headers: Optional[Dict[str, Any]] = None,
     ):
         super().__init__(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=detail,
             error_code=error_code,
+            headers=headers,
         )
 
 
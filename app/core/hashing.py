@@ -0,0 +1,159 @@
+"""
+异步密码哈希服务
+
+bcrypt 单次计算约需数百毫秒，直接在协程中调用会阻塞整个事件循环。
+这里把哈希与校验放到专用的有界线程池执行（bcrypt 计算期间会释放GIL），
+并限制排队数量：队列已满时快速失败，而不是无限堆积请求。
+"""
+
+import asyncio
+import secrets
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.security import build_password_context, pwd_context
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth", "Password hash jobs queued or running"
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_wait_seconds", "Time a password hash job waited for a worker"
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Password hash job run time", ["operation"]
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password hash jobs rejected by a full queue"
+)
+
+
+class PasswordHasher:
+    """基于有界线程池的异步密码哈希器"""
+
+    def __init__(
+        self, max_workers: Optional[int] = None, max_queue: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = max_queue or settings.PASSWORD_HASH_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dummy_hash: Optional[str] = None
+        # 仅在事件循环线程中增减，无需加锁
+        self._pending = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """首次使用时创建线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """排队及执行中的任务数"""
+        return self._pending
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        """提交任务到线程池并等待结果"""
+        if self._pending >= self.max_queue:
+            PASSWORD_HASH_REJECTED.inc()
+            raise ServiceUnavailableException("认证服务繁忙，请稍后重试")
+
+        submitted = time.perf_counter()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            PASSWORD_HASH_WAIT.observe(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                PASSWORD_HASH_DURATION.labels(operation).observe(
+                    time.perf_counter() - started
+                )
+
+        self._pending += 1
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, job)
+        finally:
+            self._pending -= 1
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+    async def hash(self, password: str) -> str:
+        """计算密码哈希"""
+        return await self._run("hash", pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return await self._run(
+            "verify", pwd_context.verify, plain_password, hashed_password
+        )
+
+    async def verify_dummy(self, plain_password: str) -> bool:
+        """
+        对固定的占位哈希执行一次校验，始终返回False
+
+        用户不存在时调用，使其耗时与真实的密码校验一致，避免通过响应时间枚举用户名。
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(16))
+        await self._run("verify", pwd_context.verify, plain_password, self._dummy_hash)
+        return False
+
+    @staticmethod
+    def needs_update(hashed_password: str) -> bool:
+        """哈希方案或成本是否落后于当前配置"""
+        return pwd_context.needs_update(hashed_password)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池（再次使用时会重新创建）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def measure_verify(scheme: str, samples: int = 3, **cost: int) -> float:
+    """测量给定成本下单次校验耗时的中位数（秒）"""
+    context = build_password_context(scheme=scheme, **cost)
+    hashed = context.hash("calibration-password")
+    durations = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify("calibration-password", hashed)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def calibrate(
+    scheme: str, target_seconds: float, samples: int = 3
+) -> Tuple[Dict[str, int], float]:
+    """
+    按目标校验耗时校准哈希成本
+
+    逐级提高成本（bcrypt 的 rounds 或 argon2 的 time_cost，内存与并行度取当前配置），
+    返回不超过目标耗时的最高成本及其实测耗时；最低成本已超出目标时返回最低成本。
+    """
+    if scheme == "bcrypt":
+        parameter, costs = "bcrypt_rounds", range(4, 32)
+    else:
+        parameter, costs = "argon2_time_cost", range(1, 64)
+
+    best: Optional[Tuple[Dict[str, int], float]] = None
+    for cost in costs:
+        duration = measure_verify(scheme, samples, **{parameter: cost})
+        if best is not None and duration > target_seconds:
+            break
+        best = ({parameter: cost}, duration)
+    return best
+
+
+# 全局密码哈希器
+password_hasher = PasswordHasher()
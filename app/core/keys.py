@@ -0,0 +1,175 @@
+"""
+JWT签名密钥环
+
+HS256 等对称算法使用共享的 SECRET_KEY；RS256/ES256 等非对称算法用私钥签名、
+公钥验证，令牌头携带 kid。验证密钥在构建时解析一次并按 kid 缓存，验证时不再
+重复解析PEM。公钥以 JWKS 形式发布，其他服务无需签名密钥即可在本地验证令牌。
+
+密钥轮换：把新私钥配置为 JWT_PRIVATE_KEY_FILE，旧私钥或公钥加入
+JWT_VERIFICATION_KEY_FILES，直到用旧密钥签发的令牌全部过期后再移除。
+"""
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.constants import ALGORITHMS
+from loguru import logger
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ALGORITHMS.RSA_DS | ALGORITHMS.EC_DS
+
+# RFC 7638 指纹所需的JWK成员
+_THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+_EC_CURVES = {
+    "ES256": ec.SECP256R1,
+    "ES384": ec.SECP384R1,
+    "ES512": ec.SECP521R1,
+}
+
+
+def jwk_thumbprint(public_jwk: Dict[str, Any]) -> str:
+    """计算JWK指纹（RFC 7638），用作默认kid"""
+    members = {
+        name: public_jwk[name] for name in _THUMBPRINT_MEMBERS[public_jwk["kty"]]
+    }
+    encoded = json.dumps(members, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(encoded.encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def generate_private_key_pem(algorithm: str) -> str:
+    """生成指定算法的私钥（PKCS8 PEM）"""
+    if algorithm in ALGORITHMS.RSA_DS:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm in _EC_CURVES:
+        private_key = ec.generate_private_key(_EC_CURVES[algorithm]())
+    else:
+        raise ValueError(f"不支持的非对称签名算法: {algorithm}")
+
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("ascii")
+
+
+class JWTKeyring:
+    """JWT签名与验证密钥环"""
+
+    def __init__(
+        self,
+        algorithm: str,
+        *,
+        secret: Optional[str] = None,
+        private_key: Optional[str] = None,
+        verification_keys: Iterable[str] = (),
+        kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self._verification_keys: Dict[str, Key] = {}
+        self._public_jwks: Dict[str, Dict[str, Any]] = {}
+
+        if algorithm in ALGORITHMS.HMAC:
+            if not secret:
+                raise ValueError("对称签名算法需要配置 SECRET_KEY")
+            self.kid: Optional[str] = None
+            self._signing_key = jwk.construct(secret, algorithm)
+            return
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"不支持的签名算法: {algorithm}")
+        if not private_key:
+            raise ValueError(f"{algorithm} 需要配置签名私钥")
+
+        for pem in verification_keys:
+            self._add_verification_key(jwk.construct(pem, algorithm))
+        self._signing_key = jwk.construct(private_key, algorithm)
+        self.kid = self._add_verification_key(self._signing_key, kid)
+
+    @property
+    def is_asymmetric(self) -> bool:
+        """是否为非对称签名"""
+        return self.kid is not None
+
+    def _add_verification_key(self, key: Key, kid: Optional[str] = None) -> str:
+        """登记验证公钥，返回其kid"""
+        public_key = key.public_key()
+        public_jwk = public_key.to_dict()
+        kid = kid or jwk_thumbprint(public_jwk)
+        self._verification_keys[kid] = public_key
+        self._public_jwks[kid] = {**public_jwk, "kid": kid, "use": "sig"}
+        return kid
+
+    def rotate(self, private_key: str, kid: Optional[str] = None) -> str:
+        """切换签名私钥，旧公钥继续用于验证；返回新kid"""
+        if not self.is_asymmetric:
+            raise ValueError("对称签名密钥不支持轮换")
+        self._signing_key = jwk.construct(private_key, self.algorithm)
+        self.kid = self._add_verification_key(self._signing_key, kid)
+        return self.kid
+
+    def retire(self, kid: str) -> None:
+        """移除不再接受的验证公钥"""
+        if kid == self.kid:
+            raise ValueError("不能移除当前签名密钥")
+        self._verification_keys.pop(kid, None)
+        self._public_jwks.pop(kid, None)
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """签发令牌"""
+        headers = {"kid": self.kid} if self.kid else None
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """按令牌头中的kid选择验证密钥并解码，验证失败时抛出JWTError"""
+        if self.kid is None:
+            key = self._signing_key
+        else:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = self._verification_keys.get(kid)
+            if key is None:
+                raise JWTError("未知的签名密钥")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """公钥集合（JWKS），对称签名时为空"""
+        return {"keys": list(self._public_jwks.values())}
+
+
+def build_keyring() -> JWTKeyring:
+    """根据配置创建密钥环"""
+    algorithm = settings.ALGORITHM
+    if algorithm in ALGORITHMS.HMAC:
+        return JWTKeyring(algorithm, secret=settings.SECRET_KEY)
+
+    if settings.JWT_PRIVATE_KEY_FILE:
+        private_key = Path(settings.JWT_PRIVATE_KEY_FILE).read_text()
+    else:
+        logger.warning(
+            "未配置 JWT_PRIVATE_KEY_FILE，使用进程内临时密钥；多进程部署时进程间无法互相验证令牌"
+        )
+        private_key = generate_private_key_pem(algorithm)
+
+    return JWTKeyring(
+        algorithm,
+        private_key=private_key,
+        verification_keys=[
+            Path(path).read_text() for path in settings.JWT_VERIFICATION_KEY_FILES
+        ],
+        kid=settings.JWT_KEY_ID,
+    )
+
+
+# 全局密钥环
+keyring = build_keyring()
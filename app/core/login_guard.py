@@ -0,0 +1,175 @@
+"""
+登录暴力破解防护
+
+按用户名与客户端IP分别统计连续登录失败次数，失败次数达到阈值后锁定，每多失败一次
+锁定时长翻倍（有上限）；一个失败窗口内没有新的失败则计数清零。计数与锁定状态保存
+在共享缓存中，由Lua脚本原子更新，所有worker看到同一份状态。
+
+被锁定的登录请求在查询数据库与校验密码之前即被拒绝，攻击者无法借此消耗bcrypt算力。
+Redis不可用时退化为进程内计数。
+"""
+
+import math
+import time
+from typing import Optional, Tuple
+
+from loguru import logger
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitException
+from app.utils.cache import cache, state_key
+from app.utils.local_cache import LocalTTLCache
+
+LOGIN_GUARD_EVENTS = Counter(
+    "login_guard_events_total", "Login guard decisions", ["scope", "event"]
+)
+
+# KEYS[1]: 计数键
+# 返回: 剩余锁定时间(ms)
+LOCK_CHECK_SCRIPT = """
+local locked_until = tonumber(redis.call('HGET', KEYS[1], 'locked_until'))
+if not locked_until then
+    return 0
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+return math.max(0, locked_until - now)
+"""
+
+# KEYS[1]: 计数键
+# ARGV: 锁定阈值、失败窗口(ms)、初始锁定时长(ms)、最大锁定时长(ms)
+# 返回: 本次失败后的锁定时长(ms)，未锁定时为0
+RECORD_FAILURE_SCRIPT = """
+local threshold = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local base = tonumber(ARGV[3])
+local maximum = tonumber(ARGV[4])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+local lock = 0
+if failures >= threshold then
+    lock = math.floor(math.min(maximum, base * 2 ^ (failures - threshold)))
+    redis.call('HSET', KEYS[1], 'locked_until', now + lock)
+end
+redis.call('PEXPIRE', KEYS[1], math.max(window, lock))
+return lock
+"""
+
+
+class LoginGuard:
+    """按用户名与IP的登录失败计数与渐进锁定"""
+
+    def __init__(self, max_keys: int = 100000):
+        # Redis不可用时的进程内状态: 键 -> [失败次数, 锁定截止时间]
+        self._local = LocalTTLCache(max_size=max_keys)
+
+    @staticmethod
+    def _key(scope: str, subject: str) -> str:
+        """失败计数的缓存键"""
+        return state_key("login_failures", scope, subject)
+
+    @staticmethod
+    def _threshold(scope: str) -> int:
+        """锁定阈值"""
+        if scope == "user":
+            return settings.LOGIN_MAX_FAILURES_PER_USER
+        return settings.LOGIN_MAX_FAILURES_PER_IP
+
+    def _subjects(
+        self, username: str, ip: Optional[str]
+    ) -> Tuple[Tuple[str, str], ...]:
+        """需要检查的(范围, 键)"""
+        subjects = (("user", self._key("user", username)),)
+        if ip:
+            subjects += (("ip", self._key("ip", ip)),)
+        return subjects
+
+    def check(self, username: str, ip: Optional[str] = None) -> None:
+        """登录前检查，用户名或IP处于锁定期时抛出 RateLimitException"""
+        if not settings.LOGIN_GUARD_ENABLED:
+            return
+
+        for scope, key in self._subjects(username, ip):
+            remaining_ms = cache.eval_script(LOCK_CHECK_SCRIPT, keys=[key])
+            if remaining_ms is None:
+                remaining_ms = self._local_lock_remaining(key)
+            if int(remaining_ms) > 0:
+                LOGIN_GUARD_EVENTS.labels(scope, "rejected").inc()
+                retry_after = max(1, math.ceil(int(remaining_ms) / 1000))
+                raise RateLimitException(
+                    detail="登录失败次数过多，请稍后重试",
+                    error_code="LOGIN_LOCKED",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+    def record_failure(self, username: str, ip: Optional[str] = None) -> None:
+        """记录一次登录失败"""
+        if not settings.LOGIN_GUARD_ENABLED:
+            return
+
+        for scope, key in self._subjects(username, ip):
+            threshold = self._threshold(scope)
+            lock_ms = cache.eval_script(
+                RECORD_FAILURE_SCRIPT,
+                keys=[key],
+                args=[
+                    threshold,
+                    settings.LOGIN_FAILURE_WINDOW_SECONDS * 1000,
+                    settings.LOGIN_LOCKOUT_BASE_SECONDS * 1000,
+                    settings.LOGIN_LOCKOUT_MAX_SECONDS * 1000,
+                ],
+            )
+            if lock_ms is None:
+                lock_ms = self._local_record_failure(key, threshold)
+            LOGIN_GUARD_EVENTS.labels(scope, "failure").inc()
+            if int(lock_ms) > 0:
+                LOGIN_GUARD_EVENTS.labels(scope, "locked").inc()
+                logger.warning(
+                    f"登录失败次数过多，锁定 {int(lock_ms) / 1000:.0f} 秒: {scope}"
+                )
+
+    def record_success(self, username: str) -> None:
+        """登录成功后清除该用户名的失败计数（IP计数保留，避免被共享IP上的其他账号重置）"""
+        if not settings.LOGIN_GUARD_ENABLED:
+            return
+
+        key = self._key("user", username)
+        cache.delete(key)
+        self._local.pop(key)
+
+    def _local_lock_remaining(self, key: str) -> float:
+        """进程内剩余锁定时间(ms)"""
+        state = self._local.get(key)
+        if state is None:
+            return 0
+        return max(0.0, state[1] - time.monotonic() * 1000)
+
+    def _local_record_failure(self, key: str, threshold: int) -> float:
+        """进程内记录失败，语义与Lua脚本一致"""
+        now = time.monotonic() * 1000
+        state = self._local.get(key) or [0, 0.0]
+        state[0] += 1
+        lock = 0.0
+        if state[0] >= threshold:
+            lock = min(
+                settings.LOGIN_LOCKOUT_MAX_SECONDS * 1000,
+                settings.LOGIN_LOCKOUT_BASE_SECONDS
+                * 1000
+                * 2 ** (state[0] - threshold),
+            )
+            state[1] = now + lock
+        ttl = max(settings.LOGIN_FAILURE_WINDOW_SECONDS * 1000, lock) / 1000
+        self._local.set(key, state, ttl=ttl)
+        return lock
+
+    def reset(self) -> None:
+        """清空本地状态"""
+        self._local.clear()
+
+
+# 全局登录防护
+login_guard = LoginGuard()
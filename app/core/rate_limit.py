@@ -0,0 +1,245 @@
+"""
+分布式限流
+
+基于 GCRA（通用信元速率算法）：每个限流键在Redis中只保存一个“理论到达时间”（TAT），
+判定与更新由一段Lua脚本原子完成，所有worker共享同一份配额。
+
+为减少Redis往返，进程按策略一次向Redis租借若干配额放入本地令牌桶，后续请求先消耗
+本地令牌，耗尽或租期结束后才访问Redis；过期未用完的令牌在下次访问Redis时退还。
+因此跨进程的瞬时误差不超过 进程数 × 租借数量。
+Redis不可用时退化为进程内GCRA（配额按单进程计算）。
+"""
+
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.utils.cache import cache, state_key
+from app.utils.local_cache import LocalTTLCache
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limit decisions",
+    ["policy", "result", "source"],
+)
+
+# KEYS[1]: 限流键
+# ARGV: 单个配额的间隔(ms)、容忍窗口(ms，即周期)、请求配额数、退还配额数
+# 返回: {获得配额数, 剩余配额, 重试等待(ms), 完全恢复等待(ms)}
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local refund = tonumber(ARGV[4])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat then
+    tat = now
+end
+if refund > 0 then
+    tat = tat - refund * emission
+end
+if tat < now then
+    tat = now
+end
+
+local available = math.floor((now + tolerance - tat) / emission)
+local granted = math.min(requested, available)
+if granted < 1 then
+    if refund > 0 then
+        redis.call('SET', KEYS[1], math.ceil(tat), 'PX', math.ceil(tat - now) + 1)
+    end
+    return {0, 0, math.ceil(tat - tolerance + emission - now), math.ceil(tat - now)}
+end
+
+local new_tat = math.ceil(tat + granted * emission)
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {granted, available - granted, 0, new_tat - now}
+"""
+
+
+class RateLimitPolicy:
+    """限流策略：每 period 秒最多 limit 次"""
+
+    def __init__(self, name: str, limit: int, period: int, lease: Optional[int] = None):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        # 每次向Redis租借的配额数；严格的小额度策略应设为1
+        self.lease = lease or max(1, min(limit // 10, settings.RATE_LIMIT_LEASE_MAX))
+
+    @property
+    def emission_interval_ms(self) -> float:
+        """单个配额的间隔（毫秒）"""
+        return self.period * 1000 / self.limit
+
+
+class RateLimitResult:
+    """限流判定结果"""
+
+    def __init__(
+        self,
+        policy: RateLimitPolicy,
+        allowed: bool,
+        remaining: int,
+        reset_after: float,
+        retry_after: float = 0.0,
+    ):
+        self.policy = policy
+        self.allowed = allowed
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        """标准 RateLimit 响应头（IETF draft），拒绝时附带 Retry-After"""
+        headers = {
+            "RateLimit-Limit": str(self.policy.limit),
+            "RateLimit-Remaining": str(max(0, self.remaining)),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+            "RateLimit-Policy": f"{self.policy.limit};w={self.policy.period}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class _Lease:
+    """本地租借的配额"""
+
+    __slots__ = ("tokens", "expires_at", "remaining", "reset_at")
+
+    def __init__(self, tokens: int, expires_at: float, remaining: int, reset_at: float):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+
+class RateLimiter:
+    """Redis GCRA限流器（带本地租借令牌桶）"""
+
+    def __init__(self, max_keys: int = 100000):
+        self._leases = LocalTTLCache(max_size=max_keys, ttl=60)
+        # Redis不可用时的进程内TAT
+        self._local_tats = LocalTTLCache(max_size=max_keys)
+
+    def hit(self, policy: RateLimitPolicy, identity: str) -> RateLimitResult:
+        """记录一次请求并返回判定结果"""
+        key = state_key("ratelimit", policy.name, identity)
+        now = time.monotonic()
+
+        lease = self._leases.get(key)
+        refund = 0
+        if lease is not None:
+            if lease.expires_at > now and lease.tokens > 0:
+                lease.tokens -= 1
+                RATE_LIMIT_DECISIONS.labels(policy.name, "allowed", "lease").inc()
+                return RateLimitResult(
+                    policy,
+                    True,
+                    lease.remaining + lease.tokens,
+                    max(0.0, lease.reset_at - now),
+                )
+            refund = lease.tokens
+            self._leases.pop(key)
+
+        reply = cache.eval_script(
+            GCRA_SCRIPT,
+            keys=[key],
+            args=[
+                policy.emission_interval_ms,
+                policy.period * 1000,
+                policy.lease,
+                refund,
+            ],
+        )
+        source = "redis"
+        if reply is None:
+            reply = self._acquire_local(key, policy, policy.lease, refund)
+            source = "local"
+
+        granted, remaining, retry_after_ms, reset_after_ms = (int(v) for v in reply)
+        if granted < 1:
+            RATE_LIMIT_DECISIONS.labels(policy.name, "denied", source).inc()
+            return RateLimitResult(
+                policy, False, 0, reset_after_ms / 1000, retry_after_ms / 1000
+            )
+
+        if granted > 1:
+            self._leases.set(
+                key,
+                _Lease(
+                    tokens=granted - 1,
+                    expires_at=now + settings.RATE_LIMIT_LEASE_SECONDS,
+                    remaining=remaining,
+                    reset_at=now + reset_after_ms / 1000,
+                ),
+            )
+        RATE_LIMIT_DECISIONS.labels(policy.name, "allowed", source).inc()
+        return RateLimitResult(
+            policy, True, remaining + granted - 1, reset_after_ms / 1000
+        )
+
+    def _acquire_local(
+        self, key: str, policy: RateLimitPolicy, requested: int, refund: int
+    ) -> Tuple[int, int, int, int]:
+        """进程内GCRA，语义与Lua脚本一致"""
+        emission = policy.emission_interval_ms
+        tolerance = policy.period * 1000
+        now = time.monotonic() * 1000
+
+        tat = self._local_tats.get(key) or now
+        tat = max(now, tat - refund * emission)
+        available = math.floor((now + tolerance - tat) / emission)
+        granted = min(requested, available)
+        if granted < 1:
+            self._local_tats.set(key, tat, ttl=(tat - now) / 1000)
+            return (
+                0,
+                0,
+                math.ceil(tat - tolerance + emission - now),
+                math.ceil(tat - now),
+            )
+
+        new_tat = tat + granted * emission
+        self._local_tats.set(key, new_tat, ttl=(new_tat - now) / 1000)
+        return granted, available - granted, 0, math.ceil(new_tat - now)
+
+    def reset(self) -> None:
+        """清空本地状态"""
+        self._leases.clear()
+        self._local_tats.clear()
+
+
+def client_ip(request: Request) -> str:
+    """客户端IP（部署在代理后时需由服务器开启 proxy headers）"""
+    return request.client.host if request.client else "unknown"
+
+
+def client_identity(request: Request) -> str:
+    """限流主体：携带有效令牌时按用户ID，否则按客户端IP"""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        claims = decode_token(token)
+        if claims is not None:
+            return f"user:{claims.user_id}"
+    return f"ip:{client_ip(request)}"
+
+
+# 预置策略
+DEFAULT_POLICY = RateLimitPolicy("default", settings.RATE_LIMIT_PER_MINUTE, 60)
+HOURLY_POLICY = RateLimitPolicy("hourly", settings.RATE_LIMIT_PER_HOUR, 3600)
+AUTH_POLICY = RateLimitPolicy("auth", settings.RATE_LIMIT_AUTH_PER_MINUTE, 60, lease=1)
+
+# 全局限流器
+rate_limiter = RateLimiter()
@@ -0,0 +1,173 @@
+"""
+令牌吊销列表
+
+被吊销的令牌ID（jti）与令牌族ID写入共享缓存，随对应令牌过期。这类键是状态键
+（state_key），不带缓存版本，递增 CACHE_VERSION 或 flush_all 清空缓存数据不会让
+吊销失效。
+
+每个进程维护一个布隆过滤器作为快速路径：未吊销的令牌（绝大多数请求）无需访问
+Redis，只有过滤器判定“可能已吊销”时才查询缓存确认。过滤器由后台任务定期通过
+SCAN重建，其他进程吊销的令牌最迟在一个同步周期后生效；本进程的吊销立即生效。
+
+Redis不可用时吊销记录保存在进程内的专用存储中（按各自的过期时间淘汰），不与通用
+内存缓存共用，不会被其他缓存数据挤出，也不会在切回Redis时被清空。
+"""
+
+import asyncio
+import math
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from loguru import logger
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.utils.bloom import BloomFilter
+from app.utils.cache import cache, state_key
+
+TOKEN_REVOCATION_CHECKS = Counter(
+    "token_revocation_checks_total", "Token revocation checks", ["result"]
+)
+
+
+class TokenRevocationList:
+    """基于共享缓存与布隆过滤器的令牌吊销列表"""
+
+    def __init__(
+        self, capacity: Optional[int] = None, error_rate: Optional[float] = None
+    ):
+        self.capacity = capacity or settings.TOKEN_REVOCATION_BLOOM_CAPACITY
+        self.error_rate = error_rate or settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        # 上次同步开始后本进程新增的吊销，重建过滤器时补入
+        self._recent: Set[str] = set()
+        # Redis不可用时的进程内吊销记录: 令牌ID -> 过期时间（monotonic）
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(token_id: str) -> str:
+        """吊销记录的缓存键"""
+        return state_key("revoked", token_id)
+
+    def claim(self, token_id: str, expires_in: float) -> Optional[bool]:
+        """
+        登记令牌ID为已使用（吊销），记录保留 expires_in 秒，用于一次性令牌的重放检测
+
+        Returns:
+            首次登记返回True，已登记过返回False；共享存储出错时返回None且不做任何
+            记录，调用方应按服务不可用处理，而不是当作重放
+        """
+        expire = max(1, math.ceil(expires_in))
+        if cache.shared:
+            added = cache.add(self._key(token_id), 1, expire=expire)
+            if added is None:
+                return None
+        else:
+            added = self._add_local(token_id, expire)
+        self._remember(token_id)
+        return added
+
+    def revoke(self, token_id: str, expires_in: float) -> bool:
+        """
+        吊销令牌ID，记录保留 expires_in 秒
+
+        共享存储出错时改为写入进程内记录，保证至少在本进程内立即生效。
+
+        Returns:
+            是否为首次吊销
+        """
+        added = self.claim(token_id, expires_in)
+        if added is None:
+            added = self._add_local(token_id, max(1, math.ceil(expires_in)))
+            self._remember(token_id)
+        return added
+
+    def _remember(self, token_id: str) -> None:
+        """加入布隆过滤器，并记录到下次同步"""
+        with self._lock:
+            self._filter.add(token_id)
+            self._recent.add(token_id)
+
+    def _add_local(self, token_id: str, expire: int) -> bool:
+        """写入进程内吊销记录，返回是否为首次吊销"""
+        now = time.monotonic()
+        with self._lock:
+            if self._local.get(token_id, 0) > now:
+                return False
+            self._local[token_id] = now + expire
+            return True
+
+    def _is_revoked_locally(self, token_id: str) -> bool:
+        return self._local.get(token_id, 0) > time.monotonic()
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        """检查任一令牌ID是否已被吊销"""
+        for token_id in token_ids:
+            if not token_id or token_id not in self._filter:
+                continue
+            if self._is_revoked_locally(token_id) or cache.exists(self._key(token_id)):
+                TOKEN_REVOCATION_CHECKS.labels("revoked").inc()
+                return True
+            TOKEN_REVOCATION_CHECKS.labels("false_positive").inc()
+
+        TOKEN_REVOCATION_CHECKS.labels("not_revoked").inc()
+        return False
+
+    def sync(self) -> int:
+        """由共享缓存重建布隆过滤器，返回已吊销的条目数"""
+        with self._lock:
+            self._recent = set()
+
+        rebuilt = BloomFilter(self.capacity, self.error_rate)
+        prefix_length = len(self._key(""))
+        for key in cache.iter_keys(self._key("*")):
+            rebuilt.add(key[prefix_length:])
+
+        with self._lock:
+            now = time.monotonic()
+            self._local = {
+                token_id: deadline
+                for token_id, deadline in self._local.items()
+                if deadline > now
+            }
+            for token_id in (*self._recent, *self._local):
+                rebuilt.add(token_id)
+            self._filter = rebuilt
+
+        if len(rebuilt) > self.capacity:
+            logger.warning(
+                f"吊销令牌数量 {len(rebuilt)} 超出布隆过滤器容量 {self.capacity}，误判率将上升"
+            )
+        return len(rebuilt)
+
+    async def run_sync(self, interval: Optional[float] = None) -> None:
+        """后台定期同步"""
+        interval = interval or settings.TOKEN_REVOCATION_SYNC_SECONDS
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.error(f"同步令牌吊销列表失败: {e}")
+            await asyncio.sleep(interval)
+
+    def start_sync(self) -> None:
+        """启动后台同步任务"""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self.run_sync())
+
+    async def stop_sync(self) -> None:
+        """停止后台同步任务"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+
+# 全局令牌吊销列表
+token_revocations = TokenRevocationList()
@@ -2,20 +2,77 @@
 安全认证相关功能
 """
 
+import hashlib
 import re
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Union
 
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr, validator
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationException
+from app.core.keys import keyring
+from app.core.revocation import token_revocations
+from app.utils.local_cache import LocalTTLCache
+
+
+def build_password_context(
+    scheme: Optional[str] = None,
+    bcrypt_rounds: Optional[int] = None,
+    argon2_time_cost: Optional[int] = None,
+    argon2_memory_cost: Optional[int] = None,
+    argon2_parallelism: Optional[int] = None,
+) -> CryptContext:
+    """
+    按配置创建密码上下文
+
+    当前方案用于新哈希，其他方案仅用于校验并标记为过期。各成本参数只作用于对应方案：
+
+    - bcrypt：bcrypt_rounds 为 log2 轮数（12 即 2^12 轮），低于该值的哈希视为过期，
+      更高的保持不变；
+    - argon2：argon2_time_cost 为迭代次数，低于该值的哈希视为过期；
+      argon2_memory_cost 原样传给 argon2，单位为 KiB（65536 即 64 MiB），
+      与配置不同（无论高低）的哈希都视为过期；argon2_parallelism 为并行线程数，
+      不影响是否过期。
+    """
+    scheme = scheme or settings.PASSWORD_HASH_SCHEME
+    if scheme not in ("bcrypt", "argon2"):
+        raise ValueError(f"不支持的密码哈希方案: {scheme}")
+
+    if scheme == "argon2":
+        from passlib.hash import argon2
+
+        if not argon2.has_backend():
+            raise ValueError("argon2 方案需要安装 argon2-cffi")
+
+    bcrypt_rounds = bcrypt_rounds or settings.PASSWORD_BCRYPT_ROUNDS
+    argon2_time_cost = argon2_time_cost or settings.PASSWORD_ARGON2_TIME_COST
+    argon2_memory_cost = argon2_memory_cost or settings.PASSWORD_ARGON2_MEMORY_COST
+    return CryptContext(
+        schemes=[scheme] + [name for name in ("bcrypt", "argon2") if name != scheme],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=31,
+        argon2__type="ID",
+        argon2__rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism
+        or settings.PASSWORD_ARGON2_PARALLELISM,
+    )
 
 
 # 密码上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_password_context()
+
+# 已验证令牌缓存：令牌摘要 -> 解码后的声明，条目在令牌过期时失效
+verified_tokens = LocalTTLCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
 
 
 class Token(BaseModel):
@@ -33,6 +90,25 @@ class TokenData(BaseModel):
     scopes: list[str] = []
 
 
+class TokenClaims(BaseModel):
+    """已验证的用户令牌声明"""
+
+    user_id: int
+    username: Optional[str] = None
+    token_version: int = 0
+    jti: Optional[str] = None
+    # 令牌族：同一次登录及其后续刷新签发的令牌共享同一族ID
+    family: Optional[str] = None
+    expires_at: Optional[int] = None
+
+    @property
+    def expires_in(self) -> float:
+        """距离过期的秒数"""
+        if self.expires_at is None:
+            return 0
+        return max(0.0, self.expires_at - time.time())
+
+
 class PasswordValidator(BaseModel):
     """密码验证器"""
 
@@ -72,7 +148,9 @@ def get_password_hash(password: str) -> str:
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     """创建访问令牌"""
     if expires_delta:
@@ -82,15 +160,19 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    to_encode = {
+        **(claims or {}),
+        "exp": expire,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+    }
+    return keyring.sign(to_encode)
 
 
 def create_refresh_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     """创建刷新令牌"""
     if expires_delta:
@@ -98,62 +180,106 @@ def create_refresh_token(
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    to_encode = {
+        **(claims or {}),
+        "exp": expire,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+        "type": "refresh",
+    }
+    return keyring.sign(to_encode)
 
 
-def verify_token(token: str, token_type: str = "access") -> Optional[str]:
-    """验证令牌"""
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
+def _token_digest(token: str) -> bytes:
+    """令牌摘要，作为缓存键避免长期持有令牌原文"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
 
-        if username is None:
-            return None
 
-        # 检查令牌类型
-        if token_type == "refresh":
-            if payload.get("type") != "refresh":
-                return None
+def _decode_payload(token: str, check_revocation: bool = True) -> Dict[str, Any]:
+    """
+    校验签名并解码令牌
 
-        return username
+    验证通过的令牌在过期前缓存其声明，重复出现的令牌不再做签名校验；
+    无效令牌不缓存。缓存只替代签名与有效期校验，吊销检查在取得声明后进行，
+    令牌版本检查由调用方完成。
+    """
+    if not settings.TOKEN_CACHE_ENABLED:
+        payload = keyring.decode(token)
+    else:
+        key = _token_digest(token)
+        payload = verified_tokens.get(key)
+        if payload is None:
+            payload = keyring.decode(token)
+            exp = payload.get("exp")
+            if isinstance(exp, (int, float)):
+                verified_tokens.set(key, payload, ttl=exp - time.time())
+
+    if check_revocation and token_revocations.is_revoked(
+        payload.get("jti"), payload.get("fam")
+    ):
+        raise JWTError("令牌已被吊销")
+    return payload
+
+
+def decode_token(
+    token: str, token_type: str = "access", check_revocation: bool = True
+) -> Optional[TokenClaims]:
+    """验证用户令牌并解析声明（sub为用户ID）"""
+    try:
+        payload = _decode_payload(token, check_revocation=check_revocation)
     except JWTError:
         return None
 
+    # 检查令牌类型
+    if token_type == "refresh" and payload.get("type") != "refresh":
+        return None
+
+    try:
+        return TokenClaims(
+            user_id=int(payload["sub"]),
+            username=payload.get("username"),
+            token_version=payload.get("ver", 0),
+            jti=payload.get("jti"),
+            family=payload.get("fam"),
+            expires_at=payload.get("exp"),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
 
-def create_token_pair(subject: Union[str, Any]) -> Token:
-    """创建令牌对（访问令牌和刷新令牌）"""
-    access_token = create_access_token(subject)
-    refresh_token = create_refresh_token(subject)
+def create_token_pair(
+    subject: Union[str, Any],
+    claims: Optional[Dict[str, Any]] = None,
+    family: Optional[str] = None,
+) -> Token:
+    """创建令牌对（访问令牌和刷新令牌），未指定令牌族时开启新的令牌族"""
+    claims = {**(claims or {}), "fam": family or uuid.uuid4().hex}
+    access_token = create_access_token(subject, claims=claims)
+    refresh_token = create_refresh_token(subject, claims=claims)
 
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 
+def create_user_token_pair(user: Any, family: Optional[str] = None) -> Token:
+    """为用户创建令牌对，sub为稳定的用户ID并携带令牌版本"""
+    return create_token_pair(
+        user.id, {"username": user.username, "ver": user.token_version}, family
+    )
+
+
 def generate_password_reset_token(email: str) -> str:
     """生成密码重置令牌"""
     delta = timedelta(hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS)
     now = datetime.utcnow()
     expires = now + delta
     exp = expires.timestamp()
-    encoded_jwt = jwt.encode(
-        {"exp": exp, "nbf": now, "sub": email},
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
-    )
-    return encoded_jwt
+    return keyring.sign({"exp": exp, "nbf": now, "sub": email})
 
 
 def verify_password_reset_token(token: str) -> Optional[str]:
     """验证密码重置令牌"""
     try:
-        decoded_token = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        decoded_token = keyring.decode(token)
         return decoded_token["sub"]
     except JWTError:
         return None
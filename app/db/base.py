@@ -3,7 +3,7 @@ SQLAlchemy ORM 基类
 """
 
 from datetime import datetime
-from typing import Any
+from typing import Any, List
 
 from sqlalchemy import Column, DateTime, Integer, func
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
@@ -34,5 +34,9 @@ class Base:
         """转换为字典"""
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
+    def cache_tags(self) -> List[str]:
+        """写入该记录时需要失效的缓存标签"""
+        return [f"{self.__tablename__}:{self.id}", f"{self.__tablename__}:list"]
+
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}(id={self.id})>"
@@ -0,0 +1,50 @@
+"""
+数据写入后的缓存失效
+
+在flush时收集被写入记录的缓存标签，事务提交后统一按标签失效；
+事务回滚时丢弃收集到的标签。
+"""
+
+from itertools import chain
+from typing import Iterable, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.utils.cache import cache
+
+# 会话info中保存待失效标签的键
+PENDING_TAGS_KEY = "cache_invalidation_tags"
+
+
+def mark_tags_dirty(session: Union[Session, AsyncSession], tags: Iterable[str]) -> None:
+    """
+    登记提交后需要失效的缓存标签
+
+    ORM工作单元之外的写入（如批量UPDATE/DELETE语句）需手动调用
+    """
+    session.info.setdefault(PENDING_TAGS_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tags(session: Session, flush_context) -> None:
+    """收集本次flush写入记录的缓存标签"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        cache_tags = getattr(obj, "cache_tags", None)
+        if cache_tags is not None:
+            mark_tags_dirty(session, cache_tags())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_tags(session: Session) -> None:
+    """事务提交后按标签失效缓存"""
+    tags = session.info.pop(PENDING_TAGS_KEY, None)
+    if tags:
+        cache.invalidate_tags(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tags(session: Session) -> None:
+    """事务回滚后丢弃待失效标签"""
+    session.info.pop(PENDING_TAGS_KEY, None)
@@ -6,7 +6,7 @@ import asyncio
 from loguru import logger
 
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
 from app.db.session import AsyncSessionLocal
 from app.db.base import Base
 from app.db.models.user import User
@@ -27,7 +27,9 @@ async def init_db() -> None:
             logger.info("创建初始超级用户...")
 
             # 创建超级用户
-            hashed_password = get_password_hash(settings.FIRST_SUPERUSER_PASSWORD)
+            hashed_password = await password_hasher.hash(
+                settings.FIRST_SUPERUSER_PASSWORD
+            )
             superuser_obj = User(
                 username="admin",
                 email=settings.FIRST_SUPERUSER_EMAIL,
@@ -76,7 +78,7 @@ async def create_sample_data() -> None:
             ]
 
             for user_data in sample_users:
-                hashed_password = get_password_hash(user_data["password"])
+                hashed_password = await password_hasher.hash(user_data["password"])
                 user_obj = User(
                     username=user_data["username"],
                     email=user_data["email"],
@@ -0,0 +1,163 @@
+"""
+SQL执行统计
+
+在引擎的 before_cursor_execute / after_cursor_execute 事件中记录每条语句的耗时，
+累加到当前上下文的 QueryStats（请求中间件为每个请求创建一个），用于：
+
+- 按路由上报每个请求的语句数与数据库累计耗时（Prometheus 直方图）；
+- 开发环境在响应头中返回语句数与耗时，便于发现 N+1 查询；
+- 超过 DB_SLOW_QUERY_MS 的语句以归一化后的 SQL 指纹记录慢查询日志，
+  同一类查询（参数、IN 列表长度不同）归为同一指纹。
+
+统计作用域可以嵌套，内层记录的语句同时计入外层（测试中的查询预算即基于此）。
+"""
+
+import hashlib
+import re
+import time
+from collections import Counter as TallyCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from loguru import logger
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_REQUEST_DURATION = Histogram(
+    "db_request_duration_seconds",
+    "Cumulative database time per request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_MS"
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\1)+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """归一化SQL：字面量与绑定参数替换为 ?，IN 列表与多行 VALUES 折叠为一项"""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _SPACE.sub(" ", normalized).strip()
+    normalized = _LIST.sub("(?, ...)", normalized)
+    return _ROWS.sub(r"\1, ...", normalized)
+
+
+def fingerprint_id(statement: str) -> str:
+    """SQL指纹的短哈希，便于在日志中检索同一类查询"""
+    return hashlib.sha1(fingerprint(statement).encode("utf-8")).hexdigest()[:12]
+
+
+class QueryStats:
+    """一个统计作用域内执行的语句数与累计耗时"""
+
+    def __init__(
+        self, parent: Optional["QueryStats"] = None, keep_statements: bool = False
+    ):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+    def record(self, statement: str, duration: float) -> None:
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            if stats.statements is not None:
+                stats.statements.append(statement)
+            stats = stats.parent
+
+    def fingerprints(self) -> TallyCounter:
+        """按指纹统计语句数（仅 keep_statements=True 时可用）"""
+        return TallyCounter(
+            fingerprint(statement) for statement in self.statements or ()
+        )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """当前上下文的统计作用域"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    在作用域内统计SQL执行
+
+    作用域内创建的任务继承同一个 QueryStats，需在启动这些任务之前进入作用域。
+    """
+    stats = QueryStats(parent=_current_stats.get(), keep_statements=keep_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany
+) -> None:
+    started = conn.info["query_started"].pop()
+    duration = time.perf_counter() - started
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc()
+        logger.warning(
+            f"慢查询 {duration * 1000:.1f}ms [{fingerprint_id(statement)}] "
+            f"{fingerprint(statement)}"
+        )
+
+
+def _handle_error(context: Any) -> None:
+    # 执行失败时不会触发 after_cursor_execute，弹出对应的开始时间
+    conn = context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """为引擎注册SQL执行统计"""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def observe_request(method: str, route: str, stats: QueryStats) -> None:
+    """上报一个请求的语句数与数据库累计耗时"""
+    DB_REQUEST_QUERIES.labels(method=method, route=route).observe(stats.count)
+    DB_REQUEST_DURATION.labels(method=method, route=route).observe(stats.duration)
@@ -0,0 +1,76 @@
+"""
+数据库迁移
+
+表结构由 migrations/versions 中的 Alembic 迁移管理，在部署时通过
+`python cli.py db_migrate` 在应用之外执行。worker 启动时只读取一次 alembic_version，
+与代码中的最新版本（head）比较，不一致时拒绝启动，避免代码运行在不匹配的表结构上，
+也避免多个 worker 同时建表。
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+class SchemaVersionError(RuntimeError):
+    """数据库迁移版本与代码不一致"""
+
+
+def alembic_config() -> Config:
+    """迁移配置（不依赖当前工作目录与 alembic.ini）"""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """代码中的最新迁移版本"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    """数据库当前的迁移版本，未执行过迁移时返回None"""
+    async with engine.connect() as conn:
+        try:
+            return await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            # alembic_version 表不存在
+            return None
+
+
+async def check_schema_version(engine: AsyncEngine) -> None:
+    """检查数据库已迁移到最新版本，否则抛出 SchemaVersionError"""
+    head = head_revision()
+    current = await current_revision(engine)
+    if current != head:
+        raise SchemaVersionError(
+            f"数据库迁移版本 {current or '（未迁移）'} 与代码版本 {head} 不一致，"
+            "请先执行 python cli.py db_migrate"
+        )
+    logger.info(f"数据库迁移版本: {current}")
+
+
+def upgrade(revision: str = "head") -> None:
+    """执行迁移到指定版本（同步执行，需在事件循环之外调用）"""
+    command.upgrade(alembic_config(), revision)
+
+
+def stamp(revision: str) -> None:
+    """将数据库标记为指定版本而不执行迁移"""
+    command.stamp(alembic_config(), revision)
+
+
+def revision(message: str, autogenerate: bool = True) -> None:
+    """根据模型变化生成新的迁移文件"""
+    command.revision(alembic_config(), message=message, autogenerate=autogenerate)
@@ -1,5 +1,5 @@
 # app/db/models/chat.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -12,7 +12,14 @@ class ChatSession(Base):
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     title = Column(String(200), nullable=False, default="新对话")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    
+    # 会话列表按用户过滤、按更新时间倒序
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_updated_at", user_id, updated_at.desc()),
+    )
     
     # 关联关系
     user = relationship("User", back_populates="chat_sessions")
@@ -31,5 +38,10 @@ class ChatMessage(Base):
     response_time = Column(Float, nullable=True)  # 响应时间（秒）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # 消息历史按会话过滤、按创建时间排序
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", session_id, created_at),
+    )
+    
     # 关联关系
     session = relationship("ChatSession", back_populates="messages")
\ No newline at end of file
@@ -2,9 +2,9 @@
 物品数据模型
 """
 
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -26,5 +26,21 @@ class Item(Base):
     )
     owner = relationship("User", back_populates="items")
 
+    __table_args__ = (
+        # 按所有者过滤并按主键分页
+        Index("ix_item_owner_id_id", "owner_id", "id"),
+        # 活跃物品列表：部分索引只包含活跃物品，条件需与查询中的写法一致
+        Index(
+            "ix_item_active_id",
+            "id",
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
+
+    def cache_tags(self) -> List[str]:
+        """写入物品时同时失效所有者的物品列表缓存"""
+        return [*super().cache_tags(), f"owner:{self.owner_id}:items"]
+
     def __repr__(self) -> str:
         return f"<Item(title='{self.title}', owner_id={self.owner_id})>"
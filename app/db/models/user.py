@@ -36,9 +36,15 @@ class User(Base):
     # 认证信息
     last_login: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     login_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # 令牌版本：停用账号或修改密码时递增，使已签发的令牌失效
+    # 已有数据库需执行迁移 0002_user_token_version 添加该列
+    token_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     # 关系
     items = relationship("Item", back_populates="owner")
+    chat_sessions = relationship("ChatSession", back_populates="user")
 
     def __repr__(self) -> str:
         return f"<User(username='{self.username}', email='{self.email}')>"
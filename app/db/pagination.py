@@ -0,0 +1,144 @@
+"""
+键集（游标）分页
+
+按排序键定位下一页：WHERE (排序键) > (上一页最后一行的排序键) ORDER BY 排序键 LIMIT n+1，
+多取的一行用于判断是否还有下一页。与 OFFSET 分页不同，翻到第N页的代价不随N增长，
+翻页期间插入或删除的数据也不会造成重复或遗漏。
+
+排序规则用字段名元组表示，字段名前加 "-" 为降序；主键总是作为最后一个排序键，
+保证顺序确定。游标是排序规则与最后一行排序键值的 base64url 编码，对客户端不透明。
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Generic, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Date, DateTime, Select, and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.exceptions import ValidationException
+
+T = TypeVar("T")
+
+
+class KeysetPage(NamedTuple, Generic[T]):
+    """一页结果与下一页游标（没有下一页时为None）"""
+
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+def normalize_ordering(ordering: Sequence[str]) -> Tuple[str, ...]:
+    """补上主键作为最后的排序键"""
+    ordering = tuple(ordering)
+    if not any(field.lstrip("-") == "id" for field in ordering):
+        ordering += ("id",)
+    return ordering
+
+
+def _columns(
+    model: Any, ordering: Sequence[str]
+) -> List[Tuple[InstrumentedAttribute, bool]]:
+    """排序规则对应的(列, 是否降序)"""
+    return [
+        (getattr(model, field.lstrip("-")), field.startswith("-")) for field in ordering
+    ]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    """还原排序键值并检查类型与列一致，被篡改的游标不会到达数据库"""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    # bool 是 int 的子类，整数列不接受 true/false
+    if not isinstance(value, python_type) or (
+        isinstance(value, bool) and python_type is not bool
+    ):
+        raise TypeError(f"{column.key}: {value!r}")
+    return value
+
+
+def encode_cursor(obj: Any, ordering: Sequence[str]) -> str:
+    """由一行记录生成指向其后一行的游标"""
+    payload = {
+        "o": ",".join(ordering),
+        "v": [_encode_value(getattr(obj, field.lstrip("-"))) for field in ordering],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(model: Any, cursor: str, ordering: Sequence[str]) -> List[Any]:
+    """解析游标，返回排序键值；游标无效或排序规则不符时抛出 ValidationException"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["o"] != ",".join(ordering) or len(payload["v"]) != len(ordering):
+            raise ValueError(payload["o"])
+        return [
+            _decode_value(column, value)
+            for (column, _), value in zip(
+                _columns(model, ordering), payload["v"], strict=True
+            )
+        ]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValidationException("无效的分页游标") from e
+
+
+def order_by(stmt: Select, model: Any, ordering: Sequence[str]) -> Select:
+    """按排序规则排序"""
+    return stmt.order_by(
+        *(
+            column.desc() if desc else column.asc()
+            for column, desc in _columns(model, ordering)
+        )
+    )
+
+
+def seek(
+    stmt: Select, model: Any, ordering: Sequence[str], values: Sequence[Any]
+) -> Select:
+    """
+    过滤出排在给定排序键值之后的行
+
+    各排序键方向一致时使用行值比较 (a, b) > (x, y)，PostgreSQL 可直接利用复合索引；
+    方向不一致时展开为 a > x OR (a = x AND b > y) ...
+    """
+    columns = _columns(model, ordering)
+    if len(columns) == 1:
+        (column, desc), value = columns[0], values[0]
+        return stmt.where(column < value if desc else column > value)
+
+    directions = {desc for _, desc in columns}
+    if len(directions) == 1:
+        left = tuple_(*(column for column, _ in columns))
+        right = tuple_(*values)
+        return stmt.where(left < right if directions.pop() else left > right)
+
+    clauses = []
+    for index, (column, desc) in enumerate(columns):
+        equal = [
+            prev == value
+            for (prev, _), value in zip(columns[:index], values[:index], strict=True)
+        ]
+        after = column < values[index] if desc else column > values[index]
+        clauses.append(and_(*equal, after))
+    return stmt.where(or_(*clauses))
@@ -0,0 +1,120 @@
+"""
+数据库连接池配置与监控
+
+连接池大小按 worker 数从数据库的最大连接数中分配：每个 worker 的连接上限为
+(DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) / WORKERS，其中约三分之二为常驻连接，
+其余为溢出连接；显式配置 DB_POOL_SIZE / DB_MAX_OVERFLOW 时以配置为准。
+
+借出与溢出连接数在指标采集时读取，获取连接的等待时间与超时由连接池子类记录，
+用于判断连接池是否成为瓶颈。
+"""
+
+import time
+import uuid
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.core.config import settings
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured database pool size", ["pool"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Database connections checked out", ["pool"]
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Database connections opened beyond the pool size", ["pool"]
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a database connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Database connection checkouts that timed out", ["pool"]
+)
+
+
+def _pool_name(pool: Any) -> str:
+    """连接池的监控标签（取 pool_logging_name）"""
+    return getattr(pool, "logging_name", None) or "default"
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录获取连接等待时间的异步队列连接池"""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            DB_POOL_TIMEOUTS.labels(_pool_name(self)).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(_pool_name(self)).observe(time.perf_counter() - started)
+
+
+def pool_limits() -> Dict[str, int]:
+    """按 worker 数推算单个 worker 的常驻连接数与溢出连接数"""
+    budget = max(
+        1,
+        (settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS)
+        // max(1, settings.WORKERS),
+    )
+    pool_size = settings.DB_POOL_SIZE or max(1, budget * 2 // 3)
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if max_overflow is None:
+        max_overflow = max(0, budget - pool_size)
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+
+def engine_options(url: str, name: str = "primary") -> Dict[str, Any]:
+    """create_async_engine 的连接池与驱动参数"""
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {"pool_logging_name": name}
+    if backend == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        **pool_limits(),
+    )
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        if settings.DB_PGBOUNCER:
+            # PgBouncer 事务池模式下连接会在事务间切换，不能使用预编译语句
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+            }
+    return options
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    注册连接池指标
+
+    借出与溢出连接数在采集时读取连接池的实时状态（checkin 事件触发时连接池计数尚未
+    更新，按事件累计会产生偏差）；连接池重建（dispose）后读取的是新连接池。
+    """
+    sync_engine = engine.sync_engine
+    name = _pool_name(sync_engine.pool)
+    if not isinstance(sync_engine.pool, AsyncAdaptedQueuePool):
+        return
+
+    DB_POOL_SIZE.labels(name).set(sync_engine.pool.size())
+    DB_POOL_CHECKED_OUT.labels(name).set_function(lambda: sync_engine.pool.checkedout())
+    DB_POOL_OVERFLOW.labels(name).set_function(
+        lambda: max(0, sync_engine.pool.overflow())
+    )
@@ -2,15 +2,40 @@
 基础仓库类
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from collections import namedtuple
+from datetime import datetime
+from functools import cached_property
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import Select, inspect, insert, select, update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.config import settings
+from app.core.exceptions import ConflictException
+from app.db import pagination
 from app.db.base import Base
+from app.db.cache_invalidation import mark_tags_dirty
+from app.db.pagination import KeysetPage
+from app.utils.cache import cache, make_key, stable_digest
+from app.utils.helpers import chunked
 
+# 单条语句的绑定参数上限（SQLite 3.32+ 为32766，PostgreSQL 为32767）
+MAX_BIND_PARAMS = 32766
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -20,6 +45,12 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """基础仓库类"""
 
+    # 列表排序规则，字段名前加 "-" 为降序；主键自动作为最后一个排序键
+    ordering: Tuple[str, ...] = ("id",)
+    # 列表查询只读取这些列（通常为列表响应模型的字段，需包含排序键），结果为只含这些
+    # 字段的行元组而非ORM对象；为None时列表查询返回完整的ORM对象
+    row_fields: Optional[Tuple[str, ...]] = None
+
     def __init__(self, model: Type[ModelType]):
         """
         初始化仓库
@@ -29,59 +60,414 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    @property
+    def cache_enabled(self) -> bool:
+        """是否启用读穿透缓存（仅在多worker共享的缓存后端上启用）"""
+        return settings.REPOSITORY_CACHE_ENABLED and cache.shared
+
+    @cached_property
+    def _column_keys(self) -> tuple:
+        """模型的列属性名"""
+        return tuple(attr.key for attr in inspect(self.model).column_attrs)
+
+    @cached_property
+    def _schema_digest(self) -> str:
+        """列结构摘要，模型字段或列表投影变化后旧缓存自动失效"""
+        return stable_digest((self._column_keys, self.row_fields))[:8]
+
+    @cached_property
+    def row_type(self) -> Type[tuple]:
+        """
+        列表查询的行类型
+
+        具名元组没有实例字典（__slots__ 为空），不进入会话的标识映射，也不做属性变更
+        追踪；响应模型按属性读取字段，可直接序列化。
+        """
+        return namedtuple(f"{self.model.__name__}Row", self.row_fields)
+
+    def _list_select(self) -> Select:
+        """列表查询的 SELECT：配置了 row_fields 时只查询这些列"""
+        if self.row_fields is None:
+            return select(self.model)
+        return select(*(getattr(self.model, field) for field in self.row_fields))
+
+    def _cache_key(self, *parts: Any) -> str:
+        """生成仓库缓存键"""
+        return make_key("repo", self.model.__tablename__, self._schema_digest, *parts)
+
+    def _snapshot(self, obj: ModelType) -> tuple:
+        """提取记录的列值用于缓存"""
+        return tuple(getattr(obj, key) for key in self._column_keys)
+
+    async def _restore(self, db: AsyncSession, values: tuple) -> ModelType:
+        """由缓存的列值还原记录，并在不发出SQL的情况下并入当前会话"""
+        obj = self.model(**dict(zip(self._column_keys, values, strict=True)))
+        make_transient_to_detached(obj)
+        return await db.merge(obj, load=False)
+
+    async def _fetch_many(
+        self,
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        key_parts: Sequence[Any],
+        tags: Sequence[str],
+    ) -> List[Any]:
+        """
+        执行列表查询，启用缓存时按标签读穿透
+
+        配置了 row_fields 时返回 row_type 行元组（stmt 应由 _list_select 构造），
+        缓存中直接保存行的值，命中时无需并入会话。
+        """
+        if self.row_fields is not None:
+            return await self._fetch_rows(db, stmt, key_parts=key_parts, tags=tags)
+
+        if not self.cache_enabled:
+            result = await db.execute(stmt)
+            return result.scalars().all()
+
+        key = self._cache_key(*key_parts)
+        snapshots = cache.get(key)
+        if snapshots is not None:
+            return [await self._restore(db, values) for values in snapshots]
+
+        result = await db.execute(stmt)
+        objs = result.scalars().all()
+        cache.set_with_tags(
+            key,
+            tuple(self._snapshot(obj) for obj in objs),
+            tags,
+            settings.REPOSITORY_CACHE_EXPIRE_SECONDS,
+        )
+        return objs
+
+    async def _fetch_rows(
+        self,
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        key_parts: Sequence[Any],
+        tags: Sequence[str],
+    ) -> List[tuple]:
+        """执行投影查询，结果为 row_type 行元组"""
+        make_row = self.row_type._make
+        if self.cache_enabled:
+            key = self._cache_key(*key_parts)
+            snapshots = cache.get(key)
+            if snapshots is not None:
+                return [make_row(values) for values in snapshots]
+
+        result = await db.execute(stmt)
+        rows = [make_row(values) for values in result.all()]
+        if self.cache_enabled:
+            cache.set_with_tags(
+                key,
+                tuple(tuple(row) for row in rows),
+                tags,
+                settings.REPOSITORY_CACHE_EXPIRE_SECONDS,
+            )
+        return rows
+
+    @cached_property
+    def _ordering(self) -> Tuple[str, ...]:
+        """补全主键后的排序规则"""
+        return pagination.normalize_ordering(self.ordering)
+
+    def _ordered(self, stmt: Select) -> Select:
+        """按排序规则排序，保证分页结果确定"""
+        return pagination.order_by(stmt, self.model, self._ordering)
+
+    def cursor_for(self, obj: Any) -> str:
+        """生成指向该记录之后的游标"""
+        return pagination.encode_cursor(obj, self._ordering)
+
+    def next_cursor(self, objs: Sequence[Any], limit: int) -> Optional[str]:
+        """
+        页码分页结果满页时生成下一页游标，客户端可由此切换到游标分页
+
+        页码分页同样按排序规则排序，游标与 get_page 等键集分页方法通用。
+        """
+        if objs and len(objs) == limit:
+            return self.cursor_for(objs[-1])
+        return None
+
+    async def _fetch_page(
+        self,
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        cursor: Optional[str],
+        limit: int,
+        key_parts: Sequence[Any],
+        tags: Sequence[str],
+    ) -> KeysetPage:
+        """
+        键集分页查询
+
+        从游标位置向后读取 limit+1 行，多出的一行表示还有下一页；
+        cursor 为空时从第一页开始。
+        """
+        if cursor:
+            values = pagination.decode_cursor(self.model, cursor, self._ordering)
+            stmt = pagination.seek(stmt, self.model, self._ordering, values)
+
+        objs = await self._fetch_many(
+            db,
+            self._ordered(stmt).limit(limit + 1),
+            key_parts=(*key_parts, "after", cursor or "", limit),
+            tags=tags,
+        )
+        items = list(objs[:limit])
+        next_cursor = self.cursor_for(items[-1]) if len(objs) > limit else None
+        return KeysetPage(items, next_cursor)
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """根据ID获取记录"""
+        if self.cache_enabled:
+            key = self._cache_key("get", id)
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return await self._restore(db, snapshot)
+
         result = await db.execute(select(self.model).where(self.model.id == id))
-        return result.scalar_one_or_none()
+        obj = result.scalar_one_or_none()
+
+        if obj is not None and self.cache_enabled:
+            cache.set_with_tags(
+                key,
+                self._snapshot(obj),
+                [f"{self.model.__tablename__}:{id}"],
+                settings.REPOSITORY_CACHE_EXPIRE_SECONDS,
+            )
+        return obj
 
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[ModelType]:
-        """获取多条记录"""
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
-        return result.scalars().all()
+    ) -> List[Any]:
+        """获取多条记录（配置了 row_fields 时为行元组）"""
+        return await self._fetch_many(
+            db,
+            self._ordered(self._list_select()).offset(skip).limit(limit),
+            key_parts=("list", skip, limit),
+            tags=[f"{self.model.__tablename__}:list"],
+        )
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        """创建记录"""
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
+    async def get_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> KeysetPage:
+        """按游标获取一页记录"""
+        return await self._fetch_page(
+            db,
+            self._list_select(),
+            cursor=cursor,
+            limit=limit,
+            key_parts=("page",),
+            tags=[f"{self.model.__tablename__}:list"],
+        )
+
+    async def _insert(self, db: AsyncSession, values: Dict[str, Any]) -> ModelType:
+        """
+        插入记录并提交
+
+        INSERT ... RETURNING 一次往返写入并取回记录（含主键与默认值），提交后无需再
+        refresh；应用的会话均不在提交时过期对象（expire_on_commit=False）。
+        """
+        result = await db.scalars(
+            insert(self.model).values(**values).returning(self.model)
+        )
+        db_obj = result.one()
+        # Core INSERT 不经过ORM工作单元，需手动登记失效标签
+        mark_tags_dirty(db, db_obj.cache_tags())
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """创建记录"""
+        return await self._insert(db, jsonable_encoder(obj_in))
+
+    def _changed_values(
+        self, db_obj: ModelType, update_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """与记录当前值对比，返回实际变化的列（未加载的列视为变化）"""
+        loaded = inspect(db_obj).dict
+        return {
+            field: value
+            for field, value in update_data.items()
+            if field in self._column_keys
+            and (field not in loaded or loaded[field] != value)
+        }
+
+    def _version_clause(self, db: AsyncSession, expected_updated_at: datetime):
+        """乐观并发检查条件：记录的 updated_at 仍为客户端读取时的值"""
+        column = self.model.updated_at
+        if db.bind.dialect.name == "sqlite":
+            # SQLite 中 CURRENT_TIMESTAMP 写入的文本不含微秒，需按时间值而非文本比较
+            return func.julianday(column) == func.julianday(expected_updated_at)
+        return column == expected_updated_at
+
     async def update(
         self,
         db: AsyncSession,
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        expected_updated_at: Optional[datetime] = None,
     ) -> ModelType:
-        """更新记录"""
-        obj_data = jsonable_encoder(db_obj)
+        """
+        更新记录
+
+        只写入与当前值不同的列，UPDATE ... RETURNING 一次往返写入并取回更新后的
+        记录（含 updated_at），会话中的同一对象随之刷新；没有变化时不写入，提供了
+        expected_updated_at 时只查询一次版本。
+
+        Args:
+            expected_updated_at: 客户端读取记录时的 updated_at，提供时做乐观并发检查，
+                记录已被他人修改则抛出 ConflictException；检查精度取决于数据库的
+                时间戳精度（SQLite 为秒级）
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
 
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        values = self._changed_values(db_obj, update_data)
+        if not values:
+            if expected_updated_at is not None:
+                # 没有需要写入的列时同样检查版本，过期的请求不能当作成功
+                current = await db.scalar(
+                    select(self.model.id).where(
+                        self.model.id == db_obj.id,
+                        self._version_clause(db, expected_updated_at),
+                    )
+                )
+                if current is None:
+                    raise ConflictException(
+                        "记录已被修改，请刷新后重试", error_code="STALE_VERSION"
+                    )
+            return db_obj
 
-        db.add(db_obj)
+        stmt = update(self.model).where(self.model.id == db_obj.id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(self._version_clause(db, expected_updated_at))
+        result = await db.scalars(
+            stmt.values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        updated = result.one_or_none()
+        if updated is None:
+            # 未匹配到行，没有写入任何数据
+            raise ConflictException(
+                "记录已被修改，请刷新后重试", error_code="STALE_VERSION"
+            )
+
+        mark_tags_dirty(db, updated.cache_tags())
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return updated
 
-    async def delete(self, db: AsyncSession, *, id: int) -> ModelType:
-        """删除记录"""
-        result = await db.execute(select(self.model).where(self.model.id == id))
-        obj = result.scalar_one_or_none()
-        if obj:
-            await db.delete(obj)
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        """删除记录，DELETE ... RETURNING 一次往返删除并取回被删除的记录"""
+        result = await db.scalars(
+            delete(self.model).where(self.model.id == id).returning(self.model)
+        )
+        obj = result.one_or_none()
+        if obj is not None:
+            mark_tags_dirty(db, obj.cache_tags())
             await db.commit()
         return obj
 
+    def _chunk_size(self, columns: int) -> int:
+        """单条语句处理的行数，不超过绑定参数上限"""
+        return max(1, min(settings.BULK_CHUNK_SIZE, MAX_BIND_PARAMS // max(1, columns)))
+
+    def _id_tags(self, ids: Iterable[Any]) -> List[str]:
+        """按ID写入记录时需要失效的缓存标签"""
+        table = self.model.__tablename__
+        return [f"{table}:list", *(f"{table}:{id}" for id in ids)]
+
+    async def bulk_create(
+        self, db: AsyncSession, *, rows: Sequence[Dict[str, Any]]
+    ) -> List[ModelType]:
+        """
+        批量创建记录
+
+        按块执行多行 INSERT ... RETURNING，一次往返插入一块并取回记录（含主键与默认值）；
+        所有块在同一事务中提交。
+        """
+        if not rows:
+            return []
+
+        objs: List[ModelType] = []
+        columns = max(len(row) for row in rows) + 2  # created_at / updated_at
+        for chunk in chunked(rows, self._chunk_size(columns)):
+            result = await db.scalars(insert(self.model).returning(self.model), chunk)
+            objs.extend(result.all())
+
+        # Core INSERT 不经过ORM工作单元，需手动登记失效标签
+        mark_tags_dirty(db, (tag for obj in objs for tag in obj.cache_tags()))
+        await db.commit()
+        return sorted(objs, key=lambda obj: obj.id)
+
+    async def bulk_update(
+        self,
+        db: AsyncSession,
+        *,
+        rows: Sequence[Dict[str, Any]],
+        tags: Iterable[str] = (),
+    ) -> List[ModelType]:
+        """
+        按主键批量更新记录，rows 中每项须包含 id
+
+        每块以 executemany 执行 UPDATE ... WHERE id = ?，之后在同一事务中（主库上）
+        查询取回更新后的记录再提交。tags 为按ID无法推断的额外失效标签。
+        """
+        if not rows:
+            return []
+
+        ids = [row["id"] for row in rows]
+        # 仅含主键的行无需更新，但仍返回其记录
+        changes = [row for row in rows if len(row) > 1]
+        for chunk in chunked(changes, settings.BULK_CHUNK_SIZE):
+            await db.execute(update(self.model), chunk)
+
+        objs: List[ModelType] = []
+        for chunk in chunked(ids, self._chunk_size(1)):
+            result = await db.scalars(
+                select(self.model)
+                .where(self.model.id.in_(chunk))
+                .execution_options(populate_existing=True)
+            )
+            objs.extend(result.all())
+
+        mark_tags_dirty(db, [*self._id_tags(ids), *tags])
+        await db.commit()
+        return sorted(objs, key=lambda obj: obj.id)
+
+    async def bulk_delete(
+        self, db: AsyncSession, *, ids: Sequence[Any], tags: Iterable[str] = ()
+    ) -> int:
+        """
+        按主键批量删除记录，返回删除的行数
+
+        按块执行 DELETE ... WHERE id IN (...)，所有块在同一事务中提交。
+        tags 为按ID无法推断的额外失效标签。
+        """
+        if not ids:
+            return 0
+
+        deleted = 0
+        for chunk in chunked(ids, self._chunk_size(1)):
+            result = await db.execute(
+                delete(self.model)
+                .where(self.model.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+
+        mark_tags_dirty(db, [*self._id_tags(ids), *tags])
+        await db.commit()
+        return deleted
+
     async def count(self, db: AsyncSession) -> int:
         """统计记录数量"""
         result = await db.execute(select(func.count(self.model.id)))
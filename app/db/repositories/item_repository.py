@@ -2,53 +2,133 @@
 物品仓库类
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.item import Item
+from app.db.pagination import KeysetPage
 from app.db.repositories.base_repository import BaseRepository
+from app.utils.helpers import chunked
 from app.schemas.item import ItemCreate, ItemUpdate
 
 
 class ItemRepository(BaseRepository[Item, ItemCreate, ItemUpdate]):
     """物品仓库"""
 
+    # 列表只读取响应模型（schemas.item.Item）的字段
+    row_fields = (
+        "id",
+        "title",
+        "description",
+        "is_active",
+        "owner_id",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(self):
         super().__init__(Item)
 
     async def get_by_owner(
         self, db: AsyncSession, *, owner_id: int, skip: int = 0, limit: int = 100
-    ) -> List[Item]:
+    ) -> List[Any]:
         """根据所有者获取物品列表"""
-        result = await db.execute(
-            select(Item).where(Item.owner_id == owner_id).offset(skip).limit(limit)
+        return await self._fetch_many(
+            db,
+            self._ordered(self._list_select().where(Item.owner_id == owner_id))
+            .offset(skip)
+            .limit(limit),
+            key_parts=("owner", owner_id, skip, limit),
+            tags=[f"owner:{owner_id}:items"],
         )
-        return result.scalars().all()
 
     async def get_active_items(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[Item]:
+    ) -> List[Any]:
         """获取活跃的物品列表"""
-        result = await db.execute(
-            select(Item).where(Item.is_active == True).offset(skip).limit(limit)
+        return await self._fetch_many(
+            db,
+            self._ordered(self._list_select().where(Item.is_active == True))
+            .offset(skip)
+            .limit(limit),
+            key_parts=("active", skip, limit),
+            tags=["item:list"],
+        )
+
+    async def get_page_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> KeysetPage:
+        """按游标获取所有者的物品"""
+        return await self._fetch_page(
+            db,
+            self._list_select().where(Item.owner_id == owner_id),
+            cursor=cursor,
+            limit=limit,
+            key_parts=("owner_page", owner_id),
+            tags=[f"owner:{owner_id}:items"],
+        )
+
+    async def get_active_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> KeysetPage:
+        """按游标获取活跃的物品"""
+        return await self._fetch_page(
+            db,
+            self._list_select().where(Item.is_active == True),
+            cursor=cursor,
+            limit=limit,
+            key_parts=("active_page",),
+            tags=["item:list"],
         )
-        return result.scalars().all()
 
     async def create_with_owner(
         self, db: AsyncSession, *, obj_in: ItemCreate, owner_id: int
     ) -> Item:
         """创建物品（指定所有者）"""
-        db_obj = Item(
-            title=obj_in.title,
-            description=obj_in.description,
-            owner_id=owner_id,
+        return await self._insert(
+            db,
+            {
+                "title": obj_in.title,
+                "description": obj_in.description,
+                "owner_id": owner_id,
+            },
+        )
+
+    async def get_owner_ids(
+        self, db: AsyncSession, *, ids: Sequence[int], lock: bool = False
+    ) -> Dict[int, int]:
+        """
+        查询物品的所有者，返回 {物品ID: 所有者ID}，不存在的物品不在结果中
+
+        Args:
+            lock: 以 SELECT ... FOR UPDATE 锁定这些行直到事务结束（在主库执行），
+                保证检查所有者之后、同一事务中的写入之前所有者不会被并发修改或删除
+        """
+        owners: Dict[int, int] = {}
+        for chunk in chunked(ids, self._chunk_size(1)):
+            stmt = select(Item.id, Item.owner_id).where(Item.id.in_(chunk))
+            if lock:
+                # 按主键顺序加锁，避免两个批量操作交叉加锁而死锁
+                stmt = stmt.order_by(Item.id).with_for_update()
+            result = await db.execute(stmt)
+            owners.update(result.all())
+        return owners
+
+    async def bulk_create_with_owner(
+        self, db: AsyncSession, *, objs_in: Sequence[ItemCreate], owner_id: int
+    ) -> List[Item]:
+        """批量创建物品（指定所有者）"""
+        return await self.bulk_create(
+            db,
+            rows=[{**obj_in.model_dump(), "owner_id": owner_id} for obj_in in objs_in],
         )
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
 
 
 # 创建全局仓库实例
@@ -2,21 +2,45 @@
 用户仓库类
 """
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.db.cache_invalidation import mark_tags_dirty
 from app.db.models.user import User
 from app.db.repositories.base_repository import BaseRepository
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.cache import cache
+from app.utils.local_cache import LocalTTLCache
 
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     """用户仓库"""
 
+    # 列表只读取响应模型（schemas.user.User）的字段，不读取密码哈希、简介等列
+    row_fields = (
+        "id",
+        "username",
+        "email",
+        "full_name",
+        "is_active",
+        "is_superuser",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(self):
         super().__init__(User)
+        # 认证主体一级缓存：user_id -> (缓存键, 列值)
+        self._principals = LocalTTLCache(
+            max_size=settings.PRINCIPAL_CACHE_LOCAL_MAX_SIZE,
+            ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+        )
 
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         """根据邮箱获取用户"""
@@ -34,31 +58,153 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         self, db: AsyncSession, *, obj_in: UserCreate, hashed_password: str
     ) -> User:
         """创建用户（带密码哈希）"""
-        db_obj = User(
-            username=obj_in.username,
-            email=obj_in.email,
-            hashed_password=hashed_password,
-            full_name=obj_in.full_name,
-            is_superuser=obj_in.is_superuser,
+        return await self._insert(
+            db,
+            {
+                "username": obj_in.username,
+                "email": obj_in.email,
+                "hashed_password": hashed_password,
+                "full_name": obj_in.full_name,
+                "is_superuser": obj_in.is_superuser,
+            },
         )
-        db.add(db_obj)
+
+    async def find_conflict(
+        self, db: AsyncSession, *, username: str, email: str
+    ) -> Optional[str]:
+        """
+        一次查询检查用户名与邮箱是否已被占用
+
+        Returns:
+            冲突的字段（"username" 或 "email"），均未占用时返回None
+        """
+        result = await db.execute(
+            select(User.username, User.email)
+            .where(or_(User.username == username, User.email == email))
+            .limit(2)
+        )
+        rows = result.all()
+        if any(row.username == username for row in rows):
+            return "username"
+        if rows:
+            return "email"
+        return None
+
+    async def insert_unique(
+        self, db: AsyncSession, *, values: Dict[str, Any]
+    ) -> Optional[User]:
+        """
+        插入用户并返回新记录，用户名或邮箱冲突时返回None
+
+        PostgreSQL 与 SQLite 使用 INSERT ... ON CONFLICT DO NOTHING RETURNING，
+        一次往返完成插入并取回记录；其他数据库插入后捕获唯一约束错误。
+        """
+        dialect = db.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = (
+                postgresql.insert if dialect == "postgresql" else sqlite.insert
+            )
+            stmt = (
+                dialect_insert(User)
+                .values(**values)
+                .on_conflict_do_nothing()
+                .returning(User)
+            )
+            user = (await db.scalars(stmt)).first()
+        else:
+            user = User(**values)
+            db.add(user)
+            try:
+                await db.flush()
+            except IntegrityError:
+                await db.rollback()
+                return None
+
+        if user is None:
+            await db.rollback()
+            return None
+
+        # Core INSERT 不经过ORM工作单元，需手动登记失效标签
+        mark_tags_dirty(db, user.cache_tags())
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return user
+
+    async def update_password_hash(
+        self, db: AsyncSession, *, user_id: int, old_hash: str, new_hash: str
+    ) -> bool:
+        """
+        升级密码哈希（密码本身不变）
+
+        仅当库中仍是旧哈希时更新，避免覆盖并发的密码修改；不递增令牌版本，也不修改 updated_at。
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        mark_tags_dirty(db, [f"user:{user_id}"])
+        await db.commit()
+        return result.rowcount == 1
 
     async def authenticate(
         self, db: AsyncSession, *, username: str, password: str
     ) -> Optional[User]:
         """用户认证"""
-        from app.core.security import verify_password
-
         user = await self.get_by_username(db, username=username)
         if not user:
+            await password_hasher.verify_dummy(password)
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
+    async def get_principal(
+        self, db: AsyncSession, *, user_id: int, token_version: int
+    ) -> Optional[User]:
+        """
+        获取令牌对应的认证主体
+
+        依次查找进程内缓存、共享缓存与数据库（主键查询），缓存键包含令牌版本；
+        用户不存在或令牌版本已过期时返回None。
+        """
+        if not settings.PRINCIPAL_CACHE_ENABLED:
+            user = await self.get(db, id=user_id)
+            if user is None or user.token_version != token_version:
+                return None
+            return user
+
+        key = self._cache_key("principal", user_id, token_version)
+        entry = self._principals.get(user_id)
+        values = entry[1] if entry is not None and entry[0] == key else None
+        if values is None and cache.shared:
+            values = cache.get(key)
+
+        if values is not None:
+            self._principals.set(user_id, (key, values))
+            return await self._restore(db, values)
+
+        user = await self.get(db, id=user_id)
+        if user is None or user.token_version != token_version:
+            return None
+
+        values = self._snapshot(user)
+        self._principals.set(user_id, (key, values))
+        if cache.shared:
+            # 用户记录的任何写入都会在提交后按该标签失效共享缓存
+            cache.set_with_tags(
+                key,
+                values,
+                [f"{User.__tablename__}:{user_id}"],
+                settings.PRINCIPAL_CACHE_EXPIRE_SECONDS,
+            )
+        return user
+
+    def invalidate_principal(self, user_id: int) -> None:
+        """失效用户的认证主体缓存（其他进程的一级缓存随TTL过期）"""
+        self._principals.pop(user_id)
+        cache.invalidate_tags(f"{User.__tablename__}:{user_id}")
+
     async def is_active(self, user: User) -> bool:
         """检查用户是否激活"""
         return user.is_active
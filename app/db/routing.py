@@ -0,0 +1,246 @@
+"""
+读写分离
+
+会话按语句选择连接：写入（INSERT/UPDATE/DELETE、SELECT ... FOR UPDATE、flush）
+发往主库，其余查询轮询发往健康的只读副本。为保证读到自己的写入：
+
+- 会话内一旦写入，之后的查询都发往主库；
+- 写入提交后，同一主体（用户或IP）在 DB_REPLICA_STICKY_SECONDS 内的请求都使用主库；
+- 非 GET/HEAD 请求整个会话使用主库。
+
+后台任务定期检查副本的连通性与复制延迟，不可用或延迟超出 DB_REPLICA_MAX_LAG_SECONDS
+的副本暂停使用，没有可用副本时全部回落到主库。未配置副本时所有语句直接使用主库。
+"""
+
+import asyncio
+import itertools
+from typing import Any, List, Optional, Sequence
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete, Insert, Update
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.config import settings
+from app.db.instrumentation import instrument_queries
+from app.db.pool import engine_options, instrument_pool
+from app.utils.cache import cache, make_key
+from app.utils.local_cache import LocalTTLCache
+
+DB_ROUTED_STATEMENTS = Counter(
+    "db_routed_statements_total", "Statements routed by target", ["target"]
+)
+DB_REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replica replication lag", ["replica"])
+DB_REPLICA_HEALTHY = Gauge(
+    "db_replica_healthy", "Whether the replica is used for reads", ["replica"]
+)
+
+# 会话info中的标记
+USE_PRIMARY_KEY = "routing_use_primary"
+WROTE_KEY = "routing_wrote"
+STICKY_KEY = "routing_sticky_key"
+
+# 副本复制延迟（秒）；WAL已全部回放时为0，避免主库空闲时误判
+POSTGRES_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class Replica:
+    """只读副本及其健康状态"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag = 0.0
+
+
+class ReplicaSet:
+    """主库与只读副本"""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        max_lag: Optional[float] = None,
+        sticky_seconds: Optional[float] = None,
+    ):
+        self.primary = primary
+        self.replicas = [
+            Replica(f"replica{index}", engine)
+            for index, engine in enumerate(replicas, start=1)
+        ]
+        self.max_lag = (
+            settings.DB_REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        )
+        self.sticky_seconds = sticky_seconds or settings.DB_REPLICA_STICKY_SECONDS
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._sticky = LocalTTLCache(ttl=self.sticky_seconds)
+        self._health_task: Optional[asyncio.Task] = None
+        for replica in self.replicas:
+            DB_REPLICA_HEALTHY.labels(replica.name).set(1)
+
+    @property
+    def enabled(self) -> bool:
+        """是否配置了副本"""
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """轮询选择健康的副本，没有时返回None"""
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def _sticky_key(self, identity: str) -> str:
+        """读写粘滞的缓存键"""
+        return make_key("db_sticky", identity)
+
+    def mark_sticky(self, identity: str) -> None:
+        """主体写入后的一段时间内读取主库"""
+        key = self._sticky_key(identity)
+        self._sticky.set(key, True)
+        cache.set(key, 1, expire=max(1, round(self.sticky_seconds)))
+
+    def is_sticky(self, identity: str) -> bool:
+        """主体是否处于写后读取主库的窗口内"""
+        key = self._sticky_key(identity)
+        return bool(self._sticky.get(key)) or cache.exists(key)
+
+    def prepare(
+        self,
+        session: AsyncSession,
+        *,
+        read_only: bool = True,
+        identity: Optional[str] = None,
+    ) -> None:
+        """按请求设置会话路由：非只读请求或处于粘滞窗口的主体使用主库"""
+        if not self.enabled:
+            return
+        if identity:
+            session.info[STICKY_KEY] = identity
+        if not read_only or (identity and self.is_sticky(identity)):
+            session.info[USE_PRIMARY_KEY] = True
+
+    async def _measure_lag(self, replica: Replica) -> float:
+        """查询副本复制延迟"""
+        async with replica.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(await conn.scalar(text(POSTGRES_LAG_QUERY)) or 0)
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    async def check_health(self) -> None:
+        """检查各副本的连通性与复制延迟"""
+        for replica in self.replicas:
+            try:
+                replica.lag = await self._measure_lag(replica)
+                healthy = replica.lag <= self.max_lag
+            except Exception as e:
+                logger.warning(f"只读副本 {replica.name} 不可用: {e}")
+                healthy = False
+
+            if healthy != replica.healthy:
+                state = (
+                    "恢复使用" if healthy else f"暂停使用（延迟 {replica.lag:.1f}s）"
+                )
+                logger.warning(f"只读副本 {replica.name} {state}")
+            replica.healthy = healthy
+            DB_REPLICA_LAG.labels(replica.name).set(replica.lag)
+            DB_REPLICA_HEALTHY.labels(replica.name).set(1 if healthy else 0)
+
+    async def run_health_checks(self, interval: Optional[float] = None) -> None:
+        """后台定期检查"""
+        interval = interval or settings.DB_REPLICA_HEALTH_CHECK_SECONDS
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    def start_health_checks(self) -> None:
+        """启动后台检查任务"""
+        if self.enabled and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self.run_health_checks())
+
+    async def stop_health_checks(self) -> None:
+        """停止后台检查任务"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def dispose(self) -> None:
+        """关闭副本连接池"""
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def _is_write(clause: Any) -> bool:
+    """语句是否需要在主库执行"""
+    if isinstance(clause, (Insert, Update, Delete, TextClause)):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """按语句在主库与只读副本间路由的会话"""
+
+    def __init__(
+        self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any
+    ):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        replicas = self.replicas
+        if replicas is None or not replicas.enabled:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self._flushing or _is_write(clause):
+            self.info[USE_PRIMARY_KEY] = True
+            self.info[WROTE_KEY] = True
+        if not self.info.get(USE_PRIMARY_KEY):
+            replica = replicas.choose()
+            if replica is not None:
+                DB_ROUTED_STATEMENTS.labels("replica").inc()
+                return replica.engine.sync_engine
+
+        DB_ROUTED_STATEMENTS.labels("primary").inc()
+        return replicas.primary.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _mark_sticky(session: RoutingSession) -> None:
+    """写入提交后开启该主体的读写粘滞窗口"""
+    if session.info.pop(WROTE_KEY, False) and session.info.get(STICKY_KEY):
+        session.replicas.mark_sticky(session.info[STICKY_KEY])
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_write(session: RoutingSession) -> None:
+    """回滚的写入不开启粘滞窗口"""
+    session.info.pop(WROTE_KEY, None)
+
+
+def create_replica_engines(urls: List[str], **engine_kwargs: Any) -> List[AsyncEngine]:
+    """按URL列表创建副本引擎"""
+    engines = []
+    for index, url in enumerate(urls, start=1):
+        engine = create_async_engine(
+            url, **engine_kwargs, **engine_options(url, name=f"replica{index}")
+        )
+        instrument_pool(engine)
+        instrument_queries(engine)
+        engines.append(engine)
+    return engines
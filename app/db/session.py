@@ -4,33 +4,56 @@
 
 from typing import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.rate_limit import client_identity
+from app.db import cache_invalidation  # noqa: F401  注册写入后的缓存失效钩子
+from app.db.instrumentation import instrument_queries
+from app.db.pool import engine_options, instrument_pool
+from app.db.routing import ReplicaSet, RoutingSession, create_replica_engines
 
 # 创建异步数据库引擎
 engine = create_async_engine(
     str(settings.DATABASE_URL),  # 转换为字符串
     echo=settings.DEBUG,
     future=True,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    **engine_options(str(settings.DATABASE_URL)),
+)
+instrument_pool(engine)
+instrument_queries(engine)
+
+# 只读副本
+replica_set = ReplicaSet(
+    engine,
+    create_replica_engines(
+        settings.DATABASE_REPLICA_URLS, echo=settings.DEBUG, future=True
+    ),
 )
 
 # 创建异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False,
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """获取数据库会话"""
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """获取数据库会话（GET/HEAD 请求的查询可发往只读副本）"""
     async with AsyncSessionLocal() as session:
+        if replica_set.enabled:
+            replica_set.prepare(
+                session,
+                read_only=request.method in ("GET", "HEAD"),
+                identity=client_identity(request),
+            )
         try:
             yield session
         finally:
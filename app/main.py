@@ -2,6 +2,7 @@
 FastAPI应用主入口文件
 """
 
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -14,19 +15,19 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from loguru import logger
 from prometheus_client import Counter, Histogram, generate_latest
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.exceptions import CustomHTTPException
+from app.core.hashing import password_hasher
+from app.core.keys import keyring
 from app.core.logging import setup_logging
-from app.db.base import Base
-from app.db.session import engine
-
-# 初始化速率限制器
-limiter = Limiter(key_func=get_remote_address)
+from app.core.revocation import token_revocations
+from app.db.instrumentation import observe_request, track_queries
+from app.db.migrations import check_schema_version
+from app.db.session import engine, replica_set
+from app.services.login_activity import login_activity
+from app.utils.cache import cache
 
 # Prometheus metrics
 REQUEST_COUNT = Counter(
@@ -43,15 +44,35 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # 启动时执行
     logger.info("应用启动中...")
 
-    # 创建数据库表
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # 表结构由迁移管理（cli.py db_migrate），启动时只核对迁移版本
+    if settings.DB_SCHEMA_CHECK:
+        await check_schema_version(engine)
+
+    # Redis健康检查（不可用时降级为内存缓存，恢复后自动切回）
+    cache.start_health_checks()
+
+    # 令牌吊销列表：启动时先同步一次，之后后台定期同步
+    await asyncio.to_thread(token_revocations.sync)
+    token_revocations.start_sync()
+
+    # 只读副本：启动时先检查一次，之后后台定期检查延迟与连通性
+    await replica_set.check_health()
+    replica_set.start_health_checks()
+
+    # 登录统计后台批量写回
+    login_activity.start_flush()
 
     logger.info("应用启动完成")
     yield
 
     # 关闭时执行
     logger.info("应用关闭中...")
+    await login_activity.stop_flush()
+    await token_revocations.stop_sync()
+    await cache.stop_health_checks()
+    password_hasher.shutdown()
+    await replica_set.stop_health_checks()
+    await replica_set.dispose()
     await engine.dispose()
     logger.info("应用关闭完成")
 
@@ -72,10 +93,6 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    # 设置速率限制
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
     # 添加中间件
     setup_middleware(app)
 
@@ -111,6 +128,7 @@ def setup_middleware(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Time"],
     )
 
     # Gzip压缩
@@ -121,12 +139,20 @@ def setup_middleware(app: FastAPI) -> None:
     async def log_requests(request: Request, call_next):
         start_time = time.time()
 
-        # 处理请求
-        response = await call_next(request)
+        # 处理请求（统计请求内执行的SQL）
+        with track_queries() as query_stats:
+            response = await call_next(request)
 
         # 计算处理时间
         process_time = time.time() - start_time
 
+        # 按路由模板上报，避免路径参数造成指标基数膨胀
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        observe_request(request.method, route, query_stats)
+        if settings.is_development and settings.DB_QUERY_STATS_HEADERS:
+            response.headers["X-DB-Queries"] = str(query_stats.count)
+            response.headers["X-DB-Time"] = f"{query_stats.duration * 1000:.2f}ms"
+
         # 记录指标
         REQUEST_COUNT.labels(
             method=request.method,
@@ -156,6 +182,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
         return JSONResponse(
             status_code=exc.status_code,
             content={"message": exc.detail, "error_code": exc.error_code},
+            headers=exc.headers,
         )
 
     @app.exception_handler(Exception)
@@ -177,6 +204,14 @@ def setup_system_routes(app: FastAPI) -> None:
         """Prometheus指标端点"""
         return Response(generate_latest(), media_type="text/plain")
 
+    @app.get("/.well-known/jwks.json")
+    async def jwks(response: Response):
+        """JWT验证公钥集合（JWKS），供其他服务本地验证令牌"""
+        response.headers["Cache-Control"] = (
+            f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"
+        )
+        return keyring.jwks()
+
     @app.get("/")
     async def root():
         """根路径"""
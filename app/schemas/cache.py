@@ -0,0 +1,22 @@
+"""
+缓存相关的Pydantic模型
+"""
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class HotKey(BaseModel):
+    """热点键"""
+
+    key: str
+    estimated_count: int
+
+
+class HotKeysResponse(BaseModel):
+    """热点键统计响应"""
+
+    backend: str
+    sample_rate: float
+    keys: List[HotKey]
@@ -3,9 +3,11 @@
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class ItemBase(BaseModel):
@@ -28,6 +30,42 @@ class ItemUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     is_active: Optional[bool] = None
+    # 读取物品时的 updated_at，提供时仅在物品未被他人修改的情况下更新
+    updated_at: Optional[datetime] = None
+
+
+class ItemBatchUpdateEntry(BaseModel):
+    """批量更新中的单个物品"""
+
+    # 批量更新不做乐观并发检查，提供 updated_at 等未知字段时拒绝请求，而不是静默忽略
+    model_config = {"extra": "forbid"}
+
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class ItemBatchCreate(BaseModel):
+    """物品批量创建模型"""
+
+    items: List[ItemCreate] = Field(
+        ..., min_length=1, max_length=settings.BULK_MAX_ITEMS
+    )
+
+
+class ItemBatchUpdate(BaseModel):
+    """物品批量更新模型"""
+
+    items: List[ItemBatchUpdateEntry] = Field(
+        ..., min_length=1, max_length=settings.BULK_MAX_ITEMS
+    )
+
+
+class ItemBatchDelete(BaseModel):
+    """物品批量删除模型"""
+
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
 
 
 class ItemInDBBase(ItemBase):
@@ -1,5 +1,5 @@
 # app/services/chat_service.py
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.db.models.chat import ChatSession, ChatMessage
@@ -35,6 +35,23 @@ class ChatService:
         )
         return result.scalars().all()
     
+    async def get_user_sessions_with_message_count(
+        self, user_id: int
+    ) -> List[Tuple[ChatSession, int]]:
+        """获取用户的聊天会话列表及各会话的消息数（一次查询，避免逐个加载消息）"""
+        message_count = (
+            select(func.count(ChatMessage.id))
+            .where(ChatMessage.session_id == ChatSession.id)
+            .correlate(ChatSession)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(ChatSession, message_count)
+            .where(ChatSession.user_id == user_id)
+            .order_by(ChatSession.updated_at.desc())
+        )
+        return result.all()
+    
     async def get_session_messages(self, session_id: int, user_id: int) -> List[ChatMessage]:
         """获取会话的消息历史"""
         # 验证会话所有权
@@ -2,13 +2,14 @@
 物品服务层
 """
 
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ResourceNotFoundException, AuthorizationException
+from app.db.pagination import KeysetPage
 from app.db.repositories.item_repository import item_repository
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.item import ItemBatchUpdateEntry, ItemCreate, ItemUpdate
 
 
 class ItemService:
@@ -54,6 +55,36 @@ class ItemService:
         )
         return items
 
+    async def get_items_page(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        active_only: bool = False,
+    ) -> KeysetPage:
+        """按游标获取物品列表"""
+        if active_only:
+            return await self.item_repo.get_active_page(db, cursor=cursor, limit=limit)
+        return await self.item_repo.get_page(db, cursor=cursor, limit=limit)
+
+    async def get_user_items_page(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> KeysetPage:
+        """按游标获取用户的物品列表"""
+        return await self.item_repo.get_page_by_owner(
+            db, owner_id=owner_id, cursor=cursor, limit=limit
+        )
+
+    def next_cursor(self, items: List, limit: int) -> Optional[str]:
+        """页码分页结果满页时，生成可切换到游标分页的下一页游标"""
+        return self.item_repo.next_cursor(items, limit)
+
     async def update_item(
         self,
         db: AsyncSession,
@@ -71,7 +102,12 @@ class ItemService:
         if item.owner_id != current_user_id:
             raise AuthorizationException("您没有权限更新此物品")
 
-        updated_item = await self.item_repo.update(db, db_obj=item, obj_in=item_in)
+        updated_item = await self.item_repo.update(
+            db,
+            db_obj=item,
+            obj_in=item_in.model_dump(exclude_unset=True, exclude={"updated_at"}),
+            expected_updated_at=item_in.updated_at,
+        )
         return updated_item
 
     async def delete_item(
@@ -89,6 +125,72 @@ class ItemService:
         await self.item_repo.delete(db, id=item_id)
         return {"message": "物品删除成功"}
 
+    async def _check_owned(
+        self, db: AsyncSession, *, ids: Sequence[int], current_user_id: int, action: str
+    ) -> None:
+        """
+        一次查询检查所有物品存在且属于当前用户
+
+        检查时锁定这些物品，随后同一事务中的批量写入不会作用于已被他人转移或删除的物品。
+        """
+        owners = await self.item_repo.get_owner_ids(db, ids=ids, lock=True)
+        missing = [item_id for item_id in ids if item_id not in owners]
+        if missing:
+            raise ResourceNotFoundException(f"物品不存在: {_format_ids(missing)}")
+
+        forbidden = [item_id for item_id in ids if owners[item_id] != current_user_id]
+        if forbidden:
+            raise AuthorizationException(
+                f"您没有权限{action}以下物品: {_format_ids(forbidden)}"
+            )
+
+    async def create_items(
+        self, db: AsyncSession, *, items_in: Sequence[ItemCreate], owner_id: int
+    ):
+        """批量创建物品"""
+        return await self.item_repo.bulk_create_with_owner(
+            db, objs_in=items_in, owner_id=owner_id
+        )
+
+    async def update_items(
+        self,
+        db: AsyncSession,
+        *,
+        items_in: Sequence[ItemBatchUpdateEntry],
+        current_user_id: int,
+    ):
+        """批量更新物品（仅所有者可更新），同一物品出现多次时以最后一次为准"""
+        rows: Dict[int, dict] = {
+            item_in.id: item_in.model_dump(exclude_unset=True) for item_in in items_in
+        }
+        await self._check_owned(
+            db, ids=list(rows), current_user_id=current_user_id, action="更新"
+        )
+        return await self.item_repo.bulk_update(
+            db,
+            rows=[{**row, "id": item_id} for item_id, row in rows.items()],
+            tags=[f"owner:{current_user_id}:items"],
+        )
+
+    async def delete_items(
+        self, db: AsyncSession, *, ids: Sequence[int], current_user_id: int
+    ):
+        """批量删除物品（仅所有者可删除）"""
+        ids = list(dict.fromkeys(ids))
+        await self._check_owned(
+            db, ids=ids, current_user_id=current_user_id, action="删除"
+        )
+        deleted = await self.item_repo.bulk_delete(
+            db, ids=ids, tags=[f"owner:{current_user_id}:items"]
+        )
+        return {"message": f"已删除 {deleted} 个物品"}
+
+
+def _format_ids(ids: Sequence[int], limit: int = 10) -> str:
+    """错误信息中列出的物品ID，过多时截断"""
+    text = ", ".join(map(str, ids[:limit]))
+    return f"{text} 等 {len(ids)} 个" if len(ids) > limit else text
+
 
 # 创建全局服务实例
 item_service = ItemService()
@@ -0,0 +1,163 @@
+"""
+登录统计写回
+
+登录时只在内存中累计每个用户的登录次数与最近登录时间，由后台任务定期用一条批量
+UPDATE 写入数据库，同一用户在一个周期内的多次登录合并为一行，登录请求本身不产生
+写事务。待写入的用户数达到上限时提前写入；应用关闭时写入剩余的统计。
+
+进程异常退出时最多丢失一个周期的统计，这些字段只用于展示，可以接受。
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import DateTime, Integer, Update, bindparam, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.cache_invalidation import mark_tags_dirty
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+
+
+class LoginActivityRecorder:
+    """登录统计的内存聚合与批量写回"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval or settings.LOGIN_ACTIVITY_FLUSH_SECONDS
+        self.max_pending = max_pending or settings.LOGIN_ACTIVITY_MAX_PENDING
+        # 用户ID -> (登录次数, 最近登录时间)
+        self._pending: Dict[int, Tuple[int, datetime]] = {}
+        self._flush_requested = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        # 后台任务正在执行的写入
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def pending(self) -> int:
+        """待写入的用户数"""
+        return len(self._pending)
+
+    def record(self, user_id: int, at: Optional[datetime] = None) -> None:
+        """记录一次登录"""
+        at = at or datetime.utcnow()
+        count, last_login = self._pending.get(user_id, (0, at))
+        self._pending[user_id] = (count + 1, max(last_login, at))
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    async def flush(self) -> int:
+        """写入累计的统计，返回更新的用户数；失败时统计放回缓冲区等待下次写入"""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        rows = [(user_id, count, at) for user_id, (count, at) in batch.items()]
+        try:
+            async with self.session_factory() as session:
+                await self._update(session, rows)
+                mark_tags_dirty(session, [f"user:{row[0]}" for row in rows])
+                await session.commit()
+        except Exception as e:
+            logger.error(f"写入登录统计失败: {e}")
+            for user_id, count, at in rows:
+                pending_count, pending_at = self._pending.get(user_id, (0, at))
+                self._pending[user_id] = (pending_count + count, max(pending_at, at))
+            return 0
+
+        return len(rows)
+
+    @staticmethod
+    def _values_update(rows: List[Tuple[int, int, datetime]]) -> Update:
+        """构造 UPDATE ... FROM (VALUES ...) 语句"""
+        activity = values(
+            column("id", Integer),
+            column("logins", Integer),
+            column("last_login", DateTime),
+            name="login_activity",
+        ).data(rows)
+        return (
+            update(User)
+            .where(User.id == activity.c.id)
+            .values(
+                login_count=User.login_count + activity.c.logins,
+                last_login=activity.c.last_login,
+                updated_at=User.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _update(
+        self, session: AsyncSession, rows: List[Tuple[int, int, datetime]]
+    ) -> None:
+        """
+        批量更新
+
+        PostgreSQL 使用一条 UPDATE ... FROM (VALUES ...)；其他数据库按参数列表批量执行。
+        updated_at 保持不变，登录不算作对用户资料的修改。
+        """
+        if session.bind.dialect.name == "postgresql":
+            await session.execute(self._values_update(rows))
+            return
+
+        stmt = (
+            update(User.__table__)
+            .where(User.__table__.c.id == bindparam("user_id"))
+            .values(
+                login_count=User.__table__.c.login_count + bindparam("logins"),
+                last_login=bindparam("at"),
+                updated_at=User.__table__.c.updated_at,
+            )
+        )
+        await session.execute(
+            stmt,
+            [
+                {"user_id": user_id, "logins": count, "at": at}
+                for user_id, count, at in rows
+            ],
+        )
+
+    async def run_flush(self) -> None:
+        """后台定期写入"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            # 写入不随后台任务一起取消（已取出的统计会丢失），由 stop_flush 等待完成
+            self._inflight = asyncio.ensure_future(self.flush())
+            await asyncio.shield(self._inflight)
+
+    def start_flush(self) -> None:
+        """启动后台写入任务"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.run_flush())
+
+    async def stop_flush(self) -> None:
+        """停止后台写入任务并写入剩余统计"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        await self.flush()
+
+
+# 全局登录统计
+login_activity = LoginActivityRecorder()
@@ -2,78 +2,190 @@
 用户服务层
 """
 
-from typing import Optional
+import asyncio
+from typing import List, Optional, Set
 
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password, create_token_pair
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.login_guard import login_guard
+from app.core.revocation import token_revocations
+from app.core.security import TokenClaims, create_user_token_pair, decode_token
 from app.core.exceptions import (
     AuthenticationException,
-    ValidationException,
     ConflictException,
     ResourceNotFoundException,
+    ServiceUnavailableException,
 )
+from app.db.models.user import User
+from app.db.pagination import KeysetPage
 from app.db.repositories.user_repository import user_repository
-from app.schemas.user import UserCreate, UserUpdate, UserRegister, UserLogin
+from app.db.session import AsyncSessionLocal
+from app.services.login_activity import login_activity
+from app.schemas.user import UserUpdate, UserRegister, UserLogin
 from app.schemas.common import Token
 
 
 class UserService:
     """用户服务"""
 
+    _conflict_messages = {"username": "用户名已存在", "email": "邮箱已存在"}
+
     def __init__(self):
         self.user_repo = user_repository
+        # 后台任务（如密码哈希升级）使用独立会话
+        self.session_factory = AsyncSessionLocal
+        self._background_tasks: Set[asyncio.Task] = set()
 
     async def register(self, db: AsyncSession, *, user_in: UserRegister) -> dict:
-        """用户注册"""
-        # 检查用户名是否已存在
-        existing_user = await self.user_repo.get_by_username(
-            db, username=user_in.username
-        )
-        if existing_user:
-            raise ConflictException("用户名已存在")
-
-        # 检查邮箱是否已存在
-        existing_email = await self.user_repo.get_by_email(db, email=user_in.email)
-        if existing_email:
-            raise ConflictException("邮箱已存在")
-
-        # 创建用户
-        hashed_password = get_password_hash(user_in.password)
-        user_create = UserCreate(
-            username=user_in.username,
-            email=user_in.email,
-            full_name=user_in.full_name,
-            password=user_in.password,
-            is_superuser=False,
+        """
+        用户注册
+
+        密码哈希在线程池中计算，同时用一次查询检查用户名与邮箱是否已被占用；
+        插入使用 ON CONFLICT DO NOTHING，并发注册同一用户名时返回409而不是500。
+        """
+        hashed_password, conflict = await asyncio.gather(
+            password_hasher.hash(user_in.password),
+            self.user_repo.find_conflict(
+                db, username=user_in.username, email=user_in.email
+            ),
         )
-
-        user = await self.user_repo.create_with_password(
-            db, obj_in=user_create, hashed_password=hashed_password
+        if conflict:
+            raise ConflictException(self._conflict_messages[conflict])
+
+        user = await self.user_repo.insert_unique(
+            db,
+            values={
+                "username": user_in.username,
+                "email": user_in.email,
+                "full_name": user_in.full_name,
+                "hashed_password": hashed_password,
+                "is_superuser": False,
+            },
         )
+        if user is None:
+            # 检查与插入之间被并发注册抢先
+            conflict = await self.user_repo.find_conflict(
+                db, username=user_in.username, email=user_in.email
+            )
+            raise ConflictException(
+                self._conflict_messages.get(conflict, "用户名或邮箱已存在")
+            )
 
         # 生成令牌
-        token = create_token_pair(user.username)
+        token = create_user_token_pair(user)
 
         return {"user": user, "token": token}
 
-    async def login(self, db: AsyncSession, *, user_in: UserLogin) -> Token:
-        """用户登录"""
+    async def login(
+        self, db: AsyncSession, *, user_in: UserLogin, client_ip: Optional[str] = None
+    ) -> Token:
+        """用户登录（用户名或IP因连续失败被锁定时，在查询与校验密码之前即拒绝）"""
+        login_guard.check(user_in.username, client_ip)
+
         user = await self.user_repo.authenticate(
             db, username=user_in.username, password=user_in.password
         )
 
         if not user:
+            login_guard.record_failure(user_in.username, client_ip)
             raise AuthenticationException("用户名或密码错误")
 
+        login_guard.record_success(user_in.username)
+
         if not await self.user_repo.is_active(user):
             raise AuthenticationException("用户账号已被禁用")
 
+        # 登录统计异步批量写回，不在登录请求中写库
+        login_activity.record(user.id)
+        self._schedule_rehash(user, user_in.password)
+
         # 生成令牌
-        token = create_token_pair(user.username)
+        token = create_user_token_pair(user)
 
         return token
 
+    def _schedule_rehash(self, user: User, password: str) -> None:
+        """哈希方案或成本落后于当前配置时，在后台用明文密码重新哈希，不阻塞登录响应"""
+        if not password_hasher.needs_update(user.hashed_password):
+            return
+
+        task = asyncio.create_task(
+            self._rehash_password(user.id, user.hashed_password, password)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _rehash_password(
+        self, user_id: int, old_hash: str, password: str
+    ) -> None:
+        """重新哈希密码并写回"""
+        try:
+            new_hash = await password_hasher.hash(password)
+            async with self.session_factory() as db:
+                if await self.user_repo.update_password_hash(
+                    db, user_id=user_id, old_hash=old_hash, new_hash=new_hash
+                ):
+                    logger.info(f"已升级密码哈希: 用户ID {user_id}")
+        except Exception as e:
+            logger.warning(f"升级密码哈希失败: 用户ID {user_id}: {e}")
+
+    async def refresh_token(self, db: AsyncSession, *, refresh_token: str) -> Token:
+        """
+        刷新令牌
+
+        每个刷新令牌只能使用一次，使用后签发同一令牌族的新令牌对；
+        已使用过的刷新令牌再次出现说明令牌泄露，吊销整个令牌族。
+        """
+        claims = decode_token(
+            refresh_token, token_type="refresh", check_revocation=False
+        )
+        if not claims or not claims.jti or not claims.family:
+            raise AuthenticationException("无效的刷新令牌")
+
+        if token_revocations.is_revoked(claims.family):
+            raise AuthenticationException("刷新令牌已失效")
+
+        claimed = token_revocations.claim(claims.jti, claims.expires_in)
+        if claimed is None:
+            # 无法确认刷新令牌是否已被使用，拒绝本次刷新但不视为重放
+            raise ServiceUnavailableException("令牌服务暂时不可用，请稍后重试")
+        if not claimed:
+            token_revocations.revoke(
+                claims.family, settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+            )
+            logger.warning(
+                f"检测到刷新令牌重复使用，已吊销令牌族: 用户ID {claims.user_id}"
+            )
+            raise AuthenticationException("刷新令牌已失效")
+
+        user = await self.get_principal(
+            db, user_id=claims.user_id, token_version=claims.token_version
+        )
+        return create_user_token_pair(user, family=claims.family)
+
+    def logout(self, *, claims: TokenClaims) -> None:
+        """退出登录：吊销当前令牌及其所在令牌族（包括对应的刷新令牌）"""
+        if claims.jti:
+            token_revocations.revoke(claims.jti, claims.expires_in)
+        if claims.family:
+            token_revocations.revoke(
+                claims.family, settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+            )
+
+    async def get_principal(
+        self, db: AsyncSession, *, user_id: int, token_version: int
+    ):
+        """获取令牌对应的当前用户（优先读取认证主体缓存）"""
+        user = await self.user_repo.get_principal(
+            db, user_id=user_id, token_version=token_version
+        )
+        if not user:
+            raise AuthenticationException("用户不存在或令牌已失效")
+        return user
+
     async def get_current_user(self, db: AsyncSession, *, username: str):
         """获取当前用户"""
         user = await self.user_repo.get_by_username(db, username=username)
@@ -84,14 +196,19 @@ class UserService:
     async def update_user(self, db: AsyncSession, *, current_user, user_in: UserUpdate):
         """更新用户信息"""
         # 如果要更新密码，需要哈希处理
-        update_data = user_in.dict(exclude_unset=True)
+        update_data = user_in.model_dump(exclude_unset=True)
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(
+            update_data["hashed_password"] = await password_hasher.hash(
                 update_data.pop("password")
             )
 
+        # 修改密码或停用账号时递增令牌版本，已签发的令牌随之失效
+        if "hashed_password" in update_data or update_data.get("is_active") is False:
+            update_data["token_version"] = current_user.token_version + 1
+
         user = await self.user_repo.update(db, db_obj=current_user, obj_in=update_data)
+        self.user_repo.invalidate_principal(user.id)
         return user
 
     async def get_user_by_id(self, db: AsyncSession, *, user_id: int):
@@ -106,6 +223,16 @@ class UserService:
         users = await self.user_repo.get_multi(db, skip=skip, limit=limit)
         return users
 
+    async def get_users_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> KeysetPage:
+        """按游标获取用户列表"""
+        return await self.user_repo.get_page(db, cursor=cursor, limit=limit)
+
+    def next_cursor(self, users: List, limit: int) -> Optional[str]:
+        """页码分页结果满页时，生成可切换到游标分页的下一页游标"""
+        return self.user_repo.next_cursor(users, limit)
+
     async def delete_user(self, db: AsyncSession, *, user_id: int):
         """删除用户"""
         user = await self.user_repo.get(db, id=user_id)
@@ -113,6 +240,7 @@ class UserService:
             raise ResourceNotFoundException("用户不存在")
 
         await self.user_repo.delete(db, id=user_id)
+        self.user_repo.invalidate_principal(user_id)
         return {"message": "用户删除成功"}
 
 
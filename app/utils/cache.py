@@ -2,44 +2,183 @@
 缓存工具
 """
 
+import asyncio
+import fnmatch
+import hashlib
+import inspect
 import json
 import pickle
-from typing import Any, Optional, Union
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
 from functools import wraps
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Union
+from uuid import UUID
 
 import redis
+from redis.backoff import ExponentialBackoff
+from redis.cluster import ClusterNode, RedisCluster
+from redis.commands.core import Script
+from redis.retry import Retry
+from redis.sentinel import Sentinel
 from loguru import logger
+from prometheus_client import Counter, Histogram
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.utils.hot_keys import HotKeyTracker
+
+# 不参与缓存键计算的参数（实例本身、数据库会话等）
+NON_KEY_ARGUMENTS = frozenset({"self", "cls", "db", "session"})
+
+# Prometheus metrics
+CACHE_HITS = Counter("cache_hits_total", "Cache hits", ["backend", "namespace"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses", ["backend", "namespace"])
+CACHE_ERRORS = Counter(
+    "cache_errors_total", "Cache operation errors", ["backend", "operation"]
+)
+CACHE_VALUE_BYTES = Histogram(
+    "cache_value_bytes",
+    "Serialized cache value size",
+    ["backend", "namespace", "operation"],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+CACHE_OPERATION_DURATION = Histogram(
+    "cache_operation_duration_seconds",
+    "Cache operation latency",
+    ["backend", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+CACHE_LOAD_DURATION = Histogram(
+    "cache_load_duration_seconds",
+    "Time spent computing a value on cache miss",
+    ["namespace"],
+)
+
+# 热点键采样
+hot_keys = HotKeyTracker(
+    k=settings.CACHE_HOT_KEY_TOP_K, sample_rate=settings.CACHE_HOT_KEY_SAMPLE_RATE
+)
+
+
+def key_namespace(key: str) -> str:
+    """
+    提取缓存键的命名空间，用作指标标签
+
+    去掉前缀与版本后取第一段；repo与tag键额外带上第二段（表名/标签类型）
+    """
+    parts = key.split(":")
+    if len(parts) > 1 and parts[0] == settings.CACHE_KEY_PREFIX:
+        # 缓存数据键带版本段，状态键（state_key）不带
+        versioned = len(parts) > 2 and re.fullmatch(r"v\d+", parts[1])
+        parts = parts[2:] if versioned else parts[1:]
+    if parts[0] in ("repo", "tag") and len(parts) > 1:
+        return f"{parts[0]}:{parts[1]}"
+    return parts[0]
+
+
+def _timed(operation: str):
+    """记录缓存操作耗时"""
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                CACHE_OPERATION_DURATION.labels(
+                    backend=self.backend, operation=operation
+                ).observe(perf_counter() - start)
+
+        return wrapper
+
+    return decorator
 
 
 class RedisCache:
     """Redis缓存类"""
 
-    def __init__(self):
-        self.redis_client = None
-        self._connect()
-
-    def _connect(self):
-        """连接Redis"""
+    backend = "redis"
+    # 多个worker共享同一份数据，可安全用于跨进程的读穿透缓存
+    shared = True
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        client_factory: Optional[Callable[[], redis.Redis]] = None,
+    ):
+        """
+        初始化Redis缓存（不会立即连接，首次使用时才建立连接）
+
+        Args:
+            client: 已创建的Redis客户端（测试时可传入本地替身）
+            client_factory: 创建客户端的工厂函数，默认按配置的拓扑创建
+        """
+        self._client = client
+        self._client_factory = client_factory or create_redis_client
+        self._available = client is not None
+        self._next_retry = 0.0
+        # 是否由后台任务负责健康检查
+        self.monitored = False
+        # 已注册的Lua脚本（按脚本内容缓存，避免重复计算SHA1）
+        self._scripts: Dict[str, Script] = {}
+
+    @property
+    def redis_client(self) -> Optional[redis.Redis]:
+        """当前可用的Redis客户端；不可用时返回None，由健康检查负责恢复"""
+        if self._available:
+            return self._client
+        # 首次使用时懒连接；未运行后台健康检查时按间隔在使用时重试
+        if (self._next_retry == 0.0 or not self.monitored) and (
+            monotonic() >= self._next_retry
+        ):
+            self.check_health()
+        return self._client if self._available else None
+
+    @property
+    def available(self) -> bool:
+        """Redis是否可用"""
+        return self.redis_client is not None
+
+    @property
+    def is_cluster(self) -> bool:
+        """是否为集群模式（集群不支持跨slot事务与MGET）"""
+        return isinstance(self._client, RedisCluster)
+
+    def check_health(self) -> bool:
+        """探测Redis连通性，必要时创建客户端，返回是否可用"""
         try:
-            self.redis_client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD,
-                decode_responses=False,
-                socket_timeout=5,
-                socket_connect_timeout=5,
-                retry_on_timeout=True,
-            )
-            # 测试连接
-            self.redis_client.ping()
-            logger.info("Redis连接成功")
+            if self._client is None:
+                self._client = self._client_factory()
+            self._client.ping()
         except Exception as e:
-            logger.error(f"Redis连接失败: {e}")
-            self.redis_client = None
+            if self._available or self._next_retry == 0.0:
+                logger.error(f"Redis连接失败: {e}")
+            self._mark_unavailable()
+            return False
 
+        if not self._available:
+            logger.info("Redis连接成功")
+        self._available = True
+        return True
+
+    def _mark_unavailable(self) -> None:
+        """标记Redis不可用，等待健康检查恢复"""
+        self._available = False
+        self._next_retry = monotonic() + settings.REDIS_HEALTH_CHECK_INTERVAL
+
+    def _record_error(self, operation: str, error: Exception) -> None:
+        """记录操作错误；连接类错误会将Redis标记为不可用"""
+        CACHE_ERRORS.labels(backend=self.backend, operation=operation).inc()
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._mark_unavailable()
+
+    @_timed("get")
     def get(self, key: str) -> Optional[Any]:
         """获取缓存"""
         if not self.redis_client:
@@ -47,42 +186,115 @@ class RedisCache:
 
         try:
             value = self.redis_client.get(key)
-            if value is None:
-                return None
-
-            # 尝试反序列化
-            try:
-                return pickle.loads(value)
-            except:
-                # 如果pickle失败，尝试JSON
-                try:
-                    return json.loads(value.decode("utf-8"))
-                except:
-                    return value.decode("utf-8")
+            self._record_read(key, value)
+            return self._deserialize(value)
         except Exception as e:
+            self._record_error("get", e)
             logger.error(f"获取缓存失败 {key}: {e}")
             return None
 
+    @_timed("set")
     def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """设置缓存"""
         if not self.redis_client:
             return False
 
         try:
-            # 序列化值
-            if isinstance(value, (str, int, float)):
-                serialized_value = str(value)
-            elif isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value, ensure_ascii=False)
-            else:
-                serialized_value = pickle.dumps(value)
-
             expire = expire or settings.CACHE_EXPIRE_SECONDS
+            serialized_value = self._serialize(value)
+            self._record_write(key, serialized_value)
             return self.redis_client.setex(key, expire, serialized_value)
         except Exception as e:
+            self._record_error("set", e)
             logger.error(f"设置缓存失败 {key}: {e}")
             return False
 
+    @_timed("add")
+    def add(self, key: str, value: Any, expire: Optional[int] = None) -> Optional[bool]:
+        """
+        键不存在时才设置缓存（SET NX）
+
+        Returns:
+            是否写入；Redis不可用或执行出错时返回None，以便调用方区分“键已存在”
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            expire = expire or settings.CACHE_EXPIRE_SECONDS
+            serialized_value = self._serialize(value)
+            self._record_write(key, serialized_value)
+            return bool(
+                self.redis_client.set(key, serialized_value, ex=expire, nx=True)
+            )
+        except Exception as e:
+            self._record_error("add", e)
+            logger.error(f"设置缓存失败 {key}: {e}")
+            return None
+
+    @_timed("set_with_tags")
+    def set_with_tags(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        expire: Optional[int] = None,
+    ) -> bool:
+        """设置缓存并关联标签，标签失效时一并删除"""
+        if not self.redis_client:
+            return False
+
+        tags = list(tags)
+        try:
+            # 标签刚被失效时，本次写入可能是并发读取到的旧数据，放弃写入
+            if tags and self.redis_client.exists(
+                *[_tombstone_key(tag) for tag in tags]
+            ):
+                return False
+
+            expire = expire or settings.CACHE_EXPIRE_SECONDS
+            serialized_value = self._serialize(value)
+            self._record_write(key, serialized_value)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, expire, serialized_value)
+            for tag in tags:
+                tag_key = _tag_key(tag)
+                pipe.sadd(tag_key, key)
+                # 标签集合的过期时间不短于其中任何一个缓存项
+                pipe.expire(tag_key, expire, nx=True)
+                pipe.expire(tag_key, expire, gt=True)
+            pipe.execute()
+            return True
+        except Exception as e:
+            self._record_error("set_with_tags", e)
+            logger.error(f"设置标签缓存失败 {key}: {e}")
+            return False
+
+    @_timed("invalidate_tags")
+    def invalidate_tags(self, *tags: str) -> int:
+        """按标签失效缓存，返回删除的缓存项数量"""
+        if not self.redis_client or not tags:
+            return 0
+
+        try:
+            # 原子地读取并清空标签集合，同时写入短暂的失效标记
+            grace = settings.CACHE_TAG_GRACE_SECONDS
+            pipe = self.redis_client.pipeline(transaction=not self.is_cluster)
+            for tag in tags:
+                pipe.smembers(_tag_key(tag))
+                pipe.delete(_tag_key(tag))
+                if grace > 0:
+                    pipe.setex(_tombstone_key(tag), grace, 1)
+            results = pipe.execute()
+
+            keys = set().union(*results[:: 3 if grace > 0 else 2])
+            return self.redis_client.delete(*keys) if keys else 0
+        except Exception as e:
+            self._record_error("invalidate_tags", e)
+            logger.error(f"按标签失效缓存失败 {tags}: {e}")
+            return 0
+
+    @_timed("delete")
     def delete(self, key: str) -> bool:
         """删除缓存"""
         if not self.redis_client:
@@ -91,9 +303,11 @@ class RedisCache:
         try:
             return bool(self.redis_client.delete(key))
         except Exception as e:
+            self._record_error("delete", e)
             logger.error(f"删除缓存失败 {key}: {e}")
             return False
 
+    @_timed("exists")
     def exists(self, key: str) -> bool:
         """检查缓存是否存在"""
         if not self.redis_client:
@@ -102,9 +316,11 @@ class RedisCache:
         try:
             return bool(self.redis_client.exists(key))
         except Exception as e:
+            self._record_error("exists", e)
             logger.error(f"检查缓存失败 {key}: {e}")
             return False
 
+    @_timed("expire")
     def expire(self, key: str, seconds: int) -> bool:
         """设置过期时间"""
         if not self.redis_client:
@@ -113,47 +329,286 @@ class RedisCache:
         try:
             return bool(self.redis_client.expire(key, seconds))
         except Exception as e:
+            self._record_error("expire", e)
             logger.error(f"设置过期时间失败 {key}: {e}")
             return False
 
-    def keys(self, pattern: str = "*") -> list:
-        """获取匹配的键"""
-        if not self.redis_client:
-            return []
+    @_timed("eval")
+    def eval_script(
+        self, script: str, keys: Iterable[str] = (), args: Iterable[Any] = ()
+    ) -> Optional[Any]:
+        """执行Lua脚本（优先EVALSHA，未加载时自动EVAL）；Redis不可用时返回None"""
+        client = self.redis_client
+        if not client:
+            return None
 
         try:
-            keys = self.redis_client.keys(pattern)
-            return [
-                key.decode("utf-8") if isinstance(key, bytes) else key for key in keys
-            ]
+            registered = self._scripts.get(script)
+            if registered is None:
+                registered = self._scripts[script] = client.register_script(script)
+            return registered(keys=list(keys), args=list(args), client=client)
         except Exception as e:
-            logger.error(f"获取键失败 {pattern}: {e}")
-            return []
+            self._record_error("eval", e)
+            logger.error(f"执行Lua脚本失败: {e}")
+            return None
 
-    def flush_all(self) -> bool:
-        """清空所有缓存"""
-        if not self.redis_client:
+    @_timed("get_many")
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量获取缓存（单次MGET），只返回命中的键"""
+        keys = list(keys)
+        if not self.redis_client or not keys:
+            return {}
+
+        try:
+            client = self.redis_client
+            if self.is_cluster:
+                values = client.mget_nonatomic(keys)
+            else:
+                values = client.mget(keys)
+            for key, value in zip(keys, values, strict=True):
+                self._record_read(key, value)
+            return {
+                key: self._deserialize(value)
+                for key, value in zip(keys, values, strict=True)
+                if value is not None
+            }
+        except Exception as e:
+            self._record_error("get_many", e)
+            logger.error(f"批量获取缓存失败: {e}")
+            return {}
+
+    @_timed("set_many")
+    def set_many(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """批量设置缓存（单次管道往返），所有键使用相同的过期时间"""
+        if not self.redis_client or not mapping:
             return False
 
         try:
-            return bool(self.redis_client.flushdb())
+            expire = expire or settings.CACHE_EXPIRE_SECONDS
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                serialized_value = self._serialize(value)
+                self._record_write(key, serialized_value)
+                pipe.setex(key, expire, serialized_value)
+            return all(pipe.execute())
         except Exception as e:
-            logger.error(f"清空缓存失败: {e}")
+            self._record_error("set_many", e)
+            logger.error(f"批量设置缓存失败: {e}")
             return False
 
+    def iter_keys(self, pattern: str = "*", count: int = 500) -> Iterator[str]:
+        """基于SCAN游标迭代匹配的键，不会像KEYS那样阻塞Redis"""
+        if not self.redis_client:
+            return
+
+        try:
+            for key in self.redis_client.scan_iter(match=pattern, count=count):
+                yield key.decode("utf-8") if isinstance(key, bytes) else key
+        except Exception as e:
+            self._record_error("iter_keys", e)
+            logger.error(f"扫描键失败 {pattern}: {e}")
 
-# 全局缓存实例
-cache = RedisCache()
+    def keys(self, pattern: str = "*") -> list:
+        """获取匹配的键"""
+        return list(self.iter_keys(pattern))
 
+    @_timed("delete_pattern")
+    def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """按模式分批删除键，返回删除数量"""
+        if not self.redis_client:
+            return 0
 
-def cached(key_pattern: str, expire: Optional[int] = None):
-    """缓存装饰器"""
+        deleted = 0
+        batch = []
+        try:
+            for key in self.iter_keys(pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self.redis_client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                deleted += self.redis_client.unlink(*batch)
+        except Exception as e:
+            self._record_error("delete_pattern", e)
+            logger.error(f"按模式删除缓存失败 {pattern}: {e}")
+        return deleted
+
+    async def adelete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """在线程中按模式分批删除键，避免阻塞事件循环"""
+        return await asyncio.to_thread(self.delete_pattern, pattern, batch_size)
+
+    def flush_all(self) -> bool:
+        """
+        清空当前版本的缓存数据
+
+        不影响同一Redis库中的其他数据，也不影响 state_key 下的状态（令牌吊销、
+        限流与登录失败计数），这些数据不能因缓存清空而丢失。
+        """
+        if not self.redis_client:
+            return False
+
+        self.delete_pattern(namespace_pattern())
+        return True
+
+    def _record_read(self, key: str, value: Optional[bytes]) -> None:
+        """记录读取的命中情况与数据大小"""
+        namespace = key_namespace(key)
+        hot_keys.record(key)
+        if value is None:
+            CACHE_MISSES.labels(backend=self.backend, namespace=namespace).inc()
+            return
+        CACHE_HITS.labels(backend=self.backend, namespace=namespace).inc()
+        CACHE_VALUE_BYTES.labels(
+            backend=self.backend, namespace=namespace, operation="get"
+        ).observe(len(value))
+
+    def _record_write(self, key: str, value: Union[str, bytes]) -> None:
+        """记录写入的数据大小"""
+        size = len(value.encode("utf-8") if isinstance(value, str) else value)
+        CACHE_VALUE_BYTES.labels(
+            backend=self.backend, namespace=key_namespace(key), operation="set"
+        ).observe(size)
+
+    @staticmethod
+    def _serialize(value: Any) -> Union[str, bytes]:
+        """序列化缓存值"""
+        if isinstance(value, (str, int, float)):
+            return str(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return pickle.dumps(value)
+
+    @staticmethod
+    def _deserialize(value: Optional[bytes]) -> Optional[Any]:
+        """反序列化缓存值"""
+        if value is None:
+            return None
+
+        # 尝试反序列化
+        try:
+            return pickle.loads(value)
+        except:
+            # 如果pickle失败，尝试JSON
+            try:
+                return json.loads(value.decode("utf-8"))
+            except:
+                return value.decode("utf-8")
+
+
+def namespace_pattern() -> str:
+    """匹配当前版本缓存数据键的模式（不含 state_key 下的状态键）"""
+    prefix = re.sub(r"([*?\[\]\\])", r"\\\1", settings.CACHE_KEY_PREFIX)
+    return f"{prefix}:v{settings.CACHE_VERSION}:*"
+
+
+def _tag_key(tag: str) -> str:
+    """标签集合的键"""
+    return make_key("tag", tag)
+
+
+def _tombstone_key(tag: str) -> str:
+    """标签失效标记的键"""
+    return make_key("tag", tag, "invalidated")
+
+
+def _parse_node(node: str) -> tuple[str, int]:
+    """解析 host:port 形式的节点地址"""
+    host, _, port = node.rpartition(":")
+    return host, int(port)
+
+
+def create_redis_client() -> redis.Redis:
+    """按配置的拓扑（单机/哨兵/集群）创建Redis客户端"""
+    options = {
+        "password": settings.REDIS_PASSWORD,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "decode_responses": False,
+        # 连接失败时快速放弃，由降级与健康检查负责恢复
+        "retry": Retry(ExponentialBackoff(cap=0.1, base=0.01), settings.REDIS_RETRIES),
+    }
+
+    if settings.REDIS_MODE == "sentinel":
+        sentinel = Sentinel(
+            [_parse_node(node) for node in settings.REDIS_SENTINELS],
+            sentinel_kwargs={
+                "password": settings.REDIS_SENTINEL_PASSWORD,
+                "socket_timeout": settings.REDIS_CONNECT_TIMEOUT,
+            },
+            **options,
+        )
+        return sentinel.master_for(settings.REDIS_SENTINEL_MASTER, db=settings.REDIS_DB)
+
+    if settings.REDIS_MODE == "cluster":
+        return RedisCluster(
+            startup_nodes=[
+                ClusterNode(*_parse_node(node)) for node in settings.REDIS_CLUSTER_NODES
+            ],
+            **options,
+        )
+
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        **options,
+    )
+
+
+def cached(
+    key_pattern: str,
+    expire: Optional[int] = None,
+    skip: Optional[Iterable[str]] = None,
+    tags: Optional[Iterable[str]] = None,
+):
+    """
+    缓存装饰器
+
+    Args:
+        key_pattern: 缓存键模板。含参数名占位符（如 "user:{user_id}"）时按参数格式化；
+            否则作为命名空间，其余参数以稳定摘要拼接在后面
+        expire: 过期时间（秒）
+        skip: 额外不参与缓存键计算的参数名
+        tags: 缓存标签模板（如 "item:{item_id}"），标签失效时缓存项一并删除
+    """
+    tag_patterns = list(tags or ())
+    skip_names = NON_KEY_ARGUMENTS | frozenset(skip or ())
 
     def decorator(func):
+        signature = inspect.signature(func)
+
+        def build_key(args: tuple, kwargs: dict) -> tuple[Optional[str], list[str]]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = {
+                name: value
+                for name, value in bound.arguments.items()
+                if name not in skip_names
+                and not isinstance(value, (AsyncSession, Session))
+            }
+            try:
+                if "{" in key_pattern:
+                    key = make_key(key_pattern.format_map(key_args))
+                else:
+                    key = make_key(key_pattern, stable_digest(key_args))
+                return key, [tag.format_map(key_args) for tag in tag_patterns]
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"无法生成缓存键，跳过缓存 {func.__qualname__}: {e}")
+                return None, []
+
+        def store(cache_key: str, result: Any, cache_tags: list[str]) -> None:
+            if cache_tags:
+                cache.set_with_tags(cache_key, result, cache_tags, expire)
+            else:
+                cache.set(cache_key, result, expire)
+            logger.debug(f"缓存存储: {cache_key}")
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = key_pattern.format(*args, **kwargs)
+            cache_key, cache_tags = build_key(args, kwargs)
+            if cache_key is None:
+                return await func(*args, **kwargs)
 
             # 尝试从缓存获取
             cached_result = cache.get(cache_key)
@@ -162,19 +617,24 @@ def cached(key_pattern: str, expire: Optional[int] = None):
                 return cached_result
 
             # 执行函数
+            start = perf_counter()
             result = await func(*args, **kwargs)
+            CACHE_LOAD_DURATION.labels(namespace=key_namespace(cache_key)).observe(
+                perf_counter() - start
+            )
 
             # 存储到缓存
             if result is not None:
-                cache.set(cache_key, result, expire)
-                logger.debug(f"缓存存储: {cache_key}")
+                store(cache_key, result, cache_tags)
 
             return result
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = key_pattern.format(*args, **kwargs)
+            cache_key, cache_tags = build_key(args, kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
 
             # 尝试从缓存获取
             cached_result = cache.get(cache_key)
@@ -183,18 +643,19 @@ def cached(key_pattern: str, expire: Optional[int] = None):
                 return cached_result
 
             # 执行函数
+            start = perf_counter()
             result = func(*args, **kwargs)
+            CACHE_LOAD_DURATION.labels(namespace=key_namespace(cache_key)).observe(
+                perf_counter() - start
+            )
 
             # 存储到缓存
             if result is not None:
-                cache.set(cache_key, result, expire)
-                logger.debug(f"缓存存储: {cache_key}")
+                store(cache_key, result, cache_tags)
 
             return result
 
         # 检查是否是异步函数
-        import asyncio
-
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -203,6 +664,68 @@ def cached(key_pattern: str, expire: Optional[int] = None):
     return decorator
 
 
+def _canonicalize(value: Any) -> Any:
+    """将参数转换为稳定、可JSON序列化的规范形式"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return _canonicalize(value.value)
+    if isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {
+            k if isinstance(k, str) else _dumps(_canonicalize(k)): _canonicalize(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonicalize(v) for v in value), key=_dumps)
+    # ORM实例以 表名+主键 标识
+    table = getattr(value, "__table__", None)
+    if table is not None and getattr(value, "id", None) is not None:
+        return {"__model__": table.name, "id": value.id}
+    raise TypeError(f"无法为类型 {type(value).__name__} 生成稳定的缓存键")
+
+
+def _dumps(value: Any) -> str:
+    """规范JSON编码（键排序、无多余空白）"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def stable_digest(value: Any) -> str:
+    """
+    计算跨进程稳定的参数摘要
+
+    与内置 hash() 不同，结果不受 PYTHONHASHSEED 影响，不同worker与重启之间保持一致
+    """
+    encoded = _dumps(_canonicalize(value)).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """生成带命名空间与版本前缀的完整缓存键"""
+    return ":".join(
+        [settings.CACHE_KEY_PREFIX, f"v{settings.CACHE_VERSION}", *map(str, parts)]
+    )
+
+
+def state_key(*parts: Any) -> str:
+    """
+    生成状态键：带命名空间前缀、不带缓存版本
+
+    用于令牌吊销、限流与登录失败计数等必须持续有效的状态，递增 CACHE_VERSION
+    或 flush_all 清空缓存数据时不受影响。
+    """
+    return ":".join([settings.CACHE_KEY_PREFIX, *map(str, parts)])
+
+
 def cache_key(*args, **kwargs) -> str:
     """生成缓存键"""
     key_parts = []
@@ -212,14 +735,14 @@ def cache_key(*args, **kwargs) -> str:
         if isinstance(arg, (str, int, float)):
             key_parts.append(str(arg))
         else:
-            key_parts.append(str(hash(str(arg))))
+            key_parts.append(stable_digest(arg))
 
     # 添加关键字参数
     for k, v in sorted(kwargs.items()):
         if isinstance(v, (str, int, float)):
             key_parts.append(f"{k}:{v}")
         else:
-            key_parts.append(f"{k}:{hash(str(v))}")
+            key_parts.append(f"{k}:{stable_digest(v)}")
 
     return ":".join(key_parts)
 
@@ -227,14 +750,28 @@ def cache_key(*args, **kwargs) -> str:
 class MemoryCache:
     """内存缓存类（用于无Redis环境）"""
 
+    backend = "memory"
+    # 数据仅在当前进程可见，多worker时不能用于需要跨进程失效的缓存
+    shared = False
+
     def __init__(self, max_size: int = 1000):
         self._cache = {}
         self._max_size = max_size
+        self._tags: Dict[str, Set[str]] = {}
+        self._tombstones: Dict[str, float] = {}
 
+    @_timed("get")
     def get(self, key: str) -> Optional[Any]:
         """获取缓存"""
-        return self._cache.get(key)
+        namespace = key_namespace(key)
+        hot_keys.record(key)
+        if key in self._cache:
+            CACHE_HITS.labels(backend=self.backend, namespace=namespace).inc()
+            return self._cache[key]
+        CACHE_MISSES.labels(backend=self.backend, namespace=namespace).inc()
+        return None
 
+    @_timed("set")
     def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """设置缓存"""
         if len(self._cache) >= self._max_size:
@@ -245,6 +782,50 @@ class MemoryCache:
         self._cache[key] = value
         return True
 
+    @_timed("add")
+    def add(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        """键不存在时才设置缓存"""
+        if key in self._cache:
+            return False
+        return self.set(key, value, expire)
+
+    @_timed("set_with_tags")
+    def set_with_tags(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        expire: Optional[int] = None,
+    ) -> bool:
+        """设置缓存并关联标签"""
+        tags = list(tags)
+        now = monotonic()
+        if any(self._tombstones.get(tag, 0) > now for tag in tags):
+            return False
+
+        self.set(key, value, expire)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        return True
+
+    @_timed("invalidate_tags")
+    def invalidate_tags(self, *tags: str) -> int:
+        """按标签失效缓存"""
+        now = monotonic()
+        self._tombstones = {
+            tag: deadline
+            for tag, deadline in self._tombstones.items()
+            if deadline > now
+        }
+
+        removed = 0
+        for tag in tags:
+            self._tombstones[tag] = now + settings.CACHE_TAG_GRACE_SECONDS
+            for key in self._tags.pop(tag, ()):
+                removed += self.delete(key)
+        return removed
+
+    @_timed("delete")
     def delete(self, key: str) -> bool:
         """删除缓存"""
         if key in self._cache:
@@ -256,12 +837,170 @@ class MemoryCache:
         """检查缓存是否存在"""
         return key in self._cache
 
+    def eval_script(
+        self, script: str, keys: Iterable[str] = (), args: Iterable[Any] = ()
+    ) -> Optional[Any]:
+        """内存缓存不支持Lua脚本，调用方需自行降级"""
+        return None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量获取缓存"""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """批量设置缓存"""
+        for key, value in mapping.items():
+            self.set(key, value, expire)
+        return True
+
+    def iter_keys(self, pattern: str = "*", count: int = 500) -> Iterator[str]:
+        """迭代匹配的键"""
+        for key in list(self._cache):
+            if fnmatch.fnmatchcase(key, pattern):
+                yield key
+
+    def keys(self, pattern: str = "*") -> list:
+        """获取匹配的键"""
+        return list(self.iter_keys(pattern))
+
+    @_timed("delete_pattern")
+    def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """按模式删除键"""
+        return sum(self.delete(key) for key in self.keys(pattern))
+
+    async def adelete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """按模式删除键"""
+        return self.delete_pattern(pattern, batch_size)
+
     def flush_all(self) -> bool:
         """清空所有缓存"""
         self._cache.clear()
+        self._tags.clear()
         return True
 
 
-# 如果Redis不可用，使用内存缓存作为后备
-if not cache.redis_client:
-    cache = MemoryCache()
+class FailoverCache:
+    """
+    Redis优先、内存兜底的缓存
+
+    Redis不可用时自动降级到进程内缓存，健康检查发现Redis恢复后自动切回。
+    降级期间的标签失效与删除会在切回时补发到Redis，避免读到降级前的旧数据。
+    """
+
+    def __init__(
+        self, primary: RedisCache, fallback: MemoryCache, max_pending: int = 10000
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self._max_pending = max_pending
+        self._pending_tags: Set[str] = set()
+        self._pending_keys: Set[str] = set()
+        self._pending_overflow = False
+        self._degraded = False
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def current(self) -> Union[RedisCache, MemoryCache]:
+        """当前生效的缓存后端"""
+        if self.primary.available:
+            if self._degraded:
+                self._recover()
+            return self.primary
+
+        if not self._degraded:
+            logger.warning("Redis不可用，降级为内存缓存")
+            self._degraded = True
+        return self.fallback
+
+    @property
+    def redis_client(self) -> Optional[redis.Redis]:
+        """Redis客户端，不可用时为None"""
+        return self.primary.redis_client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.current, name)
+
+    def delete(self, key: str) -> bool:
+        """删除缓存"""
+        backend = self.current
+        deleted = backend.delete(key)
+        if backend is self.fallback or not self.primary.available:
+            self._remember(self._pending_keys, [key])
+        return deleted
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """按标签失效缓存"""
+        backend = self.current
+        removed = backend.invalidate_tags(*tags)
+        if backend is self.fallback or not self.primary.available:
+            self._remember(self._pending_tags, tags)
+        return removed
+
+    def _remember(self, pending: Set[str], items: Iterable[str]) -> None:
+        """记录降级期间的失效操作，超出上限时改为恢复后清空命名空间"""
+        if self._pending_overflow:
+            return
+        pending.update(items)
+        if len(self._pending_tags) + len(self._pending_keys) > self._max_pending:
+            self._pending_overflow = True
+            self._pending_tags.clear()
+            self._pending_keys.clear()
+
+    def _recover(self) -> None:
+        """Redis恢复后补发降级期间的失效操作并切回"""
+        self._degraded = False
+        if self._pending_overflow:
+            logger.warning("降级期间的失效操作过多，清空缓存命名空间")
+            self.primary.flush_all()
+        else:
+            if self._pending_tags:
+                self.primary.invalidate_tags(*self._pending_tags)
+            for key in self._pending_keys:
+                self.primary.delete(key)
+        self._pending_tags.clear()
+        self._pending_keys.clear()
+        self._pending_overflow = False
+        self.fallback.flush_all()
+        logger.info("Redis已恢复，切回Redis缓存")
+
+    def check_health(self) -> bool:
+        """探测Redis，恢复时立即切回"""
+        healthy = self.primary.check_health()
+        if healthy and self._degraded:
+            self._recover()
+        return healthy
+
+    async def run_health_checks(self, interval: Optional[float] = None) -> None:
+        """后台定期健康检查"""
+        interval = interval or settings.REDIS_HEALTH_CHECK_INTERVAL
+        self.primary.monitored = True
+        try:
+            while True:
+                await asyncio.to_thread(self.check_health)
+                await asyncio.sleep(interval)
+        finally:
+            self.primary.monitored = False
+
+    def start_health_checks(self) -> None:
+        """启动后台健康检查任务"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self.run_health_checks())
+
+    async def stop_health_checks(self) -> None:
+        """停止后台健康检查任务"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+
+# 全局缓存实例（首次使用时才连接Redis）
+cache = FailoverCache(RedisCache(), MemoryCache())
@@ -6,11 +6,13 @@ import hashlib
 import secrets
 import string
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Sequence, TypeVar
 from pathlib import Path
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
 
 def generate_random_string(length: int = 32) -> str:
     """生成随机字符串"""
@@ -111,3 +113,9 @@ class Timer:
             return 0.0
         end = self.end_time or datetime.now()
         return (end - self.start_time).total_seconds()
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """按固定大小切分序列"""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
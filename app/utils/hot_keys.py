@@ -0,0 +1,107 @@
+"""
+热点键采样统计
+"""
+
+import hashlib
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class CountMinSketch:
+    """Count-Min Sketch：以固定内存估计元素出现频次（只会高估，不会低估）"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, item: str) -> List[int]:
+        """双重哈希得到每一行的位置"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item: str, count: int = 1) -> int:
+        """累加计数并返回新的估计值"""
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(item), strict=True):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        """估计元素出现次数"""
+        return min(
+            row[index]
+            for row, index in zip(self._rows, self._indexes(item), strict=True)
+        )
+
+    def decay(self) -> None:
+        """所有计数减半，让统计偏向近期访问"""
+        for row in self._rows:
+            for i, value in enumerate(row):
+                row[i] = value >> 1
+
+
+class HotKeyTracker:
+    """
+    采样的Top-K热点键追踪器
+
+    按采样率记录访问，用Count-Min Sketch估计频次，并维护估计值最高的K个键。
+    每累计 decay_every 次采样后计数减半。
+    """
+
+    def __init__(
+        self,
+        k: int = 20,
+        sample_rate: float = 0.01,
+        width: int = 2048,
+        depth: int = 4,
+        decay_every: int = 10000,
+    ):
+        self.k = k
+        self.sample_rate = sample_rate
+        self.decay_every = decay_every
+        self._sketch = CountMinSketch(width=width, depth=depth)
+        self._top: Dict[str, int] = {}
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, key: str) -> None:
+        """记录一次键访问（按采样率抽样）"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+
+        with self._lock:
+            estimate = self._sketch.add(key)
+            if key in self._top or len(self._top) < self.k:
+                self._top[key] = estimate
+            else:
+                coldest = min(self._top, key=self._top.__getitem__)
+                if estimate > self._top[coldest]:
+                    del self._top[coldest]
+                    self._top[key] = estimate
+
+            self._samples += 1
+            if self._samples >= self.decay_every:
+                self._sketch.decay()
+                self._top = {key: count >> 1 for key, count in self._top.items()}
+                self._samples = 0
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """返回热点键及按采样率换算后的估计访问次数"""
+        with self._lock:
+            ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        scale = 1 / self.sample_rate if self.sample_rate > 0 else 0
+        return [(key, round(count * scale)) for key, count in ranked[: n or self.k]]
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._sketch = CountMinSketch(
+                width=self._sketch.width, depth=self._sketch.depth
+            )
+            self._top.clear()
+            self._samples = 0
@@ -59,7 +59,7 @@ def serve(host, port, reload):
 def create_user(username, email, password, superuser):
     """创建新用户"""
     async def _create_user():
-        from app.core.security import get_password_hash
+        from app.core.hashing import password_hasher
         from app.db.session import AsyncSessionLocal
         from app.db.models.user import User
         
@@ -77,7 +77,7 @@ def create_user(username, email, password, superuser):
                 return
             
             # 创建用户
-            hashed_password = get_password_hash(password)
+            hashed_password = await password_hasher.hash(password)
             user_obj = User(
                 username=username,
                 email=email,
@@ -96,6 +96,27 @@ def create_user(username, email, password, superuser):
     asyncio.run(_create_user())
 
 
+@cli.command()
+@click.option('--scheme', type=click.Choice(['bcrypt', 'argon2']), default=None, help='哈希方案，默认取当前配置')
+@click.option('--target-ms', default=250.0, help='目标单次校验耗时（毫秒）')
+@click.option('--samples', default=3, help='每档成本的测量次数')
+def bench_hash(scheme, target_ms, samples):
+    """按目标校验耗时校准本机的密码哈希成本"""
+    from app.core.hashing import calibrate
+
+    scheme = scheme or settings.PASSWORD_HASH_SCHEME
+    click.echo(f"⏱️ 校准 {scheme} 成本，目标校验耗时 {target_ms:.0f}ms ...")
+    cost, duration = calibrate(scheme, target_ms / 1000, samples=samples)
+
+    click.echo(f"实测校验耗时: {duration * 1000:.1f}ms")
+    click.echo("建议配置:")
+    click.echo(f"PASSWORD_HASH_SCHEME={scheme}")
+    for name, value in cost.items():
+        click.echo(f"PASSWORD_{name.upper()}={value}")
+    if duration > target_ms / 1000:
+        click.echo("⚠️ 最低成本已超出目标耗时")
+
+
 @cli.command()
 def test():
     """运行测试"""
@@ -139,32 +160,43 @@ def lint():
 
 
 @cli.command()
-def db_migrate():
+@click.option('--revision', default='head', help='目标版本，默认最新版本')
+def db_migrate(revision):
     """运行数据库迁移"""
-    import subprocess
-    
-    click.echo("📦 运行数据库迁移...")
-    result = subprocess.run(["alembic", "upgrade", "head"])
-    
-    if result.returncode == 0:
-        click.echo("✅ 数据库迁移完成")
-    else:
-        click.echo("❌ 数据库迁移失败")
+    from app.db import migrations
+
+    click.echo(f"📦 运行数据库迁移（目标版本 {revision}）...")
+    try:
+        migrations.upgrade(revision)
+    except Exception as e:
+        click.echo(f"❌ 数据库迁移失败: {e}")
+        raise SystemExit(1)
+    click.echo("✅ 数据库迁移完成")
+
+
+@cli.command()
+@click.argument('revision')
+def db_stamp(revision):
+    """将已有数据库标记为指定版本（不执行迁移）"""
+    from app.db import migrations
+
+    migrations.stamp(revision)
+    click.echo(f"✅ 数据库已标记为版本 {revision}")
 
 
 @cli.command()
 @click.option('--message', '-m', prompt='迁移信息', help='迁移描述信息')
 def db_revision(message):
     """创建新的数据库迁移"""
-    import subprocess
-    
+    from app.db import migrations
+
     click.echo(f"📝 创建数据库迁移: {message}")
-    result = subprocess.run(["alembic", "revision", "--autogenerate", "-m", message])
-    
-    if result.returncode == 0:
-        click.echo("✅ 迁移文件创建成功")
-    else:
-        click.echo("❌ 迁移文件创建失败")
+    try:
+        migrations.revision(message)
+    except Exception as e:
+        click.echo(f"❌ 迁移文件创建失败: {e}")
+        raise SystemExit(1)
+    click.echo("✅ 迁移文件创建成功")
 
 
 @cli.command()
@@ -184,7 +216,7 @@ def shell():
     """启动交互式Shell"""
     import IPython
     from app.db.session import AsyncSessionLocal
-    from app.db.models import *
+    from app.db.models import User, Item, ChatMessage, ChatSession
     from app.core.config import settings
     
     click.echo("🐍 启动交互式Shell")
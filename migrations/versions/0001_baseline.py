@@ -0,0 +1,116 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+与引入令牌版本（user.token_version）之前由 Base.metadata.create_all 创建的
+表结构一致。已有数据库无需执行本迁移，按其实际结构标记版本后再升级：
+
+- 没有 user.token_version 列：
+    alembic stamp 0001 && alembic upgrade head
+- 有 user.token_version 列，但还没有 0003 的索引：
+    alembic stamp 0002 && alembic upgrade head
+- 由当前模型的 create_all 创建：
+    alembic stamp head
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("full_name", sa.String(length=100), nullable=True),
+        sa.Column("avatar_url", sa.String(length=500), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("last_login", sa.DateTime(), nullable=True),
+        sa.Column("login_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+    op.create_index("ix_user_id", "user", ["id"], unique=False)
+    op.create_index("ix_user_username", "user", ["username"], unique=True)
+
+    op.create_table(
+        "item",
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_item_id", "item", ["id"], unique=False)
+    op.create_index("ix_item_title", "item", ["title"], unique=False)
+
+    op.create_table(
+        "chat_sessions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_chat_sessions_id", "chat_sessions", ["id"], unique=False)
+
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("tokens_used", sa.Integer(), nullable=True),
+        sa.Column("model_used", sa.String(length=50), nullable=True),
+        sa.Column("response_time", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_sessions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_chat_messages_id", "chat_messages", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_id", table_name="chat_messages")
+    op.drop_table("chat_messages")
+    op.drop_index("ix_chat_sessions_id", table_name="chat_sessions")
+    op.drop_table("chat_sessions")
+    op.drop_index("ix_item_title", table_name="item")
+    op.drop_index("ix_item_id", table_name="item")
+    op.drop_table("item")
+    op.drop_index("ix_user_username", table_name="user")
+    op.drop_index("ix_user_id", table_name="user")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
@@ -0,0 +1,74 @@
+"""indexes for hot query patterns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:02
+
+- item(owner_id, id)：按所有者过滤并按主键分页
+- item(id) WHERE is_active：活跃物品列表的部分索引
+- chat_sessions(user_id, updated_at DESC)：会话列表
+- chat_messages(session_id, created_at)：消息历史
+- chat_sessions.updated_at 增加服务端默认值并回填空值，排序不再受 NULL 影响
+
+在大表上执行时建表锁会阻塞写入，可在低峰期执行，或对 PostgreSQL 改为手工
+CREATE INDEX CONCURRENTLY 后 alembic stamp 0003。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_item_owner_id_id", "item", ["owner_id", "id"], unique=False)
+    op.create_index(
+        "ix_item_active_id",
+        "item",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("is_active = true"),
+        sqlite_where=sa.text("is_active = 1"),
+    )
+
+    op.execute(
+        "UPDATE chat_sessions SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    )
+    with op.batch_alter_table("chat_sessions") as batch_op:
+        batch_op.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        )
+    op.create_index(
+        "ix_chat_sessions_user_id_updated_at",
+        "chat_sessions",
+        ["user_id", sa.text("updated_at DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_chat_messages_session_id_created_at",
+        "chat_messages",
+        ["session_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_session_id_created_at", table_name="chat_messages")
+    op.drop_index("ix_chat_sessions_user_id_updated_at", table_name="chat_sessions")
+    with op.batch_alter_table("chat_sessions") as batch_op:
+        batch_op.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            server_default=None,
+            nullable=True,
+        )
+    op.drop_index("ix_item_active_id", table_name="item")
+    op.drop_index("ix_item_owner_id_id", table_name="item")
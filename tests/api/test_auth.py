@@ -86,3 +86,172 @@ async def test_get_current_user_without_token(client: AsyncClient):
     """测试无令牌获取当前用户信息"""
     response = await client.get("/api/v1/auth/me")
     assert response.status_code == 401  # Unauthorized
+
+
+async def _login(client: AsyncClient, user_data: dict) -> dict:
+    """注册并登录，返回令牌对"""
+    await client.post("/api/v1/auth/register", json=user_data)
+    login_data = {"username": user_data["username"], "password": user_data["password"]}
+    response = await client.post("/api/v1/auth/login", json=login_data)
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(client: AsyncClient, user_data: dict):
+    """测试刷新令牌轮换与重复使用检测"""
+    tokens = await _login(client, user_data)
+
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # 旧刷新令牌被重复使用：整个令牌族被吊销
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": rotated["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_revocation_store_unavailable(
+    client: AsyncClient, user_data: dict, monkeypatch
+):
+    """测试吊销存储不可用时刷新返回503，令牌族不被吊销"""
+    from app.core.revocation import token_revocations
+
+    tokens = await _login(client, user_data)
+    with monkeypatch.context() as patch:
+        patch.setattr(token_revocations, "claim", lambda token_id, expires_in: None)
+        response = await client.post(
+            "/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]}
+        )
+    assert response.status_code == 503
+
+    # 刷新令牌未被登记为已使用，存储恢复后仍可正常刷新
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_access_token_cannot_refresh(client: AsyncClient, user_data: dict):
+    """测试访问令牌不能用于刷新"""
+    tokens = await _login(client, user_data)
+
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": tokens["access_token"]}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_tokens(client: AsyncClient, user_data: dict):
+    """测试退出登录后令牌立即失效"""
+    tokens = await _login(client, user_data)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+    response = await client.post("/api/v1/auth/logout", headers=headers)
+    assert response.status_code == 200
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+    response = await client.post(
+        "/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint(client: AsyncClient):
+    """测试JWKS端点"""
+    response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "keys" in response.json()
+    assert "max-age" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_auth_rate_limit(client: AsyncClient, monkeypatch):
+    """测试认证接口限流"""
+    from app.core.config import settings
+    from app.core.rate_limit import AUTH_POLICY, rate_limiter
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    rate_limiter.reset()
+
+    params = {"refresh_token": "invalid"}
+    for _ in range(AUTH_POLICY.limit):
+        response = await client.post("/api/v1/auth/refresh", params=params)
+        assert response.status_code == 401
+
+    response = await client.post("/api/v1/auth/refresh", params=params)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["RateLimit-Limit"] == str(AUTH_POLICY.limit)
+    assert response.headers["RateLimit-Remaining"] == "0"
+
+    rate_limiter.reset()
+
+
+@pytest.mark.asyncio
+async def test_login_lockout(client: AsyncClient, user_data: dict, monkeypatch):
+    """测试连续登录失败后锁定，锁定期内不再校验密码"""
+    from app.core.config import settings
+    from app.core.hashing import password_hasher
+    from app.core.login_guard import login_guard
+
+    await client.post("/api/v1/auth/register", json=user_data)
+
+    monkeypatch.setattr(settings, "LOGIN_GUARD_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_USER", 2)
+    login_guard.reset()
+
+    wrong = {"username": user_data["username"], "password": "wrongpassword"}
+    for _ in range(2):
+        response = await client.post("/api/v1/auth/login", json=wrong)
+        assert response.status_code == 401
+
+    verify_calls = []
+    original_run = password_hasher._run
+
+    async def counting_run(operation, func, *args):
+        verify_calls.append(operation)
+        return await original_run(operation, func, *args)
+
+    monkeypatch.setattr(password_hasher, "_run", counting_run)
+
+    # 锁定期内即使密码正确也被拒绝，且不执行密码校验
+    correct = {"username": user_data["username"], "password": user_data["password"]}
+    response = await client.post("/api/v1/auth/login", json=correct)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert verify_calls == []
+
+    login_guard.reset()
+
+
+@pytest.mark.asyncio
+async def test_login_hasher_busy(client: AsyncClient, user_data: dict, monkeypatch):
+    """测试密码哈希队列已满时登录返回503"""
+    from app.core.hashing import password_hasher
+
+    await client.post("/api/v1/auth/register", json=user_data)
+    monkeypatch.setattr(password_hasher, "max_queue", 0)
+
+    login_data = {"username": user_data["username"], "password": user_data["password"]}
+    response = await client.post("/api/v1/auth/login", json=login_data)
+    assert response.status_code == 503
@@ -5,6 +5,8 @@
 import pytest
 from httpx import AsyncClient
 
+from app.core.config import settings
+
 
 async def get_auth_headers(client: AsyncClient, user_data: dict):
     """获取认证头"""
@@ -135,3 +137,192 @@ async def test_get_my_items(client: AsyncClient, user_data: dict, item_data: dic
     assert isinstance(data, list)
     assert len(data) > 0
     assert data[0]["title"] == item_data["title"]
+
+
+@pytest.mark.asyncio
+async def test_get_my_items_with_cursor(
+    client: AsyncClient, user_data: dict, item_data: dict
+):
+    """测试按游标获取我的物品"""
+    user_data = {**user_data, "username": "cursoruser", "email": "cursor@example.com"}
+    headers = await get_auth_headers(client, user_data)
+    for index in range(3):
+        await client.post(
+            "/api/v1/items/",
+            json={**item_data, "title": f"cursor item {index}"},
+            headers=headers,
+        )
+
+    # 页码分页满页时同样返回下一页游标
+    response = await client.get("/api/v1/items/my?page_size=2", headers=headers)
+    assert response.status_code == 200
+    first = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get(
+        "/api/v1/items/my", params={"page_size": 2, "cursor": cursor}, headers=headers
+    )
+    assert response.status_code == 200
+    second = response.json()
+    assert "X-Next-Cursor" not in response.headers
+    assert [item["title"] for item in first + second] == [
+        f"cursor item {index}" for index in range(3)
+    ]
+
+    # 空游标从第一页开始
+    response = await client.get(
+        "/api/v1/items/my", params={"page_size": 2, "cursor": ""}, headers=headers
+    )
+    assert response.json() == first
+
+    response = await client.get(
+        "/api/v1/items/my", params={"cursor": "invalid"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_items(client: AsyncClient, user_data: dict, item_data: dict):
+    """测试批量创建、更新与删除物品"""
+    user_data = {**user_data, "username": "batchuser", "email": "batch@example.com"}
+    headers = await get_auth_headers(client, user_data)
+
+    response = await client.post(
+        "/api/v1/items/batch",
+        json={
+            "items": [{**item_data, "title": f"batch {index}"} for index in range(3)]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()]
+    assert len(ids) == 3
+
+    response = await client.patch(
+        "/api/v1/items/batch",
+        json={"items": [{"id": ids[0], "title": "renamed"}, {"id": ids[1]}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()] == ["renamed", "batch 1"]
+
+    response = await client.request(
+        "DELETE", "/api/v1/items/batch", json={"ids": ids[:2]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "已删除 2 个物品"
+
+
+@pytest.mark.asyncio
+async def test_batch_items_ownership(
+    client: AsyncClient, user_data: dict, item_data: dict
+):
+    """测试批量操作中含他人或不存在的物品时整体拒绝"""
+    owner = {**user_data, "username": "batchowner", "email": "batchowner@example.com"}
+    other = {**user_data, "username": "batchother", "email": "batchother@example.com"}
+    owner_headers = await get_auth_headers(client, owner)
+    other_headers = await get_auth_headers(client, other)
+
+    response = await client.post(
+        "/api/v1/items/batch", json={"items": [item_data]}, headers=owner_headers
+    )
+    owned_id = response.json()[0]["id"]
+    response = await client.post(
+        "/api/v1/items/batch", json={"items": [item_data]}, headers=other_headers
+    )
+    other_id = response.json()[0]["id"]
+
+    response = await client.request(
+        "DELETE",
+        "/api/v1/items/batch",
+        json={"ids": [owned_id, other_id]},
+        headers=owner_headers,
+    )
+    assert response.status_code == 403
+
+    response = await client.patch(
+        "/api/v1/items/batch",
+        json={"items": [{"id": owned_id, "title": "x"}, {"id": 999999}]},
+        headers=owner_headers,
+    )
+    assert response.status_code == 404
+
+    # 批量更新不支持乐观并发检查，携带 updated_at 时拒绝请求
+    response = await client.patch(
+        "/api/v1/items/batch",
+        json={
+            "items": [
+                {"id": owned_id, "title": "x", "updated_at": "2000-01-01T00:00:00"}
+            ]
+        },
+        headers=owner_headers,
+    )
+    assert response.status_code == 422
+
+    # 被拒绝的请求没有修改任何物品
+    response = await client.get(f"/api/v1/items/{owned_id}")
+    assert response.json()["title"] == item_data["title"]
+
+
+@pytest.mark.asyncio
+async def test_update_item_stale_version(
+    client: AsyncClient, user_data: dict, item_data: dict
+):
+    """测试携带过期的 updated_at 更新物品返回409"""
+    user_data = {**user_data, "username": "versionapi", "email": "vapi@example.com"}
+    headers = await get_auth_headers(client, user_data)
+    created = (
+        await client.post("/api/v1/items/", json=item_data, headers=headers)
+    ).json()
+
+    response = await client.put(
+        f"/api/v1/items/{created['id']}",
+        json={"title": "Stale", "updated_at": "2000-01-01T00:00:00"},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    response = await client.put(
+        f"/api/v1/items/{created['id']}",
+        json={"title": "Fresh", "updated_at": created["updated_at"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Fresh"
+
+
+@pytest.mark.asyncio
+async def test_query_stats_headers(
+    client: AsyncClient, user_data: dict, item_data: dict, monkeypatch
+):
+    """测试开发环境返回每个请求的SQL语句数与数据库耗时"""
+    monkeypatch.setattr(settings, "ENVIRONMENT", "development")
+    user_data = {**user_data, "username": "statsuser", "email": "stats@example.com"}
+    headers = await get_auth_headers(client, user_data)
+
+    response = await client.get("/api/v1/items/my", headers=headers)
+    assert int(response.headers["X-DB-Queries"]) > 0
+    assert response.headers["X-DB-Time"].endswith("ms")
+
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    response = await client.get("/api/v1/items/my", headers=headers)
+    assert "X-DB-Queries" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_my_items_query_budget(
+    client: AsyncClient, user_data: dict, item_data: dict, query_budget
+):
+    """测试获取我的物品的SQL语句数不随物品数量增长"""
+    user_data = {**user_data, "username": "budgetuser", "email": "budget@example.com"}
+    headers = await get_auth_headers(client, user_data)
+
+    for count in (1, 10):
+        while (
+            len((await client.get("/api/v1/items/my", headers=headers)).json()) < count
+        ):
+            await client.post("/api/v1/items/", json=item_data, headers=headers)
+
+        with query_budget(2):
+            response = await client.get("/api/v1/items/my", headers=headers)
+        assert len(response.json()) == count
@@ -3,14 +3,20 @@ pytest配置文件
 """
 
 import asyncio
+import os
 import pytest
+from contextlib import contextmanager
 from typing import AsyncGenerator
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+# 测试使用最低的bcrypt成本，需在导入应用之前设置
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
 from app.main import app
 from app.core.config import settings
 from app.db.base import Base
+from app.db.instrumentation import instrument_queries, track_queries
 from app.db.session import get_db
 
 
@@ -23,6 +29,7 @@ test_engine = create_async_engine(
     echo=False,
     future=True,
 )
+instrument_queries(test_engine)
 
 # 创建测试会话工厂
 TestSessionLocal = async_sessionmaker(
@@ -62,13 +69,18 @@ async def db_session(setup_database) -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    db_session: AsyncSession, monkeypatch
+) -> AsyncGenerator[AsyncClient, None]:
     """创建测试客户端"""
 
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # 测试用例共享同一客户端IP，默认关闭限流与登录防护，需要时在用例中单独开启
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "LOGIN_GUARD_ENABLED", False)
 
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         yield client
@@ -76,6 +88,31 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_budget():
+    """
+    查询预算：作用域内执行的SQL语句数超过预算时测试失败
+
+    用法：with query_budget(3): await client.get(...)
+    失败信息按SQL指纹列出执行次数，重复出现的指纹通常意味着 N+1 查询。
+    """
+
+    @contextmanager
+    def budget(max_queries: int):
+        with track_queries(keep_statements=True) as stats:
+            yield stats
+        if stats.count > max_queries:
+            details = "\n".join(
+                f"  {count} x {fingerprint}"
+                for fingerprint, count in stats.fingerprints().most_common()
+            )
+            pytest.fail(
+                f"执行了 {stats.count} 条SQL，超出预算 {max_queries} 条:\n{details}"
+            )
+
+    return budget
+
+
 @pytest.fixture
 def user_data():
     """测试用户数据"""
@@ -0,0 +1,143 @@
+"""
+仓库批量写入集成测试
+"""
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.db import cache_invalidation
+from app.db.base import Base
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import ItemRepository
+from app.schemas.item import ItemCreate
+
+
+class TagRecorder:
+    """记录提交后失效的缓存标签"""
+
+    def __init__(self):
+        self.tags = set()
+
+    def invalidate_tags(self, *tags):
+        self.tags.update(tags)
+
+
+@pytest.fixture
+async def session(tmp_path, monkeypatch):
+    """独立数据库与一个用户"""
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 4)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bulk.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(
+            User(username="owner", email="owner@example.com", hashed_password="x")
+        )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(session):
+    """记录执行的SQL语句"""
+    executed = []
+    engine = session.bind.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    """替换缓存失效的目标"""
+    recorder = TagRecorder()
+    monkeypatch.setattr(cache_invalidation, "cache", recorder)
+    return recorder.tags
+
+
+def item_rows(count: int):
+    return [ItemCreate(title=f"item {index}") for index in range(count)]
+
+
+class TestBulkOperations:
+    """批量写入测试"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_create(self, session, statements, invalidated):
+        """测试按块多行插入并取回记录"""
+        repo = ItemRepository()
+        items = await repo.bulk_create_with_owner(
+            session, objs_in=item_rows(10), owner_id=1
+        )
+
+        assert [item.id for item in items] == list(range(1, 11))
+        assert all(item.created_at is not None for item in items)
+        inserts = [sql for sql in statements if sql.startswith("INSERT")]
+        assert len(inserts) == 3
+        assert {"item:1", "item:10", "item:list", "owner:1:items"} <= invalidated
+
+    @pytest.mark.asyncio
+    async def test_bulk_update(self, session, statements, invalidated):
+        """测试按主键批量更新"""
+        repo = ItemRepository()
+        await repo.bulk_create_with_owner(session, objs_in=item_rows(6), owner_id=1)
+        statements.clear()
+        invalidated.clear()
+
+        items = await repo.bulk_update(
+            session,
+            rows=[
+                {"id": 1, "title": "renamed"},
+                {"id": 2, "is_active": False},
+                {"id": 3},
+            ],
+            tags=["owner:1:items"],
+        )
+
+        assert [(item.id, item.title, item.is_active) for item in items] == [
+            (1, "renamed", True),
+            (2, "item 1", False),
+            (3, "item 2", True),
+        ]
+        updates = [sql for sql in statements if sql.startswith("UPDATE")]
+        assert len(updates) == 2  # 两种列组合各一次 executemany
+        assert invalidated == {
+            "item:list",
+            "item:1",
+            "item:2",
+            "item:3",
+            "owner:1:items",
+        }
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete(self, session, statements, invalidated):
+        """测试按块批量删除"""
+        repo = ItemRepository()
+        await repo.bulk_create_with_owner(session, objs_in=item_rows(10), owner_id=1)
+        statements.clear()
+
+        deleted = await repo.bulk_delete(session, ids=list(range(1, 10)) + [99])
+
+        assert deleted == 9
+        assert await session.scalar(select(func.count(Item.id))) == 1
+        deletes = [sql for sql in statements if sql.startswith("DELETE")]
+        assert len(deletes) == 3
+        assert "item:99" in invalidated
+
+    @pytest.mark.asyncio
+    async def test_owner_ids(self, session):
+        """测试一次查询获取物品所有者"""
+        repo = ItemRepository()
+        await repo.bulk_create_with_owner(session, objs_in=item_rows(3), owner_id=1)
+
+        assert await repo.get_owner_ids(session, ids=[1, 3, 42]) == {1: 1, 3: 1}
@@ -0,0 +1,85 @@
+"""
+聊天服务查询测试
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.instrumentation import instrument_queries
+from app.db.models.chat import ChatMessage, ChatSession
+from app.db.models.user import User
+from app.services import chat_service
+from app.services.chat_service import ChatService
+
+
+@pytest.fixture
+async def service(tmp_path, monkeypatch):
+    """独立数据库上的聊天服务（不创建 OpenAI 客户端）"""
+    monkeypatch.setattr(chat_service, "OpenAIService", lambda: None)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+    instrument_queries(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(
+            User(id=1, username="chat", email="chat@example.com", hashed_password="x")
+        )
+        await session.commit()
+        yield ChatService(session)
+
+    await engine.dispose()
+
+
+async def add_sessions(service: ChatService, message_counts) -> None:
+    """为用户1创建会话，每个会话包含给定数量的消息"""
+    for index, count in enumerate(message_counts):
+        chat = ChatSession(user_id=1, title=f"chat {index}")
+        service.db.add(chat)
+        await service.db.flush()
+        service.db.add_all(
+            ChatMessage(session_id=chat.id, role="user", content=str(n))
+            for n in range(count)
+        )
+    await service.db.commit()
+
+
+class TestUserSessions:
+    """会话列表测试"""
+
+    @pytest.mark.asyncio
+    async def test_message_counts(self, service):
+        """测试返回各会话的消息数（包括没有消息的会话）"""
+        await add_sessions(service, [3, 0, 1])
+
+        sessions = await service.get_user_sessions_with_message_count(1)
+
+        assert sorted((s.title, count) for s, count in sessions) == [
+            ("chat 0", 3),
+            ("chat 1", 0),
+            ("chat 2", 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_single_query_regardless_of_sessions(self, service, query_budget):
+        """测试会话数增加时查询数不变（不逐个会话加载消息）"""
+        await add_sessions(service, [2] * 20)
+
+        with query_budget(1):
+            sessions = await service.get_user_sessions_with_message_count(1)
+
+        assert len(sessions) == 20
+
+    @pytest.mark.asyncio
+    async def test_budget_reports_repeated_queries(self, service, query_budget):
+        """测试超出预算时按指纹列出重复的查询"""
+        await add_sessions(service, [1] * 3)
+        sessions = await service.get_user_sessions(1)
+
+        with pytest.raises(
+            pytest.fail.Exception, match=r"超出预算 1 条:\n  3 x SELECT"
+        ):
+            with query_budget(1):
+                for session in sessions:
+                    await service.db.refresh(session, ["messages"])
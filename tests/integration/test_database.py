@@ -240,3 +240,364 @@ class TestRelationships:
         )
         assert len(user_items) == 2
         assert all(item.owner_id == user.id for item in user_items)
+
+
+@pytest.mark.asyncio
+class TestRegistration:
+    """注册唯一性测试"""
+
+    async def test_find_conflict(self, db_session: AsyncSession):
+        """测试一次查询判断冲突字段"""
+        user = User(
+            username="conflictuser",
+            email="conflict@example.com",
+            hashed_password=get_password_hash("password123"),
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        assert (
+            await user_repository.find_conflict(
+                db_session, username="conflictuser", email="other@example.com"
+            )
+            == "username"
+        )
+        assert (
+            await user_repository.find_conflict(
+                db_session, username="otheruser", email="conflict@example.com"
+            )
+            == "email"
+        )
+        assert (
+            await user_repository.find_conflict(
+                db_session, username="otheruser", email="other@example.com"
+            )
+            is None
+        )
+
+    async def test_insert_unique(self, db_session: AsyncSession):
+        """测试冲突插入返回None而不是抛出异常"""
+        values = {
+            "username": "uniqueuser",
+            "email": "unique@example.com",
+            "hashed_password": get_password_hash("password123"),
+        }
+        user = await user_repository.insert_unique(db_session, values=values)
+        assert user is not None
+        assert user.id is not None
+        assert user.is_active is True
+        assert user.created_at is not None
+
+        duplicate = {**values, "username": "uniqueuser2"}
+        assert await user_repository.insert_unique(db_session, values=duplicate) is None
+
+    async def test_concurrent_registration(self, db_session: AsyncSession, monkeypatch):
+        """测试检查之后被并发注册抢先时返回冲突"""
+        from app.core.exceptions import ConflictException
+        from app.schemas.user import UserRegister
+        from app.services.user_service import user_service
+
+        user_in = UserRegister(
+            username="raceuser", email="race@example.com", password="Password123"
+        )
+        find_conflict = user_repository.find_conflict
+        calls = []
+
+        async def stale_check(db, *, username, email):
+            # 首次检查时对方尚未提交，之后对方抢先插入
+            calls.append(username)
+            if len(calls) == 1:
+                result = await find_conflict(db, username=username, email=email)
+                db.add(
+                    User(
+                        username="raceuser",
+                        email="race-other@example.com",
+                        hashed_password="x",
+                    )
+                )
+                await db.commit()
+                return result
+            return await find_conflict(db, username=username, email=email)
+
+        monkeypatch.setattr(user_repository, "find_conflict", stale_check)
+        with pytest.raises(ConflictException) as exc_info:
+            await user_service.register(db_session, user_in=user_in)
+
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.detail == "用户名已存在"
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+class TestPasswordRehash:
+    """登录后升级密码哈希测试"""
+
+    async def test_rehash_after_login(self, db_session: AsyncSession, monkeypatch):
+        """测试旧成本的哈希在登录成功后于后台升级"""
+        import asyncio
+
+        from app.core import hashing
+        from app.core.security import build_password_context
+        from app.schemas.user import UserLogin
+        from app.services.user_service import user_service
+        from tests.conftest import TestSessionLocal
+
+        old_hash = build_password_context(bcrypt_rounds=4).hash("Password123")
+        user = User(
+            username="rehashuser", email="rehash@example.com", hashed_password=old_hash
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        monkeypatch.setattr(
+            hashing, "pwd_context", build_password_context(bcrypt_rounds=5)
+        )
+        monkeypatch.setattr(user_service, "session_factory", TestSessionLocal)
+
+        await user_service.login(
+            db_session,
+            user_in=UserLogin(username="rehashuser", password="Password123"),
+        )
+        await asyncio.gather(*user_service._background_tasks)
+
+        async with TestSessionLocal() as session:
+            stored = await user_repository.get(session, id=user.id)
+        assert stored.hashed_password.startswith("$2b$05$")
+        assert stored.token_version == user.token_version
+        assert hashing.pwd_context.verify("Password123", stored.hashed_password)
+
+
+@pytest.fixture
+def statements(db_session: AsyncSession):
+    """记录会话执行的SQL语句"""
+    from sqlalchemy import event
+
+    executed = []
+    engine = db_session.bind.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+class TestReturningWrites:
+    """单语句写入测试"""
+
+    async def _owner(self, db_session: AsyncSession, username: str) -> User:
+        """创建物品所有者"""
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password=get_password_hash("testpass123"),
+        )
+        db_session.add(user)
+        await db_session.commit()
+        return user
+
+    async def test_create_update_delete(self, db_session: AsyncSession, statements):
+        """测试创建、更新、删除各只执行一条语句"""
+        from app.schemas.item import ItemCreate, ItemUpdate
+
+        owner = await self._owner(db_session, "returninguser")
+        statements.clear()
+
+        item = await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="Returning Item"), owner_id=owner.id
+        )
+        assert item.id is not None
+        assert item.created_at is not None
+        assert [sql.split()[0] for sql in statements] == ["INSERT"]
+
+        statements.clear()
+        updated = await item_repository.update(
+            db_session, db_obj=item, obj_in=ItemUpdate(title="Renamed")
+        )
+        assert updated is item
+        assert item.title == "Renamed"
+        assert [sql.split()[0] for sql in statements] == ["UPDATE"]
+
+        statements.clear()
+        deleted = await item_repository.delete(db_session, id=item.id)
+        assert deleted.id == item.id
+        assert [sql.split()[0] for sql in statements] == ["DELETE"]
+        assert await item_repository.delete(db_session, id=item.id) is None
+
+    async def test_writes_invalidate_tags(self, db_session: AsyncSession, monkeypatch):
+        """测试单语句写入登记缓存失效标签"""
+        from app.db import cache_invalidation
+        from app.schemas.item import ItemCreate
+
+        invalidated = []
+        monkeypatch.setattr(
+            cache_invalidation.cache,
+            "invalidate_tags",
+            lambda *tags: invalidated.extend(tags),
+        )
+        owner = await self._owner(db_session, "taggeduser")
+
+        item = await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="Tagged Item"), owner_id=owner.id
+        )
+        assert f"item:{item.id}" in invalidated
+        assert f"owner:{owner.id}:items" in invalidated
+
+        invalidated.clear()
+        await item_repository.update(db_session, db_obj=item, obj_in={"title": "x"})
+        assert "item:list" in invalidated
+
+        invalidated.clear()
+        await item_repository.delete(db_session, id=item.id)
+        assert f"item:{item.id}" in invalidated
+
+
+@pytest.mark.asyncio
+class TestPartialUpdate:
+    """部分更新测试"""
+
+    async def _item(self, db_session: AsyncSession, username: str) -> Item:
+        """创建所有者与物品"""
+        from app.schemas.item import ItemCreate
+
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password=get_password_hash("testpass123"),
+        )
+        db_session.add(user)
+        await db_session.commit()
+        return await item_repository.create_with_owner(
+            db_session,
+            obj_in=ItemCreate(title="Partial Item", description="keep"),
+            owner_id=user.id,
+        )
+
+    async def test_only_changed_columns(self, db_session: AsyncSession, statements):
+        """测试只写入变化的列，无变化时不执行SQL"""
+        item = await self._item(db_session, "partialuser")
+        statements.clear()
+
+        await item_repository.update(
+            db_session,
+            db_obj=item,
+            obj_in={"title": "Changed", "description": "keep", "unknown": 1},
+        )
+        assert len(statements) == 1
+        assert "title=" in statements[0]
+        assert "description" not in statements[0].split("RETURNING")[0]
+
+        statements.clear()
+        same = await item_repository.update(
+            db_session, db_obj=item, obj_in={"title": "Changed", "description": "keep"}
+        )
+        assert same is item
+        assert statements == []
+
+    async def test_version_check(self, db_session: AsyncSession):
+        """测试乐观并发检查"""
+        from datetime import timedelta
+
+        from app.core.exceptions import ConflictException
+
+        item = await self._item(db_session, "versionuser")
+        read_at = item.updated_at
+
+        with pytest.raises(ConflictException):
+            await item_repository.update(
+                db_session,
+                db_obj=item,
+                obj_in={"title": "Stale"},
+                expected_updated_at=read_at - timedelta(seconds=1),
+            )
+
+        stored = await item_repository.get(db_session, id=item.id)
+        assert stored.title == "Partial Item"
+
+        updated = await item_repository.update(
+            db_session,
+            db_obj=stored,
+            obj_in={"title": "Fresh"},
+            expected_updated_at=read_at,
+        )
+        assert updated.title == "Fresh"
+
+    async def test_version_check_without_changes(
+        self, db_session: AsyncSession, statements
+    ):
+        """测试没有变化的更新同样检查版本，不执行写入"""
+        from datetime import timedelta
+
+        from app.core.exceptions import ConflictException
+
+        item = await self._item(db_session, "noopversionuser")
+        read_at = item.updated_at
+        statements.clear()
+
+        with pytest.raises(ConflictException):
+            await item_repository.update(
+                db_session,
+                db_obj=item,
+                obj_in={"title": item.title},
+                expected_updated_at=read_at - timedelta(seconds=1),
+            )
+
+        same = await item_repository.update(
+            db_session,
+            db_obj=item,
+            obj_in={"title": item.title},
+            expected_updated_at=read_at,
+        )
+        assert same is item
+        assert not any(sql.startswith("UPDATE") for sql in statements)
+
+
+@pytest.mark.asyncio
+class TestRowProjection:
+    """列表投影查询测试"""
+
+    async def test_fields_match_response_model(self):
+        """测试投影字段与列表响应模型一致"""
+        from app.schemas.item import Item as ItemSchema
+        from app.schemas.user import User as UserSchema
+
+        assert set(item_repository.row_fields) == set(ItemSchema.model_fields)
+        assert set(user_repository.row_fields) == set(UserSchema.model_fields)
+
+    async def test_list_returns_rows(self, db_session: AsyncSession, statements):
+        """测试列表查询只读取投影列，结果不进入会话"""
+        user = User(
+            username="rowuser",
+            email="rowuser@example.com",
+            hashed_password=get_password_hash("password123"),
+            bio="很长的简介",
+        )
+        db_session.add(user)
+        await db_session.commit()
+        db_session.add_all(
+            Item(title=f"Row Item {index}", description="x" * 1000, owner_id=user.id)
+            for index in range(3)
+        )
+        await db_session.commit()
+        db_session.expunge_all()
+        statements.clear()
+
+        items = await item_repository.get_by_owner(db_session, owner_id=user.id)
+        users = await user_repository.get_multi(db_session, skip=0, limit=1000)
+
+        assert [type(row) for row in items] == [item_repository.row_type] * 3
+        assert [row.title for row in items] == [f"Row Item {i}" for i in range(3)]
+        assert items[0].description == "x" * 1000
+        assert "rowuser" in [row.username for row in users]
+        assert not hasattr(users[0], "hashed_password")
+        assert "hashed_password" not in statements[-1]
+        assert "bio" not in statements[-1]
+        assert len(db_session.identity_map) == 0
+
+        # 行元组同样可生成游标
+        page = await item_repository.get_page_by_owner(
+            db_session, owner_id=user.id, cursor=item_repository.cursor_for(items[0])
+        )
+        assert page.items == items[1:]
@@ -0,0 +1,160 @@
+"""
+登录统计写回集成测试
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_password_hash
+from app.db.models.user import User
+from app.services.login_activity import LoginActivityRecorder
+from tests.conftest import TestSessionLocal
+
+
+async def create_user(db_session: AsyncSession, username: str) -> User:
+    """创建测试用户"""
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password=get_password_hash("Secret123"),
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def load(user_id: int) -> User:
+    """用新会话读取用户"""
+    async with TestSessionLocal() as session:
+        return await session.scalar(select(User).where(User.id == user_id))
+
+
+class TestLoginActivityRecorder:
+    """登录统计写回测试"""
+
+    @pytest.mark.asyncio
+    async def test_flush_coalesces_logins(self, db_session: AsyncSession):
+        """测试同一用户的多次登录合并为一次写入"""
+        first = await create_user(db_session, "activity_first")
+        second = await create_user(db_session, "activity_second")
+        updated_at = first.updated_at
+        recorder = LoginActivityRecorder(session_factory=TestSessionLocal)
+
+        now = datetime.utcnow().replace(microsecond=0)
+        recorder.record(first.id, now - timedelta(minutes=1))
+        recorder.record(first.id, now)
+        recorder.record(first.id, now - timedelta(minutes=2))
+        recorder.record(second.id, now)
+        assert recorder.pending == 2
+
+        statements = []
+        engine = TestSessionLocal.kw["bind"].sync_engine
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            assert await recorder.flush() == 2
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+        assert recorder.pending == 0
+
+        first = await load(first.id)
+        assert first.login_count == 3
+        assert first.last_login == now
+        assert first.updated_at == updated_at
+        assert (await load(second.id)).login_count == 1
+
+        # 再次写入在已有计数上累加
+        recorder.record(second.id, now)
+        await recorder.flush()
+        assert (await load(second.id)).login_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_pending(self, db_session: AsyncSession):
+        """测试写入失败时统计放回缓冲区"""
+        user = await create_user(db_session, "activity_retry")
+
+        def broken_session():
+            raise RuntimeError("数据库不可用")
+
+        recorder = LoginActivityRecorder(session_factory=broken_session)
+        recorder.record(user.id)
+        assert await recorder.flush() == 0
+        recorder.record(user.id)
+        assert recorder.pending == 1
+
+        recorder.session_factory = TestSessionLocal
+        assert await recorder.flush() == 1
+        assert (await load(user.id)).login_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining(self, db_session: AsyncSession):
+        """测试停止后台任务时写入剩余统计，待写用户过多时提前写入"""
+        first = await create_user(db_session, "activity_stop")
+        second = await create_user(db_session, "activity_early")
+        recorder = LoginActivityRecorder(
+            session_factory=TestSessionLocal, interval=3600, max_pending=2
+        )
+        recorder.start_flush()
+
+        recorder.record(first.id)
+        recorder.record(second.id)
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if recorder.pending == 0:
+                break
+        assert recorder.pending == 0
+
+        recorder.record(first.id)
+        await recorder.stop_flush()
+        assert recorder.pending == 0
+        assert (await load(first.id)).login_count == 2
+        assert (await load(second.id)).login_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_during_flush_keeps_batch(self, db_session: AsyncSession):
+        """测试后台写入进行中停止任务时等待写入完成，不丢失已取出的统计"""
+        user = await create_user(db_session, "activity_inflight")
+        recorder = LoginActivityRecorder(
+            session_factory=TestSessionLocal, interval=3600, max_pending=1
+        )
+        started, release = asyncio.Event(), asyncio.Event()
+        original_update = recorder._update
+
+        async def slow_update(session, rows):
+            started.set()
+            await release.wait()
+            await original_update(session, rows)
+
+        recorder._update = slow_update
+        recorder.start_flush()
+        recorder.record(user.id)
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        stop = asyncio.create_task(recorder.stop_flush())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stop
+
+        assert recorder.pending == 0
+        assert (await load(user.id)).login_count == 1
+
+    def test_postgresql_statement(self):
+        """测试PostgreSQL下生成单条 UPDATE ... FROM (VALUES ...)"""
+        now = datetime.utcnow()
+        stmt = LoginActivityRecorder._values_update([(1, 2, now), (2, 1, now)])
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert sql.count("UPDATE") == 1
+        assert "FROM (VALUES" in sql
+        # 登录不修改 updated_at
+        assert 'updated_at="user".updated_at' in sql.replace(" ", "")
@@ -0,0 +1,292 @@
+"""
+数据库迁移与查询计划测试
+
+在临时SQLite数据库上执行全部迁移，检查迁移结果与模型定义一致，并用
+EXPLAIN QUERY PLAN 检查各仓库查询使用了预期的索引。
+"""
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.migrations import (
+    SchemaVersionError,
+    alembic_config,
+    check_schema_version,
+    head_revision,
+)
+from app.db.models.chat import ChatMessage, ChatSession
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import item_repository
+from app.db.repositories.user_repository import user_repository
+from app.services import chat_service
+from app.services.chat_service import ChatService
+
+
+def migrate(engine, action, revision: str) -> None:
+    """在给定引擎上执行迁移"""
+    config = alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        action(config, revision)
+
+
+def insert_user(conn) -> None:
+    """按基线表结构写入一个用户"""
+    conn.execute(
+        text(
+            "INSERT INTO user (id, username, email, hashed_password, is_active,"
+            " is_superuser, is_verified, login_count, created_at, updated_at)"
+            " VALUES (1, 'u', 'u@example.com', 'x', 1, 0, 0, 0,"
+            " CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        )
+    )
+
+
+@pytest.fixture
+def sync_engine(tmp_path):
+    """空的临时数据库"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    """迁移测试"""
+
+    def test_upgrade_matches_models(self, sync_engine):
+        """测试迁移到最新版本后与模型定义一致"""
+        migrate(sync_engine, command.upgrade, "head")
+
+        with sync_engine.connect() as conn:
+            assert (
+                compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+            )
+
+    def test_downgrade_to_base(self, sync_engine):
+        """测试可完整回滚"""
+        migrate(sync_engine, command.upgrade, "head")
+        migrate(sync_engine, command.downgrade, "base")
+
+        assert inspect(sync_engine).get_table_names() == ["alembic_version"]
+
+    def test_baseline_has_no_token_version(self, sync_engine):
+        """测试基线版本与引入令牌版本之前的表结构一致"""
+        migrate(sync_engine, command.upgrade, "0001")
+
+        columns = {
+            column["name"] for column in inspect(sync_engine).get_columns("user")
+        }
+        assert "token_version" not in columns
+
+    def test_token_version_defaults_for_existing_users(self, sync_engine):
+        """测试为已有用户添加令牌版本列，默认值为0"""
+        migrate(sync_engine, command.upgrade, "0001")
+        with sync_engine.begin() as conn:
+            insert_user(conn)
+
+        migrate(sync_engine, command.upgrade, "0002")
+
+        with sync_engine.connect() as conn:
+            assert conn.execute(text("SELECT token_version FROM user")).scalar() == 0
+
+    def test_backfill_session_updated_at(self, sync_engine):
+        """测试为已有会话回填 updated_at"""
+        migrate(sync_engine, command.upgrade, "0001")
+        with sync_engine.begin() as conn:
+            insert_user(conn)
+            conn.execute(
+                text("INSERT INTO chat_sessions (user_id, title) VALUES (1, 't')")
+            )
+
+        migrate(sync_engine, command.upgrade, "head")
+
+        with sync_engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT created_at, updated_at FROM chat_sessions")
+            ).one()
+        assert row.updated_at is not None
+        assert row.updated_at == row.created_at
+
+
+@pytest.fixture
+async def async_engine(sync_engine):
+    """指向同一临时数据库的异步引擎"""
+    engine = create_async_engine(
+        str(sync_engine.url).replace("sqlite:", "sqlite+aiosqlite:")
+    )
+    yield engine
+    await engine.dispose()
+
+
+class TestSchemaVersionCheck:
+    """启动时迁移版本检查测试"""
+
+    async def test_head_passes(self, sync_engine, async_engine):
+        """测试已迁移到最新版本时通过检查"""
+        migrate(sync_engine, command.upgrade, "head")
+
+        await check_schema_version(async_engine)
+
+    async def test_outdated_revision_rejected(self, sync_engine, async_engine):
+        """测试迁移版本落后时拒绝启动"""
+        migrate(sync_engine, command.upgrade, "0001")
+
+        with pytest.raises(SchemaVersionError, match=head_revision()):
+            await check_schema_version(async_engine)
+
+    async def test_unmigrated_database_rejected(self, async_engine):
+        """测试未执行过迁移的数据库拒绝启动"""
+        with pytest.raises(SchemaVersionError, match="未迁移"):
+            await check_schema_version(async_engine)
+
+
+@pytest.fixture
+async def seeded(sync_engine):
+    """迁移到最新版本并写入测试数据的数据库会话"""
+    migrate(sync_engine, command.upgrade, "head")
+
+    engine = create_async_engine(
+        str(sync_engine.url).replace("sqlite:", "sqlite+aiosqlite:")
+    )
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        users = [
+            User(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                hashed_password="x",
+            )
+            for index in range(20)
+        ]
+        session.add_all(users)
+        await session.flush()
+        for index in range(200):
+            session.add(
+                Item(
+                    title=f"item {index}",
+                    owner_id=users[index % 20].id,
+                    is_active=index % 4 == 0,
+                )
+            )
+        for user in users:
+            chat = ChatSession(user_id=user.id, title="chat")
+            session.add(chat)
+            await session.flush()
+            session.add_all(
+                ChatMessage(session_id=chat.id, role="user", content=f"m{index}")
+                for index in range(5)
+            )
+        await session.commit()
+        # 让查询规划器使用真实的数据分布
+        await session.execute(text("ANALYZE"))
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def captured(seeded):
+    """记录会话执行的SELECT语句及参数"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = seeded.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+async def query_plan(session: AsyncSession, statement: str, parameters) -> str:
+    """EXPLAIN QUERY PLAN 的文本结果"""
+    conn = await session.connection()
+    raw = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return "\n".join(row[-1] for row in raw.all())
+
+
+QUERIES = [
+    ("user.get", lambda db: user_repository.get(db, id=3), "INTEGER PRIMARY KEY"),
+    (
+        "user.get_by_email",
+        lambda db: user_repository.get_by_email(db, email="user3@example.com"),
+        "ix_user_email",
+    ),
+    (
+        "user.get_by_username",
+        lambda db: user_repository.get_by_username(db, username="user3"),
+        "ix_user_username",
+    ),
+    (
+        "user.find_conflict",
+        lambda db: user_repository.find_conflict(
+            db, username="user3", email="x@example.com"
+        ),
+        "ix_user_username",
+    ),
+    (
+        "item.get_by_owner",
+        lambda db: item_repository.get_by_owner(db, owner_id=3, skip=0, limit=5),
+        "ix_item_owner_id_id",
+    ),
+    (
+        "item.get_page_by_owner",
+        lambda db: item_repository.get_page_by_owner(db, owner_id=3, limit=5),
+        "ix_item_owner_id_id",
+    ),
+    (
+        "item.get_active_items",
+        lambda db: item_repository.get_active_items(db, skip=0, limit=5),
+        "ix_item_active_id",
+    ),
+    (
+        "item.get_active_page",
+        lambda db: item_repository.get_active_page(db, limit=5),
+        "ix_item_active_id",
+    ),
+    (
+        "item.get_owner_ids",
+        lambda db: item_repository.get_owner_ids(db, ids=[1, 2, 3]),
+        "INTEGER PRIMARY KEY",
+    ),
+    (
+        "chat.get_user_sessions",
+        lambda db: ChatService(db).get_user_sessions(3),
+        "ix_chat_sessions_user_id_updated_at",
+    ),
+    (
+        "chat.get_user_sessions_with_message_count",
+        lambda db: ChatService(db).get_user_sessions_with_message_count(3),
+        "ix_chat_messages_session_id_created_at",
+    ),
+    (
+        "chat.get_session_messages",
+        lambda db: ChatService(db).get_session_messages(3, 3),
+        "ix_chat_messages_session_id_created_at",
+    ),
+]
+
+
+class TestQueryPlans:
+    """查询计划测试"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name,run,index", QUERIES, ids=[q[0] for q in QUERIES])
+    async def test_query_uses_index(
+        self, seeded, captured, monkeypatch, name, run, index
+    ):
+        """测试查询使用索引且不需要额外排序"""
+        # 查询本身不访问外部服务，不创建 OpenAI 客户端
+        monkeypatch.setattr(chat_service, "OpenAIService", lambda: None)
+        await run(seeded)
+        statement, parameters = captured[-1]
+
+        plan = await query_plan(seeded, statement, parameters)
+        assert index in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,110 @@
+"""
+仓库键集分页集成测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import ItemRepository
+
+
+@pytest.fixture
+async def session(tmp_path):
+    """独立数据库：两个用户，第一个用户25个物品（每三个中一个停用），第二个用户5个"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    started = datetime(2024, 1, 1)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        owners = [
+            User(username=name, email=f"{name}@example.com", hashed_password="x")
+            for name in ("owner_a", "owner_b")
+        ]
+        session.add_all(owners)
+        await session.flush()
+        for index in range(30):
+            session.add(
+                Item(
+                    title=f"item {index}",
+                    owner_id=owners[0].id if index < 25 else owners[1].id,
+                    is_active=index % 3 != 0,
+                    # 创建时间成对相同，检验主键作为第二排序键
+                    created_at=started + timedelta(minutes=index // 2),
+                )
+            )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+async def walk(fetch, limit):
+    """按游标遍历所有页，返回每页的ID"""
+    pages, cursor = [], None
+    while True:
+        page = await fetch(cursor=cursor, limit=limit)
+        pages.append([item.id for item in page.items])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+class TestKeysetPagination:
+    """键集分页测试"""
+
+    @pytest.mark.asyncio
+    async def test_walk_all_pages(self, session):
+        """测试按游标遍历所有记录，无重复无遗漏"""
+        repo = ItemRepository()
+        pages = await walk(lambda **kw: repo.get_page(session, **kw), limit=10)
+
+        assert [len(page) for page in pages] == [10, 10, 10]
+        ids = [item_id for page in pages for item_id in page]
+        assert ids == sorted(ids) == list(range(1, 31))
+
+    @pytest.mark.asyncio
+    async def test_exact_last_page(self, session):
+        """测试最后一页恰好满页时没有下一页游标"""
+        repo = ItemRepository()
+        pages = await walk(lambda **kw: repo.get_page(session, **kw), limit=15)
+        assert [len(page) for page in pages] == [15, 15]
+
+    @pytest.mark.asyncio
+    async def test_filtered_pages(self, session):
+        """测试带过滤条件的分页"""
+        repo = ItemRepository()
+        active = await walk(lambda **kw: repo.get_active_page(session, **kw), limit=7)
+        owned = await walk(
+            lambda **kw: repo.get_page_by_owner(session, owner_id=2, **kw), limit=2
+        )
+
+        assert sum(len(page) for page in active) == 20
+        assert owned == [[26, 27], [28, 29], [30]]
+
+    @pytest.mark.asyncio
+    async def test_descending_ordering(self, session):
+        """测试按创建时间降序、主键升序分页"""
+        repo = ItemRepository()
+        repo.ordering = ("-created_at",)
+        pages = await walk(lambda **kw: repo.get_page(session, **kw), limit=4)
+
+        ids = [item_id for page in pages for item_id in page]
+        assert ids[:4] == [29, 30, 27, 28]
+        assert sorted(ids) == list(range(1, 31))
+
+    @pytest.mark.asyncio
+    async def test_switch_from_offset(self, session):
+        """测试由页码分页结果生成的游标可继续按游标分页"""
+        repo = ItemRepository()
+        first = await repo.get_multi(session, skip=0, limit=10)
+        cursor = repo.next_cursor(first, 10)
+
+        page = await repo.get_page(session, cursor=cursor, limit=10)
+        assert [item.id for item in page.items] == list(range(11, 21))
+        assert repo.next_cursor(first[:5], 10) is None
@@ -0,0 +1,184 @@
+"""
+认证主体缓存集成测试
+"""
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import create_user_token_pair, decode_token, get_password_hash
+from app.db import cache_invalidation
+from app.db.models.user import User
+from app.db.repositories import user_repository as user_repository_module
+from app.db.repositories.user_repository import user_repository
+from app.schemas.user import UserUpdate
+from app.services.user_service import user_service
+from app.utils.cache import RedisCache
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """使用本地Redis替身作为共享二级缓存"""
+    redis_cache = RedisCache(client=fakeredis.FakeRedis())
+    monkeypatch.setattr(user_repository_module, "cache", redis_cache)
+    monkeypatch.setattr(cache_invalidation, "cache", redis_cache)
+    monkeypatch.setattr(settings, "CACHE_TAG_GRACE_SECONDS", 0)
+    user_repository._principals.clear()
+    yield redis_cache
+    user_repository._principals.clear()
+
+
+@pytest.fixture
+def statements(db_session: AsyncSession):
+    """记录会话执行的SQL语句"""
+    executed = []
+    engine = db_session.bind.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+class TestPrincipalCache:
+    """认证主体缓存测试"""
+
+    async def _create_user(self, db_session: AsyncSession, name: str) -> User:
+        user = User(
+            username=name,
+            email=f"{name}@example.com",
+            hashed_password=get_password_hash("password123"),
+        )
+        db_session.add(user)
+        await db_session.commit()
+        return user
+
+    async def test_token_carries_user_id_and_version(self, db_session: AsyncSession):
+        """测试令牌声明携带用户ID与令牌版本"""
+        user = await self._create_user(db_session, "principal1")
+        token = create_user_token_pair(user)
+
+        claims = decode_token(token.access_token)
+        assert claims.user_id == user.id
+        assert claims.username == "principal1"
+        assert claims.token_version == 0
+        assert decode_token(token.refresh_token, token_type="refresh") is not None
+
+    async def test_repeated_lookup_issues_no_sql(
+        self, db_session: AsyncSession, shared_cache, statements
+    ):
+        """测试重复解析认证主体不再查询数据库"""
+        user = await self._create_user(db_session, "principal2")
+        await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+        db_session.expunge_all()
+        statements.clear()
+
+        principal = await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+
+        assert statements == []
+        assert principal.username == "principal2"
+        assert principal in db_session
+
+    async def test_shared_tier_serves_other_processes(
+        self, db_session: AsyncSession, shared_cache, statements
+    ):
+        """测试进程内缓存未命中时由共享缓存提供"""
+        user = await self._create_user(db_session, "principal3")
+        await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+        user_repository._principals.clear()
+        db_session.expunge_all()
+        statements.clear()
+
+        principal = await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+
+        assert statements == []
+        assert principal.email == "principal3@example.com"
+
+    async def test_stale_token_version_is_rejected(
+        self, db_session: AsyncSession, shared_cache
+    ):
+        """测试令牌版本不一致时拒绝"""
+        user = await self._create_user(db_session, "principal4")
+
+        assert (
+            await user_repository.get_principal(
+                db_session, user_id=user.id, token_version=1
+            )
+            is None
+        )
+
+    async def test_password_change_revokes_cached_principal(
+        self, db_session: AsyncSession, shared_cache
+    ):
+        """测试修改密码后旧令牌失效"""
+        user = await self._create_user(db_session, "principal5")
+        principal = await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+
+        await user_service.update_user(
+            db_session,
+            current_user=principal,
+            user_in=UserUpdate(password="newpassword123"),
+        )
+
+        assert (
+            await user_repository.get_principal(
+                db_session, user_id=user.id, token_version=0
+            )
+            is None
+        )
+        assert await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=1
+        )
+
+    async def test_profile_update_refreshes_cached_principal(
+        self, db_session: AsyncSession, shared_cache
+    ):
+        """测试资料更新后缓存中的认证主体随之更新"""
+        user = await self._create_user(db_session, "principal6")
+        principal = await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+
+        await user_service.update_user(
+            db_session, current_user=principal, user_in=UserUpdate(full_name="新名字")
+        )
+        user_repository._principals.clear()
+        db_session.expunge_all()
+
+        principal = await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+        assert principal.full_name == "新名字"
+
+    async def test_delete_invalidates_cached_principal(
+        self, db_session: AsyncSession, shared_cache
+    ):
+        """测试删除用户后认证主体失效"""
+        user = await self._create_user(db_session, "principal7")
+        await user_repository.get_principal(
+            db_session, user_id=user.id, token_version=0
+        )
+
+        await user_service.delete_user(db_session, user_id=user.id)
+
+        assert (
+            await user_repository.get_principal(
+                db_session, user_id=user.id, token_version=0
+            )
+            is None
+        )
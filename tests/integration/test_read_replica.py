@@ -0,0 +1,171 @@
+"""
+读写分离集成测试
+
+主库与副本为两个独立的SQLite文件，副本中的数据与主库不同，借此判断查询的去向。
+"""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import item_repository
+from app.db.routing import ReplicaSet, RoutingSession
+
+
+def make_user(username: str) -> User:
+    """构造测试用户"""
+    return User(username=username, email=f"{username}@example.com", hashed_password="x")
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    """主库与副本；同一ID的用户在两个库中用户名不同"""
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine, username in ((primary, "on_primary"), (replica, "on_replica")):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(make_user(username))
+            await session.commit()
+
+    replicas = ReplicaSet(primary, [replica], max_lag=5, sticky_seconds=5)
+    session_factory = async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replicas=replicas,
+        expire_on_commit=False,
+    )
+    yield replicas, session_factory
+
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def first_username(session: AsyncSession) -> str:
+    """读取ID为1的用户名"""
+    return await session.scalar(select(User.username).where(User.id == 1))
+
+
+class TestReadReplica:
+    """读写分离测试"""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica(self, databases):
+        """测试只读查询发往副本"""
+        _, session_factory = databases
+        async with session_factory() as session:
+            assert await first_username(session) == "on_replica"
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_in_session(self, databases):
+        """测试会话内写入后读取主库"""
+        _, session_factory = databases
+        async with session_factory() as session:
+            session.add(make_user("new_user"))
+            await session.commit()
+
+            assert await first_username(session) == "on_primary"
+            assert (
+                await session.scalar(select(User.id).where(User.username == "new_user"))
+                is not None
+            )
+
+    @pytest.mark.asyncio
+    async def test_write_request_uses_primary(self, databases):
+        """测试非只读请求整个会话使用主库"""
+        replicas, session_factory = databases
+        async with session_factory() as session:
+            replicas.prepare(session, read_only=False)
+            assert await first_username(session) == "on_primary"
+
+    @pytest.mark.asyncio
+    async def test_sticky_after_write(self, databases):
+        """测试写入提交后同一主体的后续请求读取主库"""
+        replicas, session_factory = databases
+        async with session_factory() as session:
+            replicas.prepare(session, read_only=False, identity="user:42")
+            session.add(make_user("sticky_user"))
+            await session.commit()
+
+        async with session_factory() as session:
+            replicas.prepare(session, identity="user:42")
+            assert await first_username(session) == "on_primary"
+
+        # 其他主体不受影响
+        async with session_factory() as session:
+            replicas.prepare(session, identity="user:7")
+            assert await first_username(session) == "on_replica"
+
+    @pytest.mark.asyncio
+    async def test_no_sticky_without_write(self, databases):
+        """测试只读会话提交不开启粘滞窗口"""
+        replicas, session_factory = databases
+        async with session_factory() as session:
+            replicas.prepare(session, identity="user:9")
+            await first_username(session)
+            await session.commit()
+
+        assert not replicas.is_sticky("user:9")
+
+    @pytest.mark.asyncio
+    async def test_locked_owner_check_uses_primary(self, databases):
+        """测试加锁检查物品所有者在主库执行，之后的读取也使用主库"""
+        _, session_factory = databases
+        async with session_factory() as session:
+            session.add(Item(id=1, title="primary only", owner_id=1))
+            await session.commit()
+
+        async with session_factory() as session:
+            assert await item_repository.get_owner_ids(session, ids=[1]) == {}
+
+        async with session_factory() as session:
+            owners = await item_repository.get_owner_ids(session, ids=[1], lock=True)
+            assert owners == {1: 1}
+            assert await first_username(session) == "on_primary"
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_replica_falls_back(self, databases, tmp_path):
+        """测试副本不可用或延迟过大时回落到主库"""
+        replicas, session_factory = databases
+        replicas.max_lag = -1
+        await replicas.check_health()
+        assert not replicas.replicas[0].healthy
+
+        async with session_factory() as session:
+            assert await first_username(session) == "on_primary"
+
+        replicas.max_lag = 5
+        await replicas.check_health()
+        assert replicas.replicas[0].healthy
+
+        broken = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+        )
+        replicas.replicas[0].engine = broken
+        await replicas.check_health()
+        assert not replicas.replicas[0].healthy
+        await broken.dispose()
+
+    @pytest.mark.asyncio
+    async def test_without_replicas(self, tmp_path):
+        """测试未配置副本时使用会话的默认连接"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'only.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            replicas=ReplicaSet(engine),
+        )
+        async with session_factory() as session:
+            session.add(make_user("single"))
+            await session.commit()
+            assert await first_username(session) == "single"
+        await engine.dispose()
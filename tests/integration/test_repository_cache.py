@@ -0,0 +1,144 @@
+"""
+仓库读穿透缓存集成测试
+"""
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db import cache_invalidation
+from app.db.models.user import User
+from app.db.repositories import base_repository
+from app.db.repositories.item_repository import item_repository
+from app.schemas.item import ItemCreate
+from app.utils.cache import RedisCache
+
+
+@pytest.fixture
+def repo_cache(monkeypatch):
+    """启用仓库缓存并使用本地Redis替身"""
+    redis_cache = RedisCache(client=fakeredis.FakeRedis())
+    monkeypatch.setattr(base_repository, "cache", redis_cache)
+    monkeypatch.setattr(cache_invalidation, "cache", redis_cache)
+    monkeypatch.setattr(settings, "REPOSITORY_CACHE_ENABLED", True)
+    # 便于在测试中立即观察失效后的重新缓存
+    monkeypatch.setattr(settings, "CACHE_TAG_GRACE_SECONDS", 0)
+    return redis_cache
+
+
+@pytest.fixture
+def statements(db_session: AsyncSession):
+    """记录会话执行的SQL语句"""
+    executed = []
+    engine = db_session.bind.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+class TestRepositoryCache:
+    """仓库缓存测试"""
+
+    async def _create_owner(self, db_session: AsyncSession, name: str) -> User:
+        owner = User(
+            username=name,
+            email=f"{name}@example.com",
+            hashed_password=get_password_hash("password123"),
+        )
+        db_session.add(owner)
+        await db_session.commit()
+        return owner
+
+    async def test_get_is_served_from_cache(
+        self, db_session: AsyncSession, repo_cache, statements
+    ):
+        """测试重复读取命中缓存且不发出SQL"""
+        owner = await self._create_owner(db_session, "cacheowner1")
+        item = await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="缓存物品"), owner_id=owner.id
+        )
+
+        await item_repository.get(db_session, id=item.id)
+        db_session.expunge_all()
+        statements.clear()
+
+        cached_item = await item_repository.get(db_session, id=item.id)
+
+        assert statements == []
+        assert cached_item.title == "缓存物品"
+        assert cached_item in db_session
+
+    async def test_update_invalidates_cached_get(
+        self, db_session: AsyncSession, repo_cache
+    ):
+        """测试更新提交后失效单条缓存"""
+        owner = await self._create_owner(db_session, "cacheowner2")
+        item = await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="旧标题"), owner_id=owner.id
+        )
+        await item_repository.get(db_session, id=item.id)
+
+        await item_repository.update(
+            db_session, db_obj=item, obj_in={"title": "新标题"}
+        )
+        db_session.expunge_all()
+
+        fresh_item = await item_repository.get(db_session, id=item.id)
+        assert fresh_item.title == "新标题"
+
+    async def test_create_invalidates_owner_list(
+        self, db_session: AsyncSession, repo_cache
+    ):
+        """测试新建物品后失效所有者的列表缓存"""
+        owner = await self._create_owner(db_session, "cacheowner3")
+        await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="物品1"), owner_id=owner.id
+        )
+        items = await item_repository.get_by_owner(db_session, owner_id=owner.id)
+        assert len(items) == 1
+
+        await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="物品2"), owner_id=owner.id
+        )
+        items = await item_repository.get_by_owner(db_session, owner_id=owner.id)
+        assert len(items) == 2
+
+    async def test_list_rows_served_from_cache(
+        self, db_session: AsyncSession, repo_cache, statements
+    ):
+        """测试列表行元组缓存命中时不发出SQL"""
+        owner = await self._create_owner(db_session, "cacheowner5")
+        await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="列表物品"), owner_id=owner.id
+        )
+        items = await item_repository.get_by_owner(db_session, owner_id=owner.id)
+        statements.clear()
+
+        cached_items = await item_repository.get_by_owner(db_session, owner_id=owner.id)
+
+        assert statements == []
+        assert cached_items == items
+        assert type(cached_items[0]) is item_repository.row_type
+
+    async def test_rollback_discards_tags(self, db_session: AsyncSession, repo_cache):
+        """测试回滚的写入不会失效缓存"""
+        owner = await self._create_owner(db_session, "cacheowner4")
+        item = await item_repository.create_with_owner(
+            db_session, obj_in=ItemCreate(title="保持不变"), owner_id=owner.id
+        )
+        await item_repository.get(db_session, id=item.id)
+        key = item_repository._cache_key("get", item.id)
+
+        item.title = "未提交"
+        await db_session.flush()
+        await db_session.rollback()
+
+        assert repo_cache.exists(key)
@@ -0,0 +1,86 @@
+"""
+认证依赖开销基准测试
+
+对同一令牌反复调用 get_current_user 依赖，比较令牌缓存与认证主体缓存
+开启前后的单次请求开销（使用内存SQLite，不依赖外部服务）：
+    python -m tests.performance.bench_auth
+"""
+
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.deps import get_current_user
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_user_token_pair, get_password_hash
+from app.db.base import Base
+from app.db.models.user import User
+from app.db.repositories.user_repository import user_repository
+
+ITERATIONS = 2000
+
+SCENARIOS = [
+    ("无缓存", False, False),
+    ("仅令牌缓存", True, False),
+    ("仅认证主体缓存", False, True),
+    ("令牌缓存 + 认证主体缓存", True, True),
+]
+
+
+async def run_scenario(
+    session_factory: async_sessionmaker, token: str, iterations: int
+) -> float:
+    """返回单次依赖调用的平均耗时（微秒）"""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    security.verified_tokens.clear()
+    user_repository._principals.clear()
+
+    async with session_factory() as session:
+        # 预热
+        await get_current_user(db=session, credentials=credentials)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await get_current_user(db=session, credentials=credentials)
+            # 模拟每个请求使用新的会话状态
+            session.expunge_all()
+        elapsed = time.perf_counter() - start
+
+    return elapsed / iterations * 1_000_000
+
+
+async def main(iterations: int = ITERATIONS) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as session:
+        user = User(
+            username="bench",
+            email="bench@example.com",
+            hashed_password=get_password_hash("password123"),
+        )
+        session.add(user)
+        await session.commit()
+        token = create_user_token_pair(user).access_token
+
+    print(f"认证依赖开销（{iterations} 次，单位：微秒/请求）")
+    baseline = None
+    for name, token_cache, principal_cache in SCENARIOS:
+        settings.TOKEN_CACHE_ENABLED = token_cache
+        settings.PRINCIPAL_CACHE_ENABLED = principal_cache
+        per_request = await run_scenario(session_factory, token, iterations)
+        baseline = baseline or per_request
+        print(f"  {name:<24} {per_request:10.1f}  ({baseline / per_request:.1f}x)")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+启动阶段数据库开销基准测试
+
+对已迁移到最新版本的数据库，比较 worker 启动时执行 metadata.create_all 与只检查
+迁移版本的耗时和SQL语句数。每轮使用新建的引擎，包含建立连接的开销
+（使用临时SQLite文件，不依赖外部服务）：
+    python -m tests.performance.bench_boot
+"""
+
+import asyncio
+import tempfile
+import time
+from collections import Counter
+
+from alembic import command
+from loguru import logger
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+from app.db.migrations import alembic_config, check_schema_version
+
+ITERATIONS = 50
+
+
+async def create_all(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def measure(url: str, boot, iterations: int):
+    """返回每次启动的平均语句数与平均耗时（毫秒）"""
+    counts = Counter()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counts[statement.split(None, 1)[0].upper()] += 1
+
+    elapsed = 0.0
+    for _ in range(iterations):
+        engine = create_async_engine(url)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        start = time.perf_counter()
+        await boot(engine)
+        elapsed += time.perf_counter() - start
+        await engine.dispose()
+    per_boot = {kind: count / iterations for kind, count in counts.items()}
+    return per_boot, elapsed / iterations * 1000
+
+
+async def main(iterations: int = ITERATIONS) -> None:
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        config = alembic_config()
+        with sync_engine.begin() as conn:
+            config.attributes["connection"] = conn
+            command.upgrade(config, "head")
+        sync_engine.dispose()
+
+        url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        print(f"{'方式':<24}{'平均耗时(ms)':>14}  SQL语句数")
+        for name, boot in (
+            ("metadata.create_all", create_all),
+            ("check_schema_version", check_schema_version),
+        ):
+            per_boot, ms = await measure(url, boot, iterations)
+            total = sum(per_boot.values())
+            detail = ", ".join(f"{k} {v:g}" for k, v in sorted(per_boot.items()))
+            print(f"{name:<24}{ms:>14.2f}  {total:g} ({detail})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+JWT签名与验证吞吐基准测试
+
+分别测量各算法每秒可签发/验证的令牌数（不经过已验证令牌缓存）：
+    python -m tests.performance.bench_jwt
+"""
+
+import time
+import uuid
+
+from app.core.keys import JWTKeyring, generate_private_key_pem
+
+ALGORITHMS = ["HS256", "RS256", "ES256"]
+DURATION = 1.0
+
+
+def build(algorithm: str) -> JWTKeyring:
+    """创建指定算法的密钥环"""
+    if algorithm.startswith("HS"):
+        return JWTKeyring(algorithm, secret=uuid.uuid4().hex)
+    return JWTKeyring(algorithm, private_key=generate_private_key_pem(algorithm))
+
+
+def throughput(func, duration: float = DURATION) -> float:
+    """在给定时长内反复调用，返回每秒次数"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    claims = {
+        "sub": "1",
+        "username": "bench",
+        "ver": 0,
+        "jti": uuid.uuid4().hex,
+        "fam": uuid.uuid4().hex,
+        "exp": int(time.time()) + 3600,
+    }
+
+    print(f"{'算法':<8}{'签发/秒':>12}{'验证/秒':>12}{'令牌长度':>10}")
+    for algorithm in ALGORITHMS:
+        keyring = build(algorithm)
+        token = keyring.sign(claims)
+        sign_rate = throughput(lambda keyring=keyring: keyring.sign(claims))
+        verify_rate = throughput(
+            lambda keyring=keyring, token=token: keyring.decode(token)
+        )
+        print(f"{algorithm:<8}{sign_rate:>12.0f}{verify_rate:>12.0f}{len(token):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+分页查询基准测试
+
+比较页码（OFFSET）分页与游标（键集）分页读取深页的耗时。OFFSET 需要扫描并丢弃
+前面所有行，耗时随页码线性增长；游标分页沿主键索引直接定位（使用内存SQLite，
+不依赖外部服务）：
+    python -m tests.performance.bench_pagination
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import item_repository
+
+ROWS = 200_000
+PAGE_SIZE = 20
+PAGES = (1, 100, 1000, 5000, 10000)
+ITERATIONS = 50
+
+
+async def measure(session: AsyncSession, fetch, iterations: int) -> float:
+    """返回单次查询的平均耗时（毫秒）"""
+    await fetch()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fetch()
+        session.expunge_all()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main(iterations: int = ITERATIONS) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": "bench",
+                    "email": "bench@example.com",
+                    "hashed_password": "x",
+                }
+            ],
+        )
+        await conn.execute(
+            insert(Item),
+            [{"title": f"item {index}", "owner_id": 1} for index in range(ROWS)],
+        )
+
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    print(f"分页查询耗时（{ROWS} 行，每页 {PAGE_SIZE} 条，单位：毫秒/次）")
+    print(f"  {'页码':<8}{'OFFSET':>10}{'游标':>10}")
+    async with session_factory() as session:
+        for page in PAGES:
+            skip = (page - 1) * PAGE_SIZE
+            # 游标取自上一页的最后一行，与客户端逐页翻到此处时持有的游标相同
+            previous = await item_repository.get_multi(
+                session, skip=max(0, skip - PAGE_SIZE), limit=PAGE_SIZE
+            )
+            cursor = item_repository.next_cursor(previous, PAGE_SIZE) if skip else None
+
+            offset_ms = await measure(
+                session,
+                lambda skip=skip: item_repository.get_multi(
+                    session, skip=skip, limit=PAGE_SIZE
+                ),
+                iterations,
+            )
+            keyset_ms = await measure(
+                session,
+                lambda cursor=cursor: item_repository.get_page(
+                    session, cursor=cursor, limit=PAGE_SIZE
+                ),
+                iterations,
+            )
+            print(
+                f"  {page:<10}{offset_ms:10.2f}{keyset_ms:10.2f}"
+                f"  ({offset_ms / keyset_ms:.1f}x)"
+            )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
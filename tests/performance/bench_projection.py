@@ -0,0 +1,102 @@
+"""
+列表投影查询基准测试
+
+比较列表查询读取完整ORM对象与只读取响应字段的行元组时，每页100行的查询加序列化
+耗时与内存峰值（使用临时SQLite文件，不依赖外部服务）：
+    python -m tests.performance.bench_projection
+"""
+
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from loguru import logger
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.models.item import Item
+from app.db.models.user import User
+from app.db.repositories.item_repository import ItemRepository
+from app.db.repositories.user_repository import UserRepository
+from app.schemas.item import Item as ItemSchema
+from app.schemas.user import User as UserSchema
+
+ROWS = 100
+ITERATIONS = 300
+# 列表响应不需要的长文本列（用户简介）与需要返回的描述
+TEXT = "智导井冈" * 256
+
+
+async def seed(session: AsyncSession) -> None:
+    session.add_all(
+        User(
+            username=f"user{index}",
+            email=f"user{index}@example.com",
+            hashed_password="$2b$12$" + "x" * 53,
+            full_name=f"用户{index}",
+            bio=TEXT,
+        )
+        for index in range(ROWS)
+    )
+    await session.flush()
+    session.add_all(
+        Item(title=f"item {index}", description=TEXT, owner_id=index % ROWS + 1)
+        for index in range(ROWS)
+    )
+    await session.commit()
+
+
+async def measure(session: AsyncSession, fetch, adapter: TypeAdapter, iterations: int):
+    """返回每页平均耗时（毫秒）与单页内存峰值（KB）"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        adapter.dump_json(adapter.validate_python(await fetch(), from_attributes=True))
+        session.expunge_all()
+    elapsed = (time.perf_counter() - start) / iterations * 1000
+
+    tracemalloc.start()
+    adapter.dump_json(adapter.validate_python(await fetch(), from_attributes=True))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.expunge_all()
+    return elapsed, peak / 1024
+
+
+async def main(iterations: int = ITERATIONS) -> None:
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await seed(session)
+
+            print(f"{'列表':<8}{'方式':<10}{'每页耗时(ms)':>14}{'内存峰值(KB)':>14}")
+            for name, repository_class, schema in (
+                ("items", ItemRepository, ItemSchema),
+                ("users", UserRepository, UserSchema),
+            ):
+                adapter = TypeAdapter(List[schema])
+                for mode in ("ORM对象", "行元组"):
+                    repository = repository_class()
+                    if mode == "ORM对象":
+                        repository.row_fields = None
+
+                    async def fetch(repository=repository):
+                        return await repository.get_multi(session, skip=0, limit=ROWS)
+
+                    # 预热语句编译缓存
+                    await fetch()
+                    ms, kb = await measure(session, fetch, adapter, iterations)
+                    print(f"{name:<8}{mode:<10}{ms:>14.3f}{kb:>14.1f}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+写入接口SQL语句数基准测试
+
+统计创建、更新、删除物品与更新用户信息时每次API调用执行的SQL语句数与平均耗时
+（使用临时SQLite文件，不依赖外部服务）：
+    python -m tests.performance.bench_write_statements
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+
+ITERATIONS = 200
+
+
+class StatementCounter:
+    """按语句类型统计执行的SQL"""
+
+    def __init__(self, engine):
+        self.counts = Counter()
+        event.listen(engine.sync_engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.counts[statement.split(None, 1)[0].upper()] += 1
+
+    def reset(self) -> None:
+        self.counts.clear()
+
+
+async def measure(counter: StatementCounter, calls, iterations: int):
+    """返回每次调用的平均语句数（按类型）与平均耗时（毫秒）"""
+    counter.reset()
+    start = time.perf_counter()
+    for index in range(iterations):
+        response = await calls(index)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    per_call = {kind: count / iterations for kind, count in counter.counts.items()}
+    return per_call, elapsed / iterations * 1000
+
+
+async def main(iterations: int = ITERATIONS) -> None:
+    # 关闭请求日志，避免输出干扰结果
+    logger.remove()
+    settings.RATE_LIMIT_ENABLED = False
+    settings.LOGIN_GUARD_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        counter = StatementCounter(engine)
+
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            user = {
+                "username": "bench",
+                "email": "bench@example.com",
+                "password": "benchpass123",
+            }
+            await client.post("/api/v1/auth/register", json=user)
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": user["username"], "password": user["password"]},
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            # 预热认证主体缓存
+            await client.get("/api/v1/users/me", headers=headers)
+
+            ids = []
+
+            async def create(index):
+                response = await client.post(
+                    "/api/v1/items/", json={"title": f"item {index}"}, headers=headers
+                )
+                ids.append(response.json()["id"])
+                return response
+
+            scenarios = [
+                ("POST /items", create),
+                (
+                    "PUT /items/{id}",
+                    lambda index: client.put(
+                        f"/api/v1/items/{ids[index]}",
+                        json={"title": f"renamed {index}"},
+                        headers=headers,
+                    ),
+                ),
+                (
+                    "PUT /users/me",
+                    lambda index: client.put(
+                        "/api/v1/users/me",
+                        json={"full_name": f"Bench {index}"},
+                        headers=headers,
+                    ),
+                ),
+                (
+                    "DELETE /items/{id}",
+                    lambda index: client.delete(
+                        f"/api/v1/items/{ids[index]}", headers=headers
+                    ),
+                ),
+            ]
+
+            print(f"写入接口SQL语句数（{iterations} 次平均）")
+            for name, calls in scenarios:
+                per_call, latency = await measure(counter, calls, iterations)
+                detail = ", ".join(
+                    f"{kind} {count:g}" for kind, count in sorted(per_call.items())
+                )
+                print(
+                    f"  {name:<20} {sum(per_call.values()):4.1f} 条/次"
+                    f"  {latency:6.2f} ms  ({detail})"
+                )
+
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
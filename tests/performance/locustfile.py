@@ -0,0 +1,81 @@
+"""
+性能测试脚本（locust）
+
+模拟登录风暴的同时请求与认证无关的接口，用来观察密码哈希是否拖慢其他请求：
+    make perf-test
+    locust -f tests/performance/locustfile.py --host=http://localhost:8000
+
+关注 "[unrelated] /health" 一栏的延迟分位数——哈希在线程池中执行时，
+它应与无登录流量时基本一致；密码哈希排队过多时登录请求会返回503。
+"""
+
+import os
+import uuid
+
+from locust import HttpUser, between, events, task
+
+API_PREFIX = "/api/v1"
+PASSWORD = "LoadTest123"
+
+
+class LoginStormUser(HttpUser):
+    """持续登录的用户（每次登录都会触发一次bcrypt校验）"""
+
+    weight = int(os.getenv("LOGIN_USER_WEIGHT", "3"))
+    wait_time = between(0, 0.1)
+
+    def on_start(self):
+        """注册一个专用账号"""
+        self.username = f"load_{uuid.uuid4().hex[:12]}"
+        self.client.post(
+            f"{API_PREFIX}/auth/register",
+            json={
+                "username": self.username,
+                "email": f"{self.username}@example.com",
+                "password": PASSWORD,
+            },
+            name="[storm] register",
+        )
+
+    @task
+    def login(self):
+        """登录"""
+        with self.client.post(
+            f"{API_PREFIX}/auth/login",
+            json={"username": self.username, "password": PASSWORD},
+            name="[storm] login",
+            catch_response=True,
+        ) as response:
+            # 503 表示哈希队列已满，属于预期的削峰行为
+            if response.status_code == 503:
+                response.success()
+
+
+class UnrelatedTrafficUser(HttpUser):
+    """只访问与认证无关接口的用户，用于衡量登录风暴的外溢影响"""
+
+    weight = int(os.getenv("UNRELATED_USER_WEIGHT", "1"))
+    wait_time = between(0.05, 0.2)
+
+    @task(3)
+    def health(self):
+        """健康检查"""
+        self.client.get("/health", name="[unrelated] /health")
+
+    @task
+    def root(self):
+        """根路径"""
+        self.client.get("/", name="[unrelated] /")
+
+
+@events.quitting.add_listener
+def report_unrelated_latency(environment, **kwargs):
+    """退出时输出无关接口的延迟分位数"""
+    for name in ("[unrelated] /health", "[unrelated] /"):
+        entry = environment.stats.get(name, "GET")
+        if entry.num_requests:
+            print(
+                f"{name}: p50={entry.get_response_time_percentile(0.5):.0f}ms "
+                f"p95={entry.get_response_time_percentile(0.95):.0f}ms "
+                f"p99={entry.get_response_time_percentile(0.99):.0f}ms"
+            )
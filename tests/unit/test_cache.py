@@ -0,0 +1,352 @@
+"""
+缓存工具单元测试
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import fakeredis
+import pytest
+from prometheus_client import REGISTRY
+from redis.sentinel import SentinelConnectionPool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.utils import cache as cache_module
+from app.utils.cache import (
+    FailoverCache,
+    MemoryCache,
+    RedisCache,
+    cache_key,
+    cached,
+    create_redis_client,
+    key_namespace,
+    make_key,
+    stable_digest,
+    state_key,
+)
+
+
+class TestCacheKey:
+    """缓存键测试"""
+
+    def test_stable_digest_across_processes(self):
+        """测试摘要不受PYTHONHASHSEED影响"""
+        code = (
+            "from app.utils.cache import stable_digest;"
+            "print(stable_digest({'tags': {'a', 'b'}, 'ids': (1, 2)}))"
+        )
+        digests = set()
+        for seed in ("1", "2"):
+            env = {**os.environ, "PYTHONHASHSEED": seed}
+            output = subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            digests.add(output.stdout.strip().splitlines()[-1])
+
+        assert digests == {stable_digest({"tags": {"a", "b"}, "ids": (1, 2)})}
+
+    def test_canonical_encoding(self):
+        """测试规范编码"""
+        # 字典顺序不影响结果
+        assert stable_digest({"a": 1, "b": 2}) == stable_digest({"b": 2, "a": 1})
+        # 不同类型的值不会冲突
+        assert stable_digest(1) != stable_digest("1")
+        assert stable_digest([1, 2]) != stable_digest([2, 1])
+        # 日期时间按ISO格式编码
+        dt = datetime(2024, 1, 1, 12, 0, 0)
+        assert stable_digest(dt) == stable_digest(dt.replace())
+
+    def test_unsupported_type(self):
+        """测试无法稳定编码的类型"""
+        with pytest.raises(TypeError):
+            stable_digest(object())
+
+    def test_cache_key(self):
+        """测试生成缓存键"""
+        assert cache_key("user", 1) == "user:1"
+        assert cache_key("items", page=2) == "items:page:2"
+        assert cache_key({"q": "x"}) == stable_digest({"q": "x"})
+
+    def test_make_key_prefix(self, monkeypatch):
+        """测试命名空间与版本前缀"""
+        key = make_key("user", 1)
+        assert key == f"{settings.CACHE_KEY_PREFIX}:v{settings.CACHE_VERSION}:user:1"
+
+        monkeypatch.setattr(settings, "CACHE_VERSION", settings.CACHE_VERSION + 1)
+        assert make_key("user", 1) != key
+
+
+class TestCachedDecorator:
+    """缓存装饰器测试"""
+
+    @pytest.mark.asyncio
+    async def test_skips_self_and_session(self, monkeypatch):
+        """测试缓存键忽略self与数据库会话"""
+        memory_cache = MemoryCache()
+        monkeypatch.setattr(cache_module, "cache", memory_cache)
+        calls = []
+
+        class Repo:
+            @cached("repo:get")
+            async def get(self, db: AsyncSession, *, id: int):
+                calls.append(id)
+                return {"id": id}
+
+        repo = Repo()
+        first = await repo.get(AsyncSession(), id=1)
+        second = await Repo().get(AsyncSession(), id=1)
+
+        assert first == second == {"id": 1}
+        assert calls == [1]
+        assert all(key.startswith(make_key("repo:get")) for key in memory_cache._cache)
+
+    def test_key_pattern_placeholders(self, monkeypatch):
+        """测试带占位符的键模板"""
+        memory_cache = MemoryCache()
+        monkeypatch.setattr(cache_module, "cache", memory_cache)
+
+        @cached("profile:{user_id}")
+        def get_profile(user_id: int, verbose: bool = False):
+            return {"user_id": user_id}
+
+        get_profile(7)
+        assert memory_cache.exists(make_key("profile:7"))
+
+
+@pytest.fixture(params=["redis", "memory"])
+def tag_cache(request):
+    """支持标签的缓存后端"""
+    if request.param == "redis":
+        return RedisCache(client=fakeredis.FakeRedis())
+    return MemoryCache()
+
+
+class TestCacheTags:
+    """缓存标签测试"""
+
+    def test_invalidate_by_tag(self, tag_cache):
+        """测试按标签失效"""
+        tag_cache.set_with_tags("item:1", {"id": 1}, ["item:1", "owner:1:items"])
+        tag_cache.set_with_tags("list:owner:1", [1], ["owner:1:items"])
+        tag_cache.set_with_tags("item:2", {"id": 2}, ["item:2"])
+
+        assert tag_cache.invalidate_tags("owner:1:items") == 2
+        assert not tag_cache.exists("item:1")
+        assert not tag_cache.exists("list:owner:1")
+        assert tag_cache.exists("item:2")
+
+    def test_rejects_write_after_invalidation(self, tag_cache, monkeypatch):
+        """测试标签失效后的保护窗口内拒绝写入旧数据"""
+        tag_cache.invalidate_tags("item:1")
+        assert not tag_cache.set_with_tags("item:1", {"id": 1}, ["item:1"])
+        assert not tag_cache.exists("item:1")
+
+        monkeypatch.setattr(settings, "CACHE_TAG_GRACE_SECONDS", 0)
+        tag_cache.invalidate_tags("item:3")
+        assert tag_cache.set_with_tags("item:3", {"id": 3}, ["item:3"])
+
+    def test_cached_decorator_tags(self, tag_cache, monkeypatch):
+        """测试缓存装饰器关联标签"""
+        monkeypatch.setattr(cache_module, "cache", tag_cache)
+        calls = []
+
+        @cached("item:{item_id}", tags=["item:{item_id}"])
+        def get_item(item_id: int):
+            calls.append(item_id)
+            return {"id": item_id}
+
+        get_item(5)
+        get_item(5)
+        monkeypatch.setattr(settings, "CACHE_TAG_GRACE_SECONDS", 0)
+        tag_cache.invalidate_tags("item:5")
+        get_item(5)
+
+        assert calls == [5, 5]
+
+
+class TestBulkOperations:
+    """批量操作测试"""
+
+    def test_get_many_and_set_many(self, tag_cache):
+        """测试批量读写"""
+        assert tag_cache.set_many({"a": {"v": 1}, "b": [2], "c": "three"}, expire=60)
+
+        values = tag_cache.get_many(["a", "b", "c", "missing"])
+        assert values == {"a": {"v": 1}, "b": [2], "c": "three"}
+        assert tag_cache.get_many([]) == {}
+
+    def test_iter_keys_and_delete_pattern(self, tag_cache):
+        """测试按模式迭代与分批删除"""
+        tag_cache.set_many({f"session:{i}": i for i in range(25)})
+        tag_cache.set("other:1", 1)
+
+        assert sorted(tag_cache.iter_keys("session:*", count=10)) == sorted(
+            f"session:{i}" for i in range(25)
+        )
+        assert tag_cache.delete_pattern("session:*", batch_size=10) == 25
+        assert tag_cache.keys("session:*") == []
+        assert tag_cache.exists("other:1")
+
+    @pytest.mark.asyncio
+    async def test_adelete_pattern(self, tag_cache):
+        """测试异步按模式删除"""
+        tag_cache.set_many({f"tmp:{i}": i for i in range(5)})
+        assert await tag_cache.adelete_pattern("tmp:*", batch_size=2) == 5
+
+    def test_flush_all_is_namespace_scoped(self):
+        """测试清空缓存只影响当前命名空间"""
+        client = fakeredis.FakeRedis()
+        redis_cache = RedisCache(client=client)
+        client.set("foreign:key", "keep")
+        redis_cache.set(make_key("user", 1), {"id": 1})
+        redis_cache.set(state_key("revoked", "jti"), 1)
+
+        assert redis_cache.flush_all()
+        assert not redis_cache.exists(make_key("user", 1))
+        assert client.get("foreign:key") == b"keep"
+        # 状态键不属于缓存数据
+        assert redis_cache.exists(state_key("revoked", "jti"))
+
+
+class TestCacheMetrics:
+    """缓存指标测试"""
+
+    def test_key_namespace(self):
+        """测试从缓存键提取命名空间"""
+        assert key_namespace(make_key("user", 1)) == "user"
+        assert key_namespace(make_key("repo", "item", "abc", "get", 1)) == "repo:item"
+        assert key_namespace("legacy:key") == "legacy"
+        assert key_namespace(state_key("ratelimit", "default", "ip:1")) == "ratelimit"
+
+    def test_hit_miss_and_error_counters(self, tag_cache):
+        """测试命中、未命中与错误计数"""
+        key = make_key("metrics", 1)
+        labels = {"backend": tag_cache.backend, "namespace": "metrics"}
+        hits = REGISTRY.get_sample_value("cache_hits_total", labels) or 0
+        misses = REGISTRY.get_sample_value("cache_misses_total", labels) or 0
+
+        tag_cache.get(key)
+        tag_cache.set(key, {"id": 1})
+        tag_cache.get(key)
+
+        assert REGISTRY.get_sample_value("cache_hits_total", labels) == hits + 1
+        assert REGISTRY.get_sample_value("cache_misses_total", labels) == misses + 1
+
+    def test_errors_are_counted(self):
+        """测试Redis错误被计数而非静默吞掉"""
+        server = fakeredis.FakeServer()
+        redis_cache = RedisCache(client=fakeredis.FakeRedis(server=server))
+        server.connected = False
+        labels = {"backend": "redis", "operation": "get"}
+        errors = REGISTRY.get_sample_value("cache_errors_total", labels) or 0
+
+        assert redis_cache.get(make_key("metrics", 2)) is None
+        assert REGISTRY.get_sample_value("cache_errors_total", labels) == errors + 1
+
+
+class TestResilientConnectivity:
+    """Redis连接容错测试"""
+
+    def _failover(self, server: fakeredis.FakeServer) -> FailoverCache:
+        primary = RedisCache(client_factory=lambda: fakeredis.FakeRedis(server=server))
+        # 由测试显式触发健康检查
+        primary.monitored = True
+        return FailoverCache(primary, MemoryCache())
+
+    def test_lazy_connect(self):
+        """测试首次使用时才建立连接"""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return fakeredis.FakeRedis()
+
+        redis_cache = RedisCache(client_factory=factory)
+        assert calls == []
+
+        redis_cache.set("k", 1)
+        assert redis_cache.get("k") == 1
+        assert calls == [1]
+
+    def test_failover_and_failback(self):
+        """测试Redis不可用时降级、恢复后切回"""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        failover = self._failover(server)
+
+        failover.set("k", "memory")
+        assert failover.backend == "memory"
+        assert failover.get("k") == "memory"
+
+        server.connected = True
+        assert failover.backend == "memory"
+        assert failover.check_health()
+        assert failover.backend == "redis"
+        # 切回后不再使用降级期间的内存数据
+        assert failover.get("k") is None
+
+    def test_replays_invalidations_after_outage(self, monkeypatch):
+        """测试降级期间的标签失效在恢复后补发到Redis"""
+        monkeypatch.setattr(settings, "CACHE_TAG_GRACE_SECONDS", 0)
+        server = fakeredis.FakeServer()
+        failover = self._failover(server)
+        failover.set_with_tags("item:1:data", {"id": 1}, ["item:1"])
+        assert failover.backend == "redis"
+
+        server.connected = False
+        assert failover.get("item:1:data") is None
+        failover.invalidate_tags("item:1")
+        failover.delete("user:1:data")
+        assert failover.backend == "memory"
+
+        server.connected = True
+        failover.check_health()
+        assert not failover.exists("item:1:data")
+
+    @pytest.mark.asyncio
+    async def test_background_health_checks(self):
+        """测试后台健康检查任务的启停"""
+        server = fakeredis.FakeServer()
+        failover = self._failover(server)
+        failover.primary.monitored = False
+
+        failover.start_health_checks()
+        await asyncio.sleep(0.05)
+        assert failover.primary.monitored
+        assert failover.backend == "redis"
+
+        await failover.stop_health_checks()
+        assert not failover.primary.monitored
+
+    def test_create_redis_client_topologies(self, monkeypatch):
+        """测试按配置创建单机、哨兵与集群客户端（均不建立连接）"""
+        client = create_redis_client()
+        assert client.connection_pool.connection_kwargs["host"] == settings.REDIS_HOST
+
+        monkeypatch.setattr(settings, "REDIS_MODE", "sentinel")
+        monkeypatch.setattr(settings, "REDIS_SENTINELS", ["sentinel-1:26379"])
+        client = create_redis_client()
+        assert isinstance(client.connection_pool, SentinelConnectionPool)
+        assert client.connection_pool.service_name == settings.REDIS_SENTINEL_MASTER
+
+        created = {}
+
+        class StubCluster:
+            def __init__(self, startup_nodes, **kwargs):
+                created["nodes"] = [(n.host, n.port) for n in startup_nodes]
+
+        monkeypatch.setattr(cache_module, "RedisCluster", StubCluster)
+        monkeypatch.setattr(settings, "REDIS_MODE", "cluster")
+        monkeypatch.setattr(
+            settings, "REDIS_CLUSTER_NODES", ["node-1:7000", "node-2:7001"]
+        )
+        create_redis_client()
+        assert created["nodes"] == [("node-1", 7000), ("node-2", 7001)]
@@ -0,0 +1,111 @@
+"""
+异步密码哈希单元测试
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.exceptions import ServiceUnavailableException
+from app.core.hashing import PasswordHasher, calibrate
+from app.core.security import build_password_context
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """测量事件循环的最大调度延迟"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+class TestPasswordHasher:
+    """密码哈希器测试"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        """测试哈希与校验"""
+        hasher = PasswordHasher(max_workers=1, max_queue=4)
+        hashed = await hasher.hash("Secret123")
+
+        assert hashed != "Secret123"
+        assert await hasher.verify("Secret123", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_verify_dummy(self):
+        """测试占位哈希校验始终失败且复用同一哈希"""
+        hasher = PasswordHasher(max_workers=1, max_queue=4)
+
+        assert await hasher.verify_dummy("Secret123") is False
+        dummy_hash = hasher._dummy_hash
+        assert await hasher.verify_dummy("another") is False
+        assert hasher._dummy_hash == dummy_hash
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """测试队列已满时快速失败"""
+        hasher = PasswordHasher(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        blocked = asyncio.create_task(hasher._run("hash", release.wait))
+        await asyncio.sleep(0)
+        assert hasher.pending == 1
+
+        with pytest.raises(ServiceUnavailableException):
+            await hasher.hash("Secret123")
+
+        release.set()
+        assert await blocked is True
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    @pytest.mark.slow
+    async def test_event_loop_stays_responsive_during_hash_storm(self):
+        """测试并发哈希期间事件循环不被阻塞"""
+        hasher = PasswordHasher(max_workers=2, max_queue=32)
+        stop = asyncio.Event()
+        lag = asyncio.create_task(measure_loop_lag(stop))
+
+        hashes = await asyncio.gather(*(hasher.hash(f"Pass{i}word") for i in range(6)))
+        stop.set()
+
+        assert len(set(hashes)) == 6
+        # 同步调用时单次bcrypt就会阻塞约数百毫秒
+        assert await lag < 0.1
+        hasher.shutdown()
+
+
+class TestPasswordContext:
+    """密码哈希配置测试"""
+
+    def test_weaker_hash_needs_update(self):
+        """测试成本低于当前配置的哈希需要升级，更高的保持不变"""
+        weak = build_password_context(bcrypt_rounds=4).hash("Secret123")
+        strong = build_password_context(bcrypt_rounds=6).hash("Secret123")
+        context = build_password_context(bcrypt_rounds=5)
+
+        assert context.needs_update(weak)
+        assert not context.needs_update(strong)
+        assert not context.needs_update(context.hash("Secret123"))
+        assert context.verify("Secret123", weak)
+
+    def test_unknown_scheme(self):
+        """测试不支持的方案"""
+        with pytest.raises(ValueError):
+            build_password_context(scheme="md5_crypt")
+
+    def test_calibrate(self):
+        """测试校准返回不超过目标耗时的成本"""
+        cost, duration = calibrate("bcrypt", target_seconds=0.02, samples=1)
+
+        assert 4 <= cost["bcrypt_rounds"] < 31
+        assert duration <= 0.02 or cost["bcrypt_rounds"] == 4
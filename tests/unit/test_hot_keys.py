@@ -0,0 +1,61 @@
+"""
+热点键统计单元测试
+"""
+
+from app.utils.hot_keys import CountMinSketch, HotKeyTracker
+
+
+class TestCountMinSketch:
+    """Count-Min Sketch测试"""
+
+    def test_estimate_never_underestimates(self):
+        """测试估计值不低于真实值"""
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(200):
+            sketch.add(f"key:{i % 20}")
+
+        for i in range(20):
+            assert sketch.estimate(f"key:{i}") >= 10
+
+    def test_decay(self):
+        """测试计数衰减"""
+        sketch = CountMinSketch()
+        sketch.add("hot", 8)
+        sketch.decay()
+        assert sketch.estimate("hot") == 4
+
+
+class TestHotKeyTracker:
+    """热点键追踪测试"""
+
+    def test_top_keys(self):
+        """测试返回访问最多的键"""
+        tracker = HotKeyTracker(k=3, sample_rate=1.0)
+        for key, count in {"a": 50, "b": 30, "c": 20, "d": 5, "e": 1}.items():
+            for _ in range(count):
+                tracker.record(key)
+
+        top = tracker.top()
+        assert [key for key, _ in top] == ["a", "b", "c"]
+        assert top[0][1] >= 50
+
+    def test_sampling_scales_estimates(self):
+        """测试采样时按采样率换算估计值"""
+        tracker = HotKeyTracker(k=5, sample_rate=0.5)
+        for _ in range(2000):
+            tracker.record("hot")
+
+        ((key, estimate),) = tracker.top(1)
+        assert key == "hot"
+        assert 1600 <= estimate <= 2400
+
+    def test_disabled_and_reset(self):
+        """测试关闭采样与重置"""
+        tracker = HotKeyTracker(sample_rate=0)
+        tracker.record("a")
+        assert tracker.top() == []
+
+        tracker = HotKeyTracker(sample_rate=1.0)
+        tracker.record("a")
+        tracker.reset()
+        assert tracker.top() == []
@@ -0,0 +1,143 @@
+"""
+SQL执行统计测试
+"""
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db import instrumentation
+from app.db.instrumentation import (
+    current_stats,
+    fingerprint,
+    fingerprint_id,
+    instrument_queries,
+    track_queries,
+)
+
+
+class TestFingerprint:
+    """SQL指纹测试"""
+
+    def test_literals_replaced(self):
+        """测试字符串与数字字面量替换为占位符"""
+        assert (
+            fingerprint("SELECT * FROM user WHERE email = 'a''b@x.com' AND id > 42")
+            == "SELECT * FROM user WHERE email = ? AND id > ?"
+        )
+
+    @pytest.mark.parametrize(
+        "statement",
+        [
+            "SELECT * FROM item WHERE owner_id = $1 LIMIT $2",
+            "SELECT * FROM item WHERE owner_id = %(owner_id)s LIMIT %(param_1)s",
+            "SELECT * FROM item WHERE owner_id = ? LIMIT ?",
+            "SELECT * FROM item WHERE owner_id = :owner_id LIMIT :limit",
+        ],
+    )
+    def test_paramstyles_normalized(self, statement):
+        """测试各驱动的绑定参数风格得到相同指纹"""
+        assert fingerprint(statement) == "SELECT * FROM item WHERE owner_id = ? LIMIT ?"
+
+    def test_identifiers_kept(self):
+        """测试标识符中的数字与类型转换不被替换"""
+        assert (
+            fingerprint("SELECT anon_1.id, col2::text FROM t1 AS anon_1")
+            == "SELECT anon_1.id, col2::text FROM t1 AS anon_1"
+        )
+
+    def test_in_list_collapsed(self):
+        """测试不同长度的 IN 列表得到相同指纹"""
+        short = "SELECT * FROM item WHERE id IN (?, ?)"
+        long = "SELECT * FROM item WHERE id IN ($1, $2, $3,\n $4)"
+
+        assert fingerprint(short) == fingerprint(long)
+        assert fingerprint(long) == "SELECT * FROM item WHERE id IN (?, ...)"
+        assert fingerprint_id(short) == fingerprint_id(long)
+
+    def test_multirow_values_collapsed(self):
+        """测试多行 VALUES 折叠为一行"""
+        assert (
+            fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)")
+            == "INSERT INTO t (a, b) VALUES (?, ...), ..."
+        )
+
+
+class TestQueryStats:
+    """统计作用域测试"""
+
+    def test_nested_scopes(self):
+        """测试内层作用域的语句同时计入外层"""
+        assert current_stats() is None
+        with track_queries() as outer:
+            outer.record("SELECT 1", 0.5)
+            with track_queries(keep_statements=True) as inner:
+                assert current_stats() is inner
+                inner.record("SELECT 2", 0.25)
+            assert current_stats() is outer
+
+        assert current_stats() is None
+        assert (outer.count, outer.duration) == (2, 0.75)
+        assert (inner.count, inner.statements) == (1, ["SELECT 2"])
+        assert outer.statements is None
+
+    def test_fingerprints(self):
+        """测试按指纹统计重复语句"""
+        with track_queries(keep_statements=True) as stats:
+            for owner_id in range(3):
+                stats.record(f"SELECT * FROM item WHERE owner_id = {owner_id}", 0.0)
+            stats.record("SELECT count(*) FROM item", 0.0)
+
+        assert stats.fingerprints().most_common(1) == [
+            ("SELECT * FROM item WHERE owner_id = ?", 3)
+        ]
+
+
+class TestEngineInstrumentation:
+    """引擎事件统计测试"""
+
+    @pytest.fixture
+    async def engine(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        instrument_queries(engine)
+        yield engine
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_statements_counted(self, engine):
+        """测试作用域内执行的语句被统计"""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with track_queries(keep_statements=True) as stats:
+                await conn.execute(text("SELECT 2"))
+                await conn.execute(text("SELECT 3"))
+
+        assert stats.count == 2
+        assert stats.duration > 0
+        assert stats.statements == ["SELECT 2", "SELECT 3"]
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged(self, engine, monkeypatch):
+        """测试慢查询按指纹记录日志"""
+        warnings = []
+        monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0)
+        monkeypatch.setattr(instrumentation.logger, "warning", warnings.append)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1 WHERE 'x' = :value"), {"value": "x"})
+
+        assert len(warnings) == 1
+        assert "SELECT ? WHERE ? = ?" in warnings[0]
+
+    @pytest.mark.asyncio
+    async def test_failed_statement_not_counted(self, engine):
+        """测试执行失败的语句不影响后续计时"""
+        async with engine.connect() as conn:
+            with track_queries() as stats:
+                with pytest.raises(exc.OperationalError):
+                    await conn.execute(text("SELECT * FROM missing"))
+                await conn.execute(text("SELECT 1"))
+            assert conn.sync_connection.info["query_started"] == []
+
+        assert stats.count == 1
@@ -0,0 +1,43 @@
+"""
+进程内TTL缓存单元测试
+"""
+
+import time
+
+from app.utils.local_cache import LocalTTLCache
+
+
+class TestLocalTTLCache:
+    """进程内TTL缓存测试"""
+
+    def test_get_and_expire(self):
+        """测试条目到期后不可读"""
+        local = LocalTTLCache(ttl=60)
+        local.set("a", 1)
+        local.set("b", 2, ttl=0.01)
+
+        time.sleep(0.02)
+        assert local.get("a") == 1
+        assert local.get("b") is None
+        assert len(local) == 1
+
+    def test_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        local = LocalTTLCache(max_size=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        assert local.get("a") == 1
+        assert local.get("b") is None
+        assert local.get("c") == 3
+
+    def test_pop(self):
+        """测试删除条目"""
+        local = LocalTTLCache()
+        local.set("a", 1)
+
+        assert local.pop("a") == 1
+        assert local.pop("a") is None
+        assert local.get("a") is None
@@ -0,0 +1,92 @@
+"""
+登录防护测试
+"""
+
+import fakeredis
+import pytest
+
+from app.core import login_guard as login_guard_module
+from app.core.config import settings
+from app.core.exceptions import RateLimitException
+from app.core.login_guard import LoginGuard
+from app.utils.cache import MemoryCache, RedisCache
+
+
+@pytest.fixture(params=["redis", "local"])
+def guard(request, monkeypatch):
+    """分别以fakeredis与进程内状态运行"""
+    if request.param == "redis":
+        backend = RedisCache(client=fakeredis.FakeRedis())
+    else:
+        backend = MemoryCache()
+    monkeypatch.setattr(login_guard_module, "cache", backend)
+    monkeypatch.setattr(settings, "LOGIN_GUARD_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_USER", 3)
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_IP", 5)
+    monkeypatch.setattr(settings, "LOGIN_LOCKOUT_BASE_SECONDS", 30)
+    monkeypatch.setattr(settings, "LOGIN_LOCKOUT_MAX_SECONDS", 100)
+    return LoginGuard()
+
+
+def retry_after(guard: LoginGuard, username: str, ip: str = None) -> int:
+    """检查并返回 Retry-After，未锁定时返回0"""
+    try:
+        guard.check(username, ip)
+    except RateLimitException as e:
+        assert e.status_code == 429
+        assert e.error_code == "LOGIN_LOCKED"
+        return int(e.headers["Retry-After"])
+    return 0
+
+
+class TestLoginGuard:
+    """登录防护测试"""
+
+    def test_lock_after_threshold(self, guard):
+        """测试连续失败达到阈值后锁定用户名"""
+        for _ in range(2):
+            guard.record_failure("alice")
+            assert retry_after(guard, "alice") == 0
+
+        guard.record_failure("alice")
+        assert 29 <= retry_after(guard, "alice") <= 30
+        # 其他用户名不受影响
+        assert retry_after(guard, "bob") == 0
+
+    def test_lockout_doubles(self, guard):
+        """测试锁定后每次失败锁定时长翻倍且不超过上限"""
+        for _ in range(3):
+            guard.record_failure("alice")
+        guard.record_failure("alice")
+        assert 59 <= retry_after(guard, "alice") <= 60
+
+        guard.record_failure("alice")
+        assert 99 <= retry_after(guard, "alice") <= 100
+
+    def test_lock_by_ip(self, guard):
+        """测试同一IP尝试不同用户名时按IP锁定"""
+        for index in range(5):
+            guard.record_failure(f"user{index}", "10.0.0.1")
+
+        assert retry_after(guard, "someone", "10.0.0.1") > 0
+        assert retry_after(guard, "someone", "10.0.0.2") == 0
+
+    def test_success_resets_username(self, guard):
+        """测试登录成功清除用户名计数，保留IP计数"""
+        for _ in range(2):
+            guard.record_failure("alice", "10.0.0.1")
+        guard.record_success("alice")
+
+        for _ in range(2):
+            guard.record_failure("alice", "10.0.0.1")
+        assert retry_after(guard, "alice") == 0
+
+        guard.record_failure("alice", "10.0.0.1")
+        assert retry_after(guard, "other", "10.0.0.1") > 0
+
+    def test_disabled(self, guard, monkeypatch):
+        """测试关闭后不计数也不锁定"""
+        monkeypatch.setattr(settings, "LOGIN_GUARD_ENABLED", False)
+        for _ in range(10):
+            guard.record_failure("alice")
+        assert retry_after(guard, "alice") == 0
@@ -0,0 +1,93 @@
+"""
+键集分页测试
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+
+from app.core.exceptions import ValidationException
+from app.db.models.item import Item
+from app.db.pagination import (
+    decode_cursor,
+    encode_cursor,
+    normalize_ordering,
+    order_by,
+    seek,
+)
+
+
+def compile_sql(stmt) -> str:
+    """编译为SQLite方言的SQL"""
+    return str(stmt.compile(dialect=sqlite.dialect()))
+
+
+class TestCursor:
+    """游标编解码测试"""
+
+    def test_normalize_appends_primary_key(self):
+        """测试主键作为最后的排序键"""
+        assert normalize_ordering(()) == ("id",)
+        assert normalize_ordering(("-created_at",)) == ("-created_at", "id")
+        assert normalize_ordering(("-id",)) == ("-id",)
+
+    def test_round_trip(self):
+        """测试游标还原排序键值（含时间类型）"""
+        ordering = ("-created_at", "id")
+        created_at = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+        row = SimpleNamespace(created_at=created_at, id=42)
+
+        cursor = encode_cursor(row, ordering)
+        assert "=" not in cursor
+        assert decode_cursor(Item, cursor, ordering) == [created_at, 42]
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "e30"])
+    def test_invalid_cursor(self, cursor):
+        """测试无效游标"""
+        with pytest.raises(ValidationException):
+            decode_cursor(Item, cursor, ("id",))
+
+    @pytest.mark.parametrize(
+        "ordering,row",
+        [
+            (("title", "id"), {"title": "x", "id": "1"}),
+            (("title", "id"), {"title": 1, "id": 1}),
+            (("id",), {"id": True}),
+            (("-created_at", "id"), {"created_at": 20240501, "id": 1}),
+            (("-created_at", "id"), {"created_at": "yesterday", "id": 1}),
+        ],
+    )
+    def test_value_type_mismatch(self, ordering, row):
+        """测试排序键值类型与列不符的游标"""
+        cursor = encode_cursor(SimpleNamespace(**row), ordering)
+        with pytest.raises(ValidationException):
+            decode_cursor(Item, cursor, ordering)
+
+    def test_ordering_mismatch(self):
+        """测试游标与排序规则不符"""
+        cursor = encode_cursor(SimpleNamespace(id=1), ("id",))
+        with pytest.raises(ValidationException):
+            decode_cursor(Item, cursor, ("-created_at", "id"))
+
+
+class TestSeek:
+    """键集过滤条件测试"""
+
+    def test_same_direction_uses_row_value(self):
+        """测试方向一致时使用行值比较"""
+        ordering = ("title", "id")
+        stmt = seek(select(Item), Item, ordering, ["b", 3])
+        sql = compile_sql(order_by(stmt, Item, ordering))
+
+        assert "(item.title, item.id) > (?, ?)" in sql
+        assert "ORDER BY item.title ASC, item.id ASC" in sql
+
+    def test_mixed_directions_expand(self):
+        """测试方向不一致时展开比较条件"""
+        ordering = ("-title", "id")
+        sql = compile_sql(seek(select(Item), Item, ordering, ["b", 3]))
+
+        assert "item.title < ? OR item.title = ? AND item.id > ?" in sql
@@ -0,0 +1,110 @@
+"""
+分布式限流测试
+"""
+
+import time
+
+import fakeredis
+import pytest
+
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import RateLimiter, RateLimitPolicy
+from app.utils.cache import MemoryCache, RedisCache
+
+
+class CountingRedisCache(RedisCache):
+    """记录脚本调用次数的Redis缓存"""
+
+    def __init__(self, client):
+        super().__init__(client=client)
+        self.eval_calls = 0
+
+    def eval_script(self, script, keys=(), args=()):
+        self.eval_calls += 1
+        return super().eval_script(script, keys=keys, args=args)
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    """以fakeredis作为限流存储"""
+    backend = CountingRedisCache(fakeredis.FakeRedis())
+    monkeypatch.setattr(rate_limit_module, "cache", backend)
+    return backend
+
+
+class TestRateLimiter:
+    """GCRA限流器测试"""
+
+    def test_limit_and_deny(self, redis_cache):
+        """测试超出配额后拒绝并给出重试时间"""
+        policy = RateLimitPolicy("test-deny", limit=3, period=60, lease=1)
+        limiter = RateLimiter()
+
+        results = [limiter.hit(policy, "ip:1") for _ in range(3)]
+        assert all(result.allowed for result in results)
+        assert [result.remaining for result in results] == [2, 1, 0]
+
+        denied = limiter.hit(policy, "ip:1")
+        assert not denied.allowed
+        headers = denied.headers()
+        assert headers["RateLimit-Limit"] == "3"
+        assert headers["RateLimit-Remaining"] == "0"
+        assert headers["RateLimit-Policy"] == "3;w=60"
+        # 每20秒恢复一个配额
+        assert 19 <= int(headers["Retry-After"]) <= 20
+
+        # 不同主体互不影响
+        assert limiter.hit(policy, "ip:2").allowed
+
+    def test_lease_serves_locally(self, redis_cache):
+        """测试租借的配额在本地消耗，不访问Redis"""
+        policy = RateLimitPolicy("test-lease", limit=100, period=60, lease=10)
+        limiter = RateLimiter()
+
+        for _ in range(10):
+            assert limiter.hit(policy, "user:1").allowed
+        assert redis_cache.eval_calls == 1
+
+        assert limiter.hit(policy, "user:1").allowed
+        assert redis_cache.eval_calls == 2
+
+    def test_limit_shared_across_limiters(self, redis_cache):
+        """测试多个进程共享同一配额"""
+        policy = RateLimitPolicy("test-shared", limit=4, period=60, lease=1)
+        first, second = RateLimiter(), RateLimiter()
+
+        allowed = [
+            limiter.hit(policy, "ip:1").allowed for limiter in (first, second) * 3
+        ]
+        assert allowed.count(True) == 4
+        assert allowed[-2:] == [False, False]
+
+    def test_expired_lease_refunded(self, redis_cache, monkeypatch):
+        """测试租期结束后未用完的配额退还给共享配额"""
+        monkeypatch.setattr(
+            rate_limit_module.settings, "RATE_LIMIT_LEASE_SECONDS", 0.05
+        )
+        policy = RateLimitPolicy("test-refund", limit=10, period=3600, lease=5)
+        first, second = RateLimiter(), RateLimiter()
+
+        # 租借5个但只用1个
+        assert first.hit(policy, "ip:1").allowed
+        time.sleep(0.1)
+
+        # 租期结束后再次访问时退还剩余的4个，并重新租借5个
+        assert first.hit(policy, "ip:1").allowed
+        # 共10个配额，第一个进程占用6个（已用2个、租借中4个）；不退还时将一个都不剩
+        granted = sum(second.hit(policy, "ip:1").allowed for _ in range(10))
+        assert granted == 4
+
+    def test_local_fallback(self, monkeypatch):
+        """测试Redis不可用时退化为进程内限流"""
+        monkeypatch.setattr(rate_limit_module, "cache", MemoryCache())
+        policy = RateLimitPolicy("test-local", limit=5, period=60, lease=2)
+        limiter = RateLimiter()
+
+        allowed = [limiter.hit(policy, "ip:1").allowed for _ in range(7)]
+        assert allowed == [True] * 5 + [False] * 2
+
+        limiter.reset()
+        assert limiter.hit(policy, "ip:1").allowed
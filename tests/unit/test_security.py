@@ -0,0 +1,316 @@
+"""
+令牌安全相关单元测试
+"""
+
+import time
+from datetime import timedelta
+
+import fakeredis
+import pytest
+import redis
+from jose import JWTError, jwt
+
+from app.core import revocation, security
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.keys import JWTKeyring, build_keyring, generate_private_key_pem
+from app.core.revocation import token_revocations
+from app.core.security import (
+    create_access_token,
+    create_token_pair,
+    decode_token,
+)
+from app.services.user_service import user_service
+from app.utils.bloom import BloomFilter
+from app.utils.cache import FailoverCache, MemoryCache, RedisCache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """统计实际的签名校验次数"""
+    calls = []
+    original = security.keyring.decode
+
+    def counting_decode(token):
+        calls.append(1)
+        return original(token)
+
+    monkeypatch.setattr(security.keyring, "decode", counting_decode)
+    security.verified_tokens.clear()
+    yield calls
+    security.verified_tokens.clear()
+
+
+class TestVerifiedTokenCache:
+    """已验证令牌缓存测试"""
+
+    def test_repeated_token_skips_signature_check(self, decode_calls):
+        """测试重复出现的令牌只校验一次签名"""
+        token = create_access_token(42)
+
+        assert decode_token(token).user_id == 42
+        assert decode_token(token).user_id == 42
+        assert len(decode_calls) == 1
+
+    def test_token_type_checked_on_cache_hit(self, decode_calls):
+        """测试命中缓存时仍检查令牌类型"""
+        token = create_access_token(42)
+        decode_token(token)
+
+        assert decode_token(token, token_type="refresh") is None
+
+    def test_invalid_tokens_are_not_cached(self, decode_calls):
+        """测试无效令牌不进入缓存"""
+        token = create_access_token(42) + "tampered"
+
+        assert decode_token(token) is None
+        assert decode_token(token) is None
+        assert len(decode_calls) == 2
+        assert len(security.verified_tokens) == 0
+
+    def test_entry_expires_with_token(self, decode_calls):
+        """测试缓存条目随令牌过期"""
+        token = create_access_token(42, expires_delta=timedelta(seconds=1))
+        assert decode_token(token) is not None
+
+        time.sleep(1.1)
+        decode_token(token)
+        assert len(decode_calls) == 2
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    """使用本地Redis替身的令牌吊销列表"""
+    redis_cache = RedisCache(client=fakeredis.FakeRedis())
+    monkeypatch.setattr(revocation, "cache", redis_cache)
+    monkeypatch.setattr(
+        token_revocations, "_filter", BloomFilter(capacity=1000, error_rate=0.01)
+    )
+    monkeypatch.setattr(token_revocations, "_local", {})
+    security.verified_tokens.clear()
+    yield redis_cache
+    security.verified_tokens.clear()
+
+
+class TestBloomFilter:
+    """布隆过滤器测试"""
+
+    def test_no_false_negatives(self):
+        """测试已加入的元素一定判定存在"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        assert all(f"jti-{i}" in bloom for i in range(1000))
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate(self):
+        """测试误判率接近设定值"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestTokenRevocation:
+    """令牌吊销测试"""
+
+    def test_revoked_token_rejected_on_cache_hit(self, revocations):
+        """测试已缓存的令牌被吊销后立即失效"""
+        token = create_access_token(42)
+        claims = decode_token(token)
+
+        assert token_revocations.revoke(claims.jti, claims.expires_in)
+        assert decode_token(token) is None
+        assert decode_token(token, check_revocation=False) is not None
+
+    def test_not_revoked_is_local_only(self, revocations, monkeypatch):
+        """测试未吊销的令牌不访问Redis"""
+        calls = []
+        monkeypatch.setattr(revocations, "exists", lambda key: calls.append(key))
+        token = create_access_token(42)
+
+        assert decode_token(token) is not None
+        assert calls == []
+
+    def test_revoke_reports_first_revocation(self, revocations):
+        """测试重复吊销返回False"""
+        assert token_revocations.revoke("jti-1", 60)
+        assert not token_revocations.revoke("jti-1", 60)
+        assert revocations.redis_client.ttl(token_revocations._key("jti-1")) <= 60
+
+    def test_claim_reports_store_error(self, revocations, monkeypatch):
+        """测试Redis出错时登记结果为None且不记录为已使用"""
+
+        def fail(*args, **kwargs):
+            raise redis.TimeoutError("timeout")
+
+        monkeypatch.setattr(revocations.redis_client, "set", fail)
+
+        assert token_revocations.claim("jti-error", 60) is None
+        assert not token_revocations.is_revoked("jti-error")
+
+    @pytest.mark.asyncio
+    async def test_refresh_store_error_keeps_family(self, revocations, monkeypatch):
+        """测试刷新时Redis出错返回503，不当作重放吊销令牌族"""
+        tokens = create_token_pair(42, {"ver": 0}, family="fam-error")
+        monkeypatch.setattr(revocations, "add", lambda key, value, expire=None: None)
+
+        with pytest.raises(ServiceUnavailableException):
+            await user_service.refresh_token(None, refresh_token=tokens.refresh_token)
+        assert not token_revocations.is_revoked("fam-error")
+
+    def test_sync_picks_up_other_processes(self, revocations):
+        """测试同步后识别其他进程吊销的令牌"""
+        token = create_access_token(42)
+        claims = decode_token(token)
+        revocations.redis_client.setex(token_revocations._key(claims.jti), 60, 1)
+
+        assert decode_token(token) is not None
+        assert token_revocations.sync() == 1
+        assert decode_token(token) is None
+
+    def test_revocation_survives_cache_flush(self, revocations):
+        """测试清空缓存数据不影响吊销记录"""
+        assert token_revocations.revoke("jti-flush", 60)
+
+        assert revocations.flush_all()
+        assert token_revocations.sync() == 1
+        assert token_revocations.is_revoked("jti-flush")
+
+    def test_revocation_survives_failover_recovery(self, revocations, monkeypatch):
+        """测试Redis恢复后清空缓存命名空间不影响吊销记录"""
+        server = fakeredis.FakeServer()
+        primary = RedisCache(client_factory=lambda: fakeredis.FakeRedis(server=server))
+        primary.monitored = True
+        failover = FailoverCache(primary, MemoryCache(), max_pending=1)
+        monkeypatch.setattr(revocation, "cache", failover)
+        assert token_revocations.revoke("jti-outage", 60)
+
+        # 降级期间的失效操作超出上限，恢复时清空缓存命名空间
+        server.connected = False
+        failover.invalidate_tags("item:1", "item:2")
+        server.connected = True
+        assert failover.check_health()
+
+        assert token_revocations.sync() == 1
+        assert token_revocations.is_revoked("jti-outage")
+
+    def test_local_revocation_not_evicted(self, revocations, monkeypatch):
+        """测试Redis不可用时的吊销不会被其他缓存数据挤出，切回Redis后仍然有效"""
+        server = fakeredis.FakeServer()
+        primary = RedisCache(client_factory=lambda: fakeredis.FakeRedis(server=server))
+        primary.monitored = True
+        fallback = MemoryCache(max_size=10)
+        failover = FailoverCache(primary, fallback)
+        monkeypatch.setattr(revocation, "cache", failover)
+
+        server.connected = False
+        assert token_revocations.revoke("jti-local", 60)
+        assert not token_revocations.revoke("jti-local", 60)
+        for index in range(100):
+            failover.set(f"filler:{index}", index)
+        assert token_revocations.is_revoked("jti-local")
+
+        server.connected = True
+        assert failover.check_health()
+        token_revocations.sync()
+        assert token_revocations.is_revoked("jti-local")
+
+    def test_local_revocation_expires(self, revocations, monkeypatch):
+        """测试进程内吊销记录按各自的过期时间淘汰"""
+        monkeypatch.setattr(revocations, "shared", False)
+        token_revocations.revoke("jti-short", 60)
+        token_revocations._local["jti-short"] = time.monotonic() - 1
+
+        assert not token_revocations.is_revoked("jti-short")
+        token_revocations.sync()
+        assert "jti-short" not in token_revocations._local
+
+
+class TestJWTKeyring:
+    """JWT签名密钥环测试"""
+
+    @pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+    def test_asymmetric_sign_and_verify(self, algorithm):
+        """测试非对称签名与验证"""
+        keyring = JWTKeyring(algorithm, private_key=generate_private_key_pem(algorithm))
+        token = keyring.sign({"sub": "42"})
+
+        assert jwt.get_unverified_header(token)["kid"] == keyring.kid
+        assert keyring.decode(token)["sub"] == "42"
+
+        keys = keyring.jwks()["keys"]
+        assert [key["kid"] for key in keys] == [keyring.kid]
+        assert "d" not in keys[0]
+        # 其他服务仅凭JWKS即可验证
+        assert jwt.decode(token, keyring.jwks(), algorithms=[algorithm])["sub"] == "42"
+
+    def test_rejects_foreign_and_unknown_keys(self):
+        """测试拒绝其他密钥签发或kid未知的令牌"""
+        keyring = JWTKeyring("ES256", private_key=generate_private_key_pem("ES256"))
+        forged = JWTKeyring(
+            "ES256", private_key=generate_private_key_pem("ES256"), kid=keyring.kid
+        ).sign({"sub": "42"})
+        unknown = JWTKeyring(
+            "ES256", private_key=generate_private_key_pem("ES256")
+        ).sign({"sub": "42"})
+
+        with pytest.raises(JWTError):
+            keyring.decode(forged)
+        with pytest.raises(JWTError):
+            keyring.decode(unknown)
+
+    def test_rotation(self):
+        """测试轮换后旧令牌在移除旧公钥前仍可验证"""
+        keyring = JWTKeyring("ES256", private_key=generate_private_key_pem("ES256"))
+        old_kid = keyring.kid
+        old_token = keyring.sign({"sub": "42"})
+
+        new_kid = keyring.rotate(generate_private_key_pem("ES256"))
+        new_token = keyring.sign({"sub": "43"})
+
+        assert new_kid != old_kid
+        assert jwt.get_unverified_header(new_token)["kid"] == new_kid
+        assert keyring.decode(old_token)["sub"] == "42"
+        assert len(keyring.jwks()["keys"]) == 2
+
+        keyring.retire(old_kid)
+        with pytest.raises(JWTError):
+            keyring.decode(old_token)
+        assert keyring.decode(new_token)["sub"] == "43"
+
+    def test_symmetric_keyring_publishes_nothing(self):
+        """测试对称签名不发布公钥"""
+        keyring = JWTKeyring("HS256", secret="secret")
+
+        assert keyring.decode(keyring.sign({"sub": "42"}))["sub"] == "42"
+        assert keyring.jwks() == {"keys": []}
+
+    def test_build_from_files(self, tmp_path, monkeypatch):
+        """测试从配置的密钥文件构建密钥环"""
+        previous = JWTKeyring("RS256", private_key=generate_private_key_pem("RS256"))
+        previous_file = tmp_path / "previous.pem"
+        previous_file.write_text(generate_private_key_pem("RS256"))
+        current_file = tmp_path / "current.pem"
+        current_file.write_text(generate_private_key_pem("RS256"))
+
+        monkeypatch.setattr(settings, "ALGORITHM", "RS256")
+        monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_FILE", str(current_file))
+        monkeypatch.setattr(
+            settings, "JWT_VERIFICATION_KEY_FILES", [str(previous_file)]
+        )
+        monkeypatch.setattr(settings, "JWT_KEY_ID", "2026-10")
+
+        keyring = build_keyring()
+        old_token = JWTKeyring("RS256", private_key=previous_file.read_text()).sign(
+            {"sub": "42"}
+        )
+
+        assert keyring.kid == "2026-10"
+        assert keyring.decode(old_token)["sub"] == "42"
+        assert len(keyring.jwks()["keys"]) == 2
+        with pytest.raises(JWTError):
+            keyring.decode(previous.sign({"sub": "42"}))